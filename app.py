@@ -21,7 +21,6 @@ Author: Claude (Lead Python Product Engineer)
 """
 
 import streamlit as st
-import requests
 import time
 import json
 import base64
@@ -33,10 +32,7 @@ from datetime import datetime
 from typing import Optional, Dict, Any, List, Tuple
 import threading
 from dataclasses import dataclass
-from io import BytesIO
-from streamlit.runtime.scriptrunner import add_script_run_ctx
 
-import zipfile
 
 # Global lock for thread-safe state updates
 state_lock = threading.Lock()
@@ -45,7 +41,7 @@ state_lock = threading.Lock()
 
 # Import refactored modules
 from midjourney_studio.api import (
-    MidjourneyAPI,
+    get_client,
     UseAPIError,
     AuthenticationError,
     PaymentRequiredError,
@@ -59,12 +55,29 @@ from midjourney_studio.utils import (
     poll_job_status_async,
     load_secrets,
     save_secrets,
-    validate_api_token
+    validate_api_token,
+    get_job_reconciler
 )
 
 
-from midjourney_studio.utils.persistence import load_job_history, save_job_history
+from midjourney_studio.utils.persistence import (
+    load_job_history, record_job, clear_job_history, flush_job_history, get_job_store
+)
+from midjourney_studio.utils.polling import render_stats
+from midjourney_studio.utils.webhook import get_callback_server
+from midjourney_studio.utils.media_cache import get_media_cache
+from midjourney_studio.utils.thumbnails import get_thumbnailer
+from midjourney_studio.utils.quadrants import get_quadrant_splitter
+from midjourney_studio.utils.downloader import Downloader
+from midjourney_studio.utils.zip_export import ZipExport
+from midjourney_studio.utils.media import is_video_item, get_video_url, extract_job_metadata
+from midjourney_studio.utils.gallery_index import (
+    GalleryIndex, GALLERY_FILTERS, PAGE_SIZES, DEFAULT_PAGE_SIZE, page_spans
+)
 from midjourney_studio.utils.ai_logic import configure_gemini, analyze_and_select
+from midjourney_studio.batch import (
+    BatchEngine, BatchSnapshot, get_batch_engine, get_capacity_dispatcher, get_job_router
+)
 
 # ============================================================================
 # LOGGING CONFIGURATION
@@ -300,9 +313,7 @@ def init_session_state():
         "selected_image_job": None,
 
         # Batch processing
-        "batch_queue": [],
         "batch_results": [],
-        "batch_running": False,
 
         # UI state & history
         "prompt_history": [],
@@ -326,6 +337,8 @@ def init_session_state():
         "dark_mode": True,
         "gallery_filter": "all",  # all, completed, failed
         "gallery_search": "",
+        "gallery_page_size": DEFAULT_PAGE_SIZE,
+        "gallery_cursor": DEFAULT_PAGE_SIZE,  # Items loaded via "Load more"
         "selected_images": [],  # For bulk download
     }
 
@@ -338,6 +351,10 @@ def init_session_state():
         from midjourney_studio.utils.ai_logic import configure_gemini
         configure_gemini(st.session_state.gemini_api_key)
 
+    # Seed adaptive poll intervals with historical render times (once per process)
+    if not render_stats.seeded:
+        render_stats.observe_history(st.session_state.job_history)
+
     # Recovery flag
     if "recovery_started" not in st.session_state:
         st.session_state.recovery_started = False
@@ -374,131 +391,54 @@ def format_elapsed_time(created: str) -> str:
         return "00:00"
 
 
-@st.cache_data(ttl=300)
 def fetch_image_cached(url: str) -> bytes:
     """
-    Fetch and cache image from URL.
+    Fetch image bytes through the on-disk media cache.
 
-    This prevents re-downloading images on every Streamlit rerun.
-    Cache expires after 5 minutes (300 seconds).
+    Each URL is downloaded once (concurrent callers share the download) and
+    kept across reruns and restarts, subject to the cache's LRU size cap.
+    Returns b'' on failure.
     """
-    try:
-        # Reduced timeout to prevents hangs on dead links
-        response = requests.get(url, timeout=3)
-        response.raise_for_status()
-        return response.content
-    except Exception as e:
-        logger.error(f"Failed to fetch image from {url}: {e}")
-        return b''
+    return get_media_cache().fetch(url)
 
 
-def is_video_item(item_data: dict) -> bool:
-    """
-    Robustly detect if an item is a video.
-    Checks URL extensions, substrings, job verbs, jobType, and prompt strings.
-    """
-    if not item_data:
-        return False
-        
-    # Check verb/type/jobType explicitly set (checking both top-level and in item_data)
-    # item_data might be a prepared "item" or a raw "job"
-    verb = item_data.get("verb") or item_data.get("response", {}).get("verb")
-    job_type = item_data.get("jobType") or item_data.get("response", {}).get("jobType")
-    data_type = item_data.get("type")
-    
-    if verb == "video" or job_type == "video" or data_type == "video":
-        return True
-        
-    # Check for --video parameter in prompt
-    prompt = item_data.get("prompt", "").lower()
-    if not prompt:
-        prompt = item_data.get("request", {}).get("prompt", "").lower()
-    if not prompt:
-        content = item_data.get("response", {}).get("content", "")
-        if content:
-             prompt = content.lower()
-
-    if "--video" in prompt:
-        return True
-    
-    # Check all attachments for video indicators
-    video_indicators = {'.mp4', '.mov', '.webm', 'video-cdn', 'timelapse'}
-    
-    # Check top-level URL
-    url = item_data.get("url")
-    if url and any(ind in url.lower() for ind in video_indicators):
-        return True
-        
-    # Check nested response attachments
-    response = item_data.get("response", {})
-    attachments = response.get("attachments", [])
-    for att in attachments:
-        att_url = att.get("url", "").lower()
-        if any(ind in att_url for ind in video_indicators):
-            return True
-        # Also check filename if available
-        filename = att.get("filename", "").lower()
-        if any(ind in filename for ind in video_indicators):
-            return True
-            
-    return False
+def discard_prepared_zip():
+    """Drop the gallery's prepared ZIP export and its temp file."""
+    export = st.session_state.pop("prepared_zip", None)
+    st.session_state.pop("prepared_zip_hash", None)
+    if export is not None:
+        export.close()
 
 
-def get_video_url(item_data: dict) -> Optional[str]:
-    """
-    Extract the first video URL found in a job/item.
-    """
-    if not item_data:
-        return None
-        
-    video_indicators = {'.mp4', '.mov', '.webm', 'video-cdn', 'timelapse'}
-    
-    # Check top-level URL
-    url = item_data.get("url")
-    if url and any(ind in url.lower() for ind in video_indicators):
-        return url
-        
-    # Check nested response attachments
-    response = item_data.get("response", {})
-    attachments = response.get("attachments", [])
-    for att in attachments:
-        att_url = att.get("url", "")
-        if any(ind in att_url.lower() for ind in video_indicators):
-            return att_url
-        filename = att.get("filename", "").lower()
-        if any(ind in filename for ind in video_indicators):
-            return att_url
-            
-    return None
+def cached_media(url: str):
+    """Local cached copy of a media URL for st.image, or the URL itself."""
+    path = get_media_cache().path_for(url) if url else None
+    return str(path) if path else url
 
 
-def extract_job_metadata(job: dict) -> dict:
+def _fragment(func=None, *, run_every=None):
+    """st.fragment when available (Streamlit >= 1.37), else a plain function."""
+    def decorate(f):
+        fragment = getattr(st, "fragment", None)
+        if fragment is None:
+            return f
+        return fragment(f, run_every=run_every) if run_every else fragment(f)
+    return decorate(func) if func is not None else decorate
+
+
+def thumbnail_media(url: str, size: str = "medium"):
     """
-    Robustly extract core metadata from a job object (from history or live).
-    Returns a dict with 'prompt', 'verb', 'jobType', and 'status'.
+    Local WebP thumbnail for small previews.
+
+    Falls back to cached_media() while the thumbnail is generated in the
+    background (or when Pillow is unavailable).
     """
-    # 1. Prompt Extraction
-    prompt = job.get("request", {}).get("prompt", "") or job.get("prompt", "")
-    if not prompt:
-        content = job.get("response", {}).get("content", "")
-        if content:
-            # Extract text between ** and ** or use whole content
-            match = re.search(r'\*\*(.*?)\*\*', content)
-            prompt = match.group(1) if match else content
-            
-    # 2. Status
-    status = job.get("status", "completed")
-    
-    # 3. Verb & Type
-    verb = job.get("verb") or job.get("response", {}).get("verb")
-    job_type = job.get("jobType") or job.get("response", {}).get("jobType")
-    
-    return {
-        "prompt": prompt,
-        "status": status,
-        "verb": verb,
-        "jobType": job_type
-    }
+    thumbnailer = get_thumbnailer()
+    path = thumbnailer.get(url, size)
+    if path:
+        return str(path)
+    thumbnailer.schedule(url, size)
+    return cached_media(url)
 
 
 # REMOVED: Old MidjourneyAPI class (now imported from midjourney_studio.api)
@@ -534,9 +474,10 @@ def handle_api_error(error: Exception, context: str = ""):
         if hasattr(error, 'response') and 'channel' in error.response:
             if st.button("🔄 Reset Channel"):
                 try:
-                    api = MidjourneyAPI(st.session_state.api_token)
+                    api = get_client(st.session_state.api_token)
                     status, result = api.reset_channel(error.response['channel'])
                     if status == 200:
+                        get_capacity_dispatcher(api).thaw(error.response['channel'])
                         st.success("✅ Channel reset successfully!")
                     else:
                         st.error(f"Failed to reset channel: {result}")
@@ -549,6 +490,35 @@ def handle_api_error(error: Exception, context: str = ""):
         st.error(f"Error: {str(error)}")
 
 
+# ============================================================================
+# CHANNEL ROUTING
+# ============================================================================
+
+def route_new_job(api) -> Optional[str]:
+    """Channel for a new imagine/blend/describe job: most free capacity and best health."""
+    return get_job_router(api).route(fallback=st.session_state.active_channel)
+
+
+def follow_up_channel_ready(api, parent) -> bool:
+    """
+    Check that the channel a button/seed follow-up is pinned to can take work.
+
+    Follow-ups always run on the channel that produced the parent job, so
+    they cannot be moved elsewhere when that channel is frozen or failing.
+    """
+    if isinstance(parent, str):
+        # Stored job data names the channel even when the router has not seen the job
+        parent = (st.session_state.active_jobs.get(parent)
+                  or st.session_state.job_history.get(parent) or parent)
+    router = get_job_router(api)
+    channel = router.route(parent=parent)
+    if router.available(channel):
+        return True
+    st.error(f"🔌 Channel {channel[:8]}... is unavailable ({router.unavailable_reason(channel)}). "
+             "Reset it in the sidebar to run follow-ups on this job.")
+    return False
+
+
 # ============================================================================
 # BACKWARDS COMPATIBILITY NOTES
 # ============================================================================
@@ -642,7 +612,7 @@ def render_sidebar():
         st.markdown("### 📡 Channel Status")
         if st.session_state.api_token:
             if st.button("🔄 Refresh Channels", width='stretch'):
-                api = MidjourneyAPI(st.session_state.api_token)
+                api = get_client(st.session_state.api_token)
                 status, data = api.get_accounts()
                 if status == 200:
                     st.session_state.configured_channels = data
@@ -660,12 +630,18 @@ def render_sidebar():
                         cols[0].metric("Max Jobs", ch_data.get("maxJobs", 3))
                         cols[1].metric("Image", ch_data.get("maxImageJobs", 3))
                         cols[2].metric("Video", ch_data.get("maxVideoJobs", 3))
+                        dispatcher = get_capacity_dispatcher(get_client(st.session_state.api_token))
+                        health = dispatcher.health.snapshot().get(ch_id) if dispatcher.health else None
+                        if health:
+                            st.caption(f"🩺 Health {health['health']:.0%} • circuit {health['state']}"
+                                       + (f" • {health['error']}" if health["error"] else ""))
                         
                         if ch_data.get("error"):
                             st.error(f"⚠️ {ch_data['error']}")
                             if st.button(f"Reset Channel", key=f"reset_{ch_id}"):
-                                api = MidjourneyAPI(st.session_state.api_token)
-                                api.reset_channel(ch_id)
+                                api = get_client(st.session_state.api_token)
+                                if api.reset_channel(ch_id)[0] == 200:
+                                    get_capacity_dispatcher(api).thaw(ch_id)
                                 st.rerun()
         else:
             st.info("Enter API token to view channels")
@@ -675,7 +651,7 @@ def render_sidebar():
         # Running Jobs
         st.markdown("### 🏃 Active Jobs")
         if st.session_state.active_jobs:
-            for job_id, job_data in st.session_state.active_jobs.items():
+            for job_id, job_data in list(st.session_state.active_jobs.items()):
                 status = job_data.get("status", "unknown")
                 progress = job_data.get("response", {}).get("progress_percent", 0)
                 st.markdown(f"""
@@ -1005,13 +981,14 @@ def render_creation_tab():
             st.error("Please enter your API token in the sidebar")
         else:
             with st.status("🎨 Generating...", expanded=True) as status:
-                api = MidjourneyAPI(st.session_state.api_token)
+                api = get_client(st.session_state.api_token)
                 
                 st.write("Submitting job to Midjourney...")
-                code, result = api.imagine(final_prompt, stream=False)
+                code, result = api.imagine(final_prompt, channel=route_new_job(api), stream=False)
                 
                 if code in [200, 201]:
                     job_id = result.get("jobid")
+                    get_job_router(api).remember(job_id, result)
                     st.write(f"✅ Job created: `{job_id}`")
                     st.session_state.active_jobs[job_id] = result
                     st.session_state.current_job_id = job_id
@@ -1024,7 +1001,7 @@ def render_creation_tab():
                         # Add to history
                         if final_result not in st.session_state.job_history:
                             st.session_state.job_history.insert(0, final_result)
-                            save_job_history(st.session_state.job_history)
+                            record_job(final_result)
                         
                         # === AI AUTO-PILOT LOGIC ===
                         if st.session_state.get("auto_pilot_enabled") and st.session_state.get("gemini_api_key"):
@@ -1039,7 +1016,9 @@ def render_creation_tab():
                                         # 2. Analyze
                                         ai_status.write("🧠 Analyzing grid...")
                                         context_text = st.session_state.get("ai_context", "")
-                                        best_quadrant, reasoning = analyze_and_select(img_bytes, final_prompt, context_text)
+                                        quadrants = get_quadrant_splitter().crops(img_url)
+                                        best_quadrant, reasoning = analyze_and_select(img_bytes, final_prompt, context_text,
+                                                                                      quadrants=quadrants)
                                         
                                         if best_quadrant > 0:
                                             ai_status.write(f"✅ AI Selected: Image {best_quadrant}")
@@ -1248,14 +1227,15 @@ def render_video_tab():
                 st.error("Please enter your API token in the sidebar")
             else:
                 with st.status("🎬 Creating Video (Image-to-Video)...", expanded=True) as status:
-                    api = MidjourneyAPI(st.session_state.api_token)
+                    api = get_client(st.session_state.api_token)
 
                     # Step 1: Generate the base image
                     st.write("Step 1/2: Generating base image...")
-                    code, result = api.imagine(v_final_prompt, stream=False)
+                    code, result = api.imagine(v_final_prompt, channel=route_new_job(api), stream=False)
 
                     if code in [200, 201]:
                         job_id = result.get("jobid")
+                        get_job_router(api).remember(job_id, result)
                         st.write(f"✅ Image job created: `{job_id}`")
                         st.session_state.active_jobs[job_id] = result
 
@@ -1270,7 +1250,7 @@ def render_video_tab():
                         }
                         if v_job_entry not in st.session_state.job_history:
                             st.session_state.job_history.insert(0, v_job_entry)
-                            save_job_history(st.session_state.job_history)
+                            record_job(v_job_entry)
 
                         # Poll for image completion
                         st.write("⏳ Waiting for image generation...")
@@ -1281,62 +1261,60 @@ def render_video_tab():
 
                             # Update history with image result
                             with state_lock:
-                                for i, job in enumerate(st.session_state.job_history):
-                                    if job.get("jobid") == job_id:
-                                        st.session_state.job_history[i] = image_result
-                                        break
-                                save_job_history(st.session_state.job_history)
-
-                            # Step 2: Animate the image
-                            st.write(f"Step 2/2: Animating with {v_motion} motion...")
-                            motion_level = "high" if v_motion == "high" else "low"
-                            button_action = f"Animate ({'High' if motion_level == 'high' else 'Low'} motion)"
-
-                            anim_code, anim_result = api.button(job_id, button_action, stream=False)
-
-                            if anim_code in [200, 201]:
-                                video_job_id = anim_result.get("jobid")
-                                st.write(f"✅ Animation job started: `{video_job_id}`")
-
-                                # Add animation job to history
-                                video_entry = {
-                                    "jobid": video_job_id,
-                                    "status": "started",
-                                    "verb": "video",
-                                    "type": "button",
-                                    "button": button_action,
-                                    "parent_jobid": job_id,
-                                    "prompt": v_final_prompt,
-                                    "created": datetime.now().isoformat(),
-                                    "response": anim_result
-                                }
-                                st.session_state.job_history.insert(0, video_entry)
-                                save_job_history(st.session_state.job_history)
-
-                                # Poll for video completion
-                                st.write("⏳ Rendering video animation...")
-                                video_result = poll_job_status(api, video_job_id)
-
-                                if video_result.get("status") == "completed":
-                                    # Update history
-                                    with state_lock:
-                                        for i, job in enumerate(st.session_state.job_history):
-                                            if job.get("jobid") == video_job_id:
-                                                video_result["verb"] = "video"
-                                                video_result["button"] = button_action
-                                                st.session_state.job_history[i] = video_result
-                                                break
-                                        save_job_history(st.session_state.job_history)
-
-                                    status.update(label="✅ Video Complete!", state="complete")
-                                    st.success(f"🎥 Video ready: `{video_job_id}`")
-                                    st.rerun()
-                                else:
-                                    status.update(label=f"❌ Video {video_result.get('status', 'failed')}", state="error")
-                                    st.error(f"Video generation failed: {video_result.get('error', 'Unknown')}")
+                                if st.session_state.job_history.replace(image_result):
+                                    record_job(image_result)
+
+                            # Step 2: Animate the image (on the image's channel)
+                            if not follow_up_channel_ready(api, image_result):
+                                status.update(label="⚠️ Image ready, animation skipped", state="error")
                             else:
-                                status.update(label="❌ Animation Failed", state="error")
-                                st.error(f"Failed to animate: {anim_result.get('error', 'Unknown')}")
+                                st.write(f"Step 2/2: Animating with {v_motion} motion...")
+                                motion_level = "high" if v_motion == "high" else "low"
+                                button_action = f"Animate ({'High' if motion_level == 'high' else 'Low'} motion)"
+
+                                anim_code, anim_result = api.button(job_id, button_action, stream=False)
+
+                                if anim_code in [200, 201]:
+                                    video_job_id = anim_result.get("jobid")
+                                    get_job_router(api).remember(video_job_id, anim_result, parent=image_result)
+                                    st.write(f"✅ Animation job started: `{video_job_id}`")
+
+                                    # Add animation job to history
+                                    video_entry = {
+                                        "jobid": video_job_id,
+                                        "status": "started",
+                                        "verb": "video",
+                                        "type": "button",
+                                        "button": button_action,
+                                        "parent_jobid": job_id,
+                                        "prompt": v_final_prompt,
+                                        "created": datetime.now().isoformat(),
+                                        "response": anim_result
+                                    }
+                                    st.session_state.job_history.insert(0, video_entry)
+                                    record_job(video_entry)
+
+                                    # Poll for video completion
+                                    st.write("⏳ Rendering video animation...")
+                                    video_result = poll_job_status(api, video_job_id)
+
+                                    if video_result.get("status") == "completed":
+                                        # Update history
+                                        with state_lock:
+                                            video_result["verb"] = "video"
+                                            video_result["button"] = button_action
+                                            if st.session_state.job_history.replace(video_result):
+                                                record_job(video_result)
+
+                                        status.update(label="✅ Video Complete!", state="complete")
+                                        st.success(f"🎥 Video ready: `{video_job_id}`")
+                                        st.rerun()
+                                    else:
+                                        status.update(label=f"❌ Video {video_result.get('status', 'failed')}", state="error")
+                                        st.error(f"Video generation failed: {video_result.get('error', 'Unknown')}")
+                                else:
+                                    status.update(label="❌ Animation Failed", state="error")
+                                    st.error(f"Failed to animate: {anim_result.get('error', 'Unknown')}")
                         else:
                             status.update(label=f"❌ Image {image_result.get('status', 'failed')}", state="error")
                             st.error(f"Image generation failed: {image_result.get('error', 'Unknown')}")
@@ -1372,6 +1350,80 @@ def render_video_tab():
 
 
 
+def record_batch_job(job_id: str, job_data: Dict[str, Any]):
+    """Batch engine hook (engine threads): persist completed jobs to the shared store."""
+    if job_data.get("status") == "completed":
+        record_job(job_data)
+
+
+def get_session_batch_engine() -> Optional[BatchEngine]:
+    """
+    Return the shared BatchEngine for the current API token.
+
+    The engine (and its stored queue) outlives sessions and restarts, so it
+    only writes to shared state; each session pulls the engine's job records
+    into its own history and active jobs in sync_batch_results().
+    """
+    if not st.session_state.api_token:
+        return None
+    api = get_client(st.session_state.api_token)
+    engine = st.session_state.get("batch_engine")
+    if engine is not None and engine.api is api:
+        return engine
+
+    engine = get_batch_engine(
+        api,
+        reconciler=get_job_reconciler(api),
+        callback_server=get_callback_server(),
+        analyzer=analyze_and_select,
+        dispatcher=get_capacity_dispatcher(api),
+        on_job=record_batch_job,
+    )
+    st.session_state.batch_engine = engine
+    st.session_state.batch_jobs_version = 0
+    return engine
+
+
+def sync_batch_results() -> Optional[BatchSnapshot]:
+    """Refresh st.session_state.batch_results and the session's jobs from the batch engine."""
+    engine = get_session_batch_engine()
+    if engine is None:
+        return None
+    snapshot = engine.snapshot()
+    st.session_state.batch_results = snapshot.items
+
+    version, jobs = engine.jobs_since(st.session_state.get("batch_jobs_version", 0))
+    if jobs:
+        with state_lock:
+            for job_id, job_data in jobs.items():
+                st.session_state.active_jobs[job_id] = job_data
+                if job_data.get("status") == "completed":
+                    st.session_state.job_history.upsert(job_data)
+    st.session_state.batch_jobs_version = version
+    return snapshot
+
+
+@_fragment(run_every=2)
+def render_batch_progress(engine: BatchEngine):
+    """Live batch progress, refreshed on its own every 2 seconds."""
+    snapshot = engine.snapshot()
+    st.progress(snapshot.progress)
+    if snapshot.message:
+        st.info(snapshot.message)
+    if snapshot.capacity:
+        jobs, images, videos = (snapshot.capacity[k] for k in ("jobs", "image", "video"))
+        st.caption(f"📊 **Capacity:** {jobs[0]}/{jobs[1]} jobs running • "
+                   f"🖼️ {images[0]}/{images[1]} image • 🎬 {videos[0]}/{videos[1]} video")
+    st.caption(f"{snapshot.processed}/{snapshot.total} prompts processed • "
+               f"{snapshot.count('queued')} queued • {snapshot.count('failed')} failed")
+
+    # Refresh the whole tab once when the queue drains
+    was_active = st.session_state.get("batch_was_active", False)
+    st.session_state.batch_was_active = snapshot.state != "idle"
+    if was_active and snapshot.state == "idle":
+        st.rerun()
+
+
 def render_batch_tab():
     """
     Dedicated tab for batch prompt generation.
@@ -1380,13 +1432,10 @@ def render_batch_tab():
     st.markdown("## 📋 Batch Queue")
     st.markdown("Submit multiple prompts to generate each one separately. Perfect for generating variations or a series of images.")
     
-    # Initialize batch state
-    if "batch_queue" not in st.session_state:
-        st.session_state.batch_queue = []
-    if "batch_results" not in st.session_state:
-        st.session_state.batch_results = []
-    if "batch_running" not in st.session_state:
-        st.session_state.batch_running = False
+    # Batch state lives in the background engine; batch_results mirrors its snapshot
+    engine = get_session_batch_engine()
+    snapshot = sync_batch_results()
+    batch_active = snapshot is not None and snapshot.state != "idle"
     
     # Main input area
     st.markdown("### 📝 Enter Your Prompts")
@@ -1488,241 +1537,65 @@ A magical library with floating books and glowing orbs""",
     # Capacity info
     st.info("ℹ️ **Concurrent Job Limit:** Pro/Mega plans allow **12 concurrent jobs**. Basic/Standard allow 3. Configure in Settings tab.")
     
-    btn_cols = st.columns([2, 1, 1])
+    btn_cols = st.columns([2, 1, 1, 1])
     
     with btn_cols[0]:
+        start_label = "➕ Add to Queue" if batch_active else "🚀 Start Batch Generation"
         start_batch = st.button(
-            f"🚀 Start Batch Generation ({len(prompts)} prompts)", 
+            f"{start_label} ({len(prompts)} prompts)", 
             type="primary", 
             width='stretch',
-            disabled=len(prompts) == 0 or st.session_state.batch_running
+            disabled=len(prompts) == 0
         )
     
     with btn_cols[1]:
-        stop_batch = st.button("⏹️ Stop", width='stretch',
-                               disabled=not st.session_state.batch_running)
+        if snapshot is not None and snapshot.state == "paused":
+            toggle_pause = st.button("▶️ Resume", width='stretch')
+        else:
+            toggle_pause = st.button("⏸️ Pause", width='stretch', disabled=not batch_active)
     
     with btn_cols[2]:
+        stop_batch = st.button("⏹️ Stop", width='stretch', disabled=not batch_active)
+    
+    with btn_cols[3]:
         clear_results = st.button("🗑️ Clear", width='stretch')
     
     if clear_results:
+        if engine:
+            engine.clear()
         st.session_state.batch_results = []
-        st.session_state.batch_queue = []
         st.rerun()
     
-    if stop_batch:
-        st.session_state.batch_running = False
+    if toggle_pause and engine:
+        if snapshot.state == "paused":
+            engine.resume()
+        else:
+            engine.pause()
+        st.rerun()
+    
+    if stop_batch and engine:
+        engine.cancel()
         st.warning("⏹️ Batch stopped. Jobs already submitted will continue processing.")
         st.rerun()
     
-    # Execute batch
+    # Queue the batch; the engine submits it in the background
     if start_batch and prompts:
-        if not st.session_state.api_token:
+        if not engine:
             st.error("❌ Please configure your API token in the Settings tab first!")
         else:
-            st.session_state.batch_running = True
-            st.session_state.batch_results = []
-            
-            api = MidjourneyAPI(st.session_state.api_token)
-            
-            progress_bar = st.progress(0)
-            status_container = st.empty()
-            capacity_container = st.empty()
-            results_container = st.container()
-            
-            total = len(prompts)
-            completed = 0
-            failed = 0
-            
-            # Get max jobs limit (default 12 for Pro)
-            max_concurrent = 12
-            try:
-                code, accounts_data = api.get_accounts()
-                if code == 200 and accounts_data.get("channels"):
-                    # Get maxJobs from first channel
-                    first_channel = list(accounts_data["channels"].values())[0]
-                    # Respect API's maxJobs but allow up to 12 if account is Pro
-                    api_max = first_channel.get("maxJobs", 3)
-                    max_concurrent = max(api_max, 12) 
-            except:
-                max_concurrent = 12
-            
-            for i, raw_prompt in enumerate(prompts):
-                if not st.session_state.batch_running:
-                    status_container.warning(f"⏹️ Stopped at prompt {i+1}/{total}")
-                    break
-                
-                try:
-                    # === CAPACITY CHECK: Wait for slot to open ===
-                    wait_attempts = 0
-                    max_wait_attempts = 60  # Max 5 minutes
-                    while True:
-                        if not st.session_state.batch_running: break
-                        try:
-                            code, jobs_data = api.list_running_jobs()
-                        except Exception as e:
-                            logger.error(f"Error checking running jobs: {e}")
-                            code, jobs_data = 500, {"error": str(e)}
-
-                        if code == 200:
-                            running_count = jobs_data.get("total", 0)
-                            capacity_container.info(f"📊 **Capacity:** {running_count}/{max_concurrent} jobs running")
-                            if running_count < max_concurrent: break
-                            else:
-                                wait_attempts += 1
-                                if wait_attempts > max_wait_attempts:
-                                    status_container.error("⏰ Timeout waiting for capacity.")
-                                    st.session_state.batch_running = False
-                                    break
-                                status_container.warning(f"⏳ **[{i+1}/{total}]** At capacity. Waiting ({wait_attempts * 5}s)")
-                                time.sleep(5)
-                        else:
-                            status_container.warning(f"⚠️ Could not check capacity (error {code}). Waiting 5s...")
-                            time.sleep(5)
-                            break
-                    
-                    if not st.session_state.batch_running: break
-                    
-                    # Build full prompt with params
-                    full_prompt = build_prompt(raw_prompt, batch_params)
-                    
-                    status_container.info(f"🎨 **[{i+1}/{total}]** Submitting Imagine...")
-                    logger.info(f"Batch SUBMIT [{i+1}/{total}]: {raw_prompt}")
-                    
-                    # Submit job
-                    code, result = api.imagine(full_prompt, stream=False)
-                    
-                    if code in [200, 201]:
-                        job_id = result.get("jobid")
-                        st.session_state.active_jobs[job_id] = result
-                        status_container.success(f"✅ **[{i+1}]** Imagine Submitted: `{job_id}`")
-                        
-                        batch_result = {
-                            "index": i + 1,
-                            "prompt": raw_prompt,
-                            "full_prompt": full_prompt,
-                            "jobid": job_id,
-                            "status": "submitted",
-                            "submitted_at": datetime.now().isoformat(),
-                            "anim_jobid": None,
-                            "ai_reasoning": None,
-                            "thread_status": "🚀 Submitted"
-                        }
-                        st.session_state.batch_results.append(batch_result)
-                        completed += 1
-                        
-                        # Process AI Auto-Pilot or just polling via background thread
-                        is_batch_ai = st.session_state.get("batch_auto_pilot_enabled") and st.session_state.get("gemini_api_key")
-                        
-                        # FIRE AND FORGET: Start a background thread for this job's follow-up
-                        # This allows the loop to continue immediately to the next prompt (up to capacity)
-                        context_text = st.session_state.get("batch_ai_context", "") if is_batch_ai else ""
-                        
-                        worker_thread = threading.Thread(
-                            target=run_autopilot_worker,
-                            args=(st.session_state.api_token, job_id, full_prompt, batch_result, context_text),
-                            daemon=True
-                        )
-                        add_script_run_ctx(worker_thread)
-                        worker_thread.start()
-                        
-                        status_container.success(f"✅ **[{i+1}/{total}]** Submitted: `{job_id}`. Worker started!")
-                        
-                    else:
-                        error_msg = result.get("error", "Unknown submission error")
-                        logger.error(f"Batch FAIL [{i+1}]: {error_msg} | Response: {result}")
-                        batch_result = {
-                            "index": i + 1,
-                            "prompt": raw_prompt,
-                            "status": "failed",
-                            "error": error_msg
-                        }
-                        st.session_state.batch_results.append(batch_result)
-                        with results_container:
-                            st.error(f"❌ **[{i+1}]** Failed: {error_msg}")
-                        failed += 1
-                        
-                except Exception as batch_error:
-                    logger.exception(f"Unexpected error in batch loop for prompt {i+1}")
-                    st.error(f"💥 Critical error on prompt {i+1}: {str(batch_error)}")
-                    failed += 1
-                
-                # Progress and delay
-                progress_bar.progress((i + 1) / total)
-                if i < total - 1 and wait_between > 0:
-                    for remaining in range(wait_between, 0, -1):
-                        status_container.info(f"⏳ Next job in {remaining}s...")
-                        time.sleep(1)
-            
-            st.session_state.batch_running = False
-            
-            # Summary
-            st.divider()
-            st.markdown("### 📊 Batch Summary")
-            
-            sum_cols = st.columns(4)
-            with sum_cols[0]:
-                st.metric("Total Prompts", total)
-            with sum_cols[1]:
-                st.metric("Submitted", completed)
-            with sum_cols[2]:
-                st.metric("Failed", failed)
-            with sum_cols[3]:
-                st.metric("Success Rate", f"{(completed/total*100):.0f}%")
-            
-            if completed > 0:
-                st.success(f"🎉 Batch complete! {completed} jobs submitted. Go to **Monitor** tab to track progress.")
-                
-                # Global Batch Download button
-                st.markdown("### 📥 Download Results")
-                if st.button("📦 Download All Batch Images (ZIP)", key="batch_download_all", type="primary"):
-                    # Logic to ZIP all completed jobs in history
-                    with st.status("📦 Packaging all generated files...", expanded=True) as dl_status:
-                        memory_file = BytesIO()
-                        successful_adds = 0
-                        with zipfile.ZipFile(memory_file, 'w') as zf:
-                            for idx, job in enumerate(st.session_state.job_history):
-                                attachments = job.get("response", {}).get("attachments", [])
-                                if attachments:
-                                    url = attachments[0].get("url")
-                                    dl_status.write(f"Downloading item {idx+1}...")
-                                    img_data = fetch_image_cached(url)
-                                    if img_data:
-                                        filename = attachments[0].get("filename", f"image_{idx}.png")
-                                        zf.writestr(filename, img_data)
-                                        successful_adds += 1
-                        
-                        if successful_adds > 0:
-                            memory_file.seek(0)
-                            st.download_button(
-                                label="⬇️ Click here to Download ZIP",
-                                data=memory_file,
-                                file_name=f"midjourney_batch_{int(time.time())}.zip",
-                                mime="application/zip"
-                            )
-                        else:
-                            st.error("No images found to download.")
-                
-                st.balloons()
-
-            # Detailed Process Log
-            with st.expander("📝 Detailed Process Log", expanded=False):
-                for res in st.session_state.batch_results:
-                    idx = res.get("index")
-                    status = res.get("status")
-                    p = res.get("prompt")
-                    if status == "failed":
-                        st.error(f"**[{idx}]** {p} — ❌ Failed: {res.get('error')}")
-                    else:
-                        st.write(f"**[{idx}]** {p} — ✅ Submitted (`{res.get('jobid')[:10]}...`)")
-                        if res.get("ai_reasoning"):
-                            st.info(f"   🤖 AI: {res.get('ai_reasoning')}")
-                        if res.get("anim_jobid"):
-                            st.write(f"   🎬 Animation: `{res.get('anim_jobid')[:10]}...`")
-                        
-                        # Show Background Worker Status
-                        t_status = res.get("thread_status", "Unknown")
-                        st.caption(f"   ⚙️ Worker: **{t_status}**")
+            is_batch_ai = bool(st.session_state.get("batch_auto_pilot_enabled") and st.session_state.get("gemini_api_key"))
+            engine.enqueue(
+                prompts, batch_params,
+                delay=wait_between,
+                autopilot=is_batch_ai,
+                context=st.session_state.get("batch_ai_context", "") if is_batch_ai else "",
+                wait_for_completion=auto_poll
+            )
+            logger.info(f"Batch queued: {len(prompts)} prompts")
+            st.rerun()
+    
+    if engine and (batch_active or snapshot.items):
+        render_batch_progress(engine)
     
     # Display existing results
     if st.session_state.batch_results:
@@ -1742,9 +1615,67 @@ A magical library with floating books and glowing orbs""",
         with stat_cols[2]:
             st.metric("Failed", failed)
         with stat_cols[3]:
-            status = "🔄 Running" if st.session_state.batch_running else "✅ Complete"
+            status = {"running": "🔄 Running", "paused": "⏸️ Paused"}.get(snapshot.state, "✅ Complete") \
+                if snapshot else "✅ Complete"
             st.metric("Status", status)
         
+        if submitted > 0:
+            # Global Batch Download button
+            st.markdown("### 📥 Download Results")
+            if st.button("📦 Download All Batch Images (ZIP)", key="batch_download_all", type="primary"):
+                # Logic to ZIP all completed jobs in history
+                with st.status("📦 Packaging all generated files...", expanded=True) as dl_status:
+                    urls, filenames = [], []
+                    for idx, job in enumerate(st.session_state.job_history):
+                        attachments = job.get("response", {}).get("attachments", [])
+                        if attachments and attachments[0].get("url"):
+                            urls.append(attachments[0].get("url"))
+                            filenames.append(attachments[0].get("filename", f"image_{idx}.png"))
+
+                    export = ZipExport()
+                    successful_adds = 0
+                    with export:
+                        for result in Downloader().iter_downloads(
+                            urls,
+                            on_progress=lambda done, total, r: dl_status.update(
+                                label=f"📦 Downloaded {done}/{total} files...")
+                        ):
+                            if result.ok:
+                                export.add(filenames[result.index], result.data)
+                                successful_adds += 1
+                
+                    if successful_adds > 0:
+                        st.download_button(
+                            label="⬇️ Click here to Download ZIP",
+                            data=export.read(),
+                            file_name=f"midjourney_batch_{int(time.time())}.zip",
+                            mime="application/zip"
+                        )
+                    else:
+                        st.error("No images found to download.")
+                    export.close()
+
+        # Detailed Process Log
+        with st.expander("📝 Detailed Process Log", expanded=False):
+            for res in st.session_state.batch_results:
+                idx = res.get("index")
+                status = res.get("status")
+                p = res.get("prompt")
+                if status == "failed":
+                    st.error(f"**[{idx}]** {p} — ❌ Failed: {res.get('error')}")
+                elif not res.get("jobid"):
+                    st.write(f"**[{idx}]** {p} — {res.get('thread_status')}")
+                else:
+                    st.write(f"**[{idx}]** {p} — ✅ Submitted (`{res.get('jobid')[:10]}...`)")
+                    if res.get("ai_reasoning"):
+                        st.info(f"   🤖 AI: {res.get('ai_reasoning')}")
+                    if res.get("anim_jobid"):
+                        st.write(f"   🎬 Animation: `{res.get('anim_jobid')[:10]}...`")
+                    
+                    # Show Background Worker Status
+                    t_status = res.get("thread_status", "Unknown")
+                    st.caption(f"   ⚙️ Worker: **{t_status}**")
+
         # === BATCH RESULTS GALLERY (FIRST - most important) ===
         st.divider()
         st.markdown("### 🖼️ Generated Images")
@@ -1755,9 +1686,10 @@ A magical library with floating books and glowing orbs""",
         
         # Fetch and display images for completed jobs
         if st.session_state.api_token:
-            api = MidjourneyAPI(st.session_state.api_token)
+            api = get_client(st.session_state.api_token)
             
             submitted_jobs = [r for r in st.session_state.batch_results if r.get("jobid")]
+            reconciler = get_job_reconciler(api)
             
             if submitted_jobs:
                 # Progress tracking
@@ -1769,19 +1701,20 @@ A magical library with floating books and glowing orbs""",
                     job_id = batch_result.get("jobid")
                     prompt = batch_result.get("prompt", "")[:50]
                     
-                    # Fetch current job status
-                    code, job_data = api.get_job(job_id)
+                    # The shared reconciler covers every batch job with one
+                    # list_running_jobs() per tick; this just reads its cache.
+                    reconciler.track(job_id)
+                    job_data = reconciler.get(job_id)
                     
-                    if code == 200:
+                    if job_data:
                         status = job_data.get("status", "unknown")
                         
                         if status == "completed":
                             completed_count += 1
                             # Add to history if not present (handled already in loop, but keeping for display refresh)
-                            hist_ids = {j.get("jobid") for j in st.session_state.job_history}
-                            if job_data.get("jobid") not in hist_ids:
+                            if job_data.get("jobid") not in st.session_state.job_history:
                                 st.session_state.job_history.insert(0, job_data)
-                                save_job_history(st.session_state.job_history)
+                                record_job(job_data)
 
                             response = job_data.get("response", {})
                             attachments = response.get("attachments", [])
@@ -1804,12 +1737,12 @@ A magical library with floating books and glowing orbs""",
                                 if anim_url:
                                     img_col, vid_col = st.columns(2)
                                     with img_col:
-                                        st.image(attachments[0].get("url"), width='stretch', caption="Original Grid")
+                                        st.image(thumbnail_media(attachments[0].get("url"), "large"), width='stretch', caption="Original Grid")
                                     with vid_col:
                                         st.video(anim_url)
                                         st.success(f"🎬 [Download Video]({anim_url})")
                                 else:
-                                    st.image(attachments[0].get("url"), width='stretch')
+                                    st.image(thumbnail_media(attachments[0].get("url"), "large"), width='stretch')
                                     # Fallback manual polling display for anim_id if url not yet in thread state
                                     anim_id = batch_result.get("anim_jobid")
                                     if anim_id:
@@ -1820,14 +1753,23 @@ A magical library with floating books and glowing orbs""",
                                         else:
                                              st.warning(f"🎬 Animation in progress: **{t_status}**")
                                 
-                                # Individual Upscales (simplified list)
+                                # Individual Upscales (simplified list), cropped locally when possible
                                 image_ux = response.get("imageUx", [])
-                                if image_ux:
+                                splitter = get_quadrant_splitter()
+                                quadrant_previews = splitter.previews(attachments[0].get("url"))
+                                if quadrant_previews is None:
+                                    splitter.schedule(attachments[0].get("url"))
+                                if quadrant_previews or image_ux:
                                     with st.expander("🔍 View Separate Quadrants"):
                                         ux_cols = st.columns(4)
-                                        for idx, img in enumerate(image_ux[:4]):
-                                            with ux_cols[idx]:
-                                                st.image(img.get("url"), width='stretch')
+                                        if quadrant_previews:
+                                            for idx, path in enumerate(quadrant_previews):
+                                                with ux_cols[idx]:
+                                                    st.image(str(path), width='stretch', caption=f"U{idx + 1}")
+                                        else:
+                                            for idx, img in enumerate(image_ux[:4]):
+                                                with ux_cols[idx]:
+                                                    st.image(thumbnail_media(img.get("url")), width='stretch')
                                 
                                 st.divider()
                         
@@ -1879,10 +1821,7 @@ def render_image_results():
     if not job_data:
         # Try to get from history
         if st.session_state.job_history:
-            completed_jobs = [j for j in st.session_state.job_history 
-                           if j.get("status") == "completed" and j.get("verb") == "imagine"]
-            if completed_jobs:
-                job_data = completed_jobs[0]
+            job_data = st.session_state.job_history.latest(status="completed", verb="imagine")
     
     if not job_data:
         st.info("No generated images yet. Create your first image above!")
@@ -1970,12 +1909,16 @@ def execute_button_action(job_id: str, button: str):
         return
     
     with st.status(f"Executing {button}...", expanded=True) as status:
-        api = MidjourneyAPI(st.session_state.api_token)
+        api = get_client(st.session_state.api_token)
+        if not follow_up_channel_ready(api, job_id):
+            status.update(label="❌ Channel unavailable", state="error")
+            return
         
         code, result = api.button(job_id, button, stream=False)
         
         if code in [200, 201]:
             new_job_id = result.get("jobid")
+            get_job_router(api).remember(new_job_id, result, parent=job_id)
             st.write(f"✅ Action submitted: `{new_job_id}`")
             
             # Poll for completion
@@ -1999,12 +1942,16 @@ def extract_seed(job_id: str):
         return
     
     with st.status("Extracting seed...", expanded=True) as status:
-        api = MidjourneyAPI(st.session_state.api_token)
+        api = get_client(st.session_state.api_token)
+        if not follow_up_channel_ready(api, job_id):
+            status.update(label="❌ Channel unavailable", state="error")
+            return
         
         code, result = api.seed(job_id, stream=False)
         
         if code in [200, 201]:
             seed_job_id = result.get("jobid")
+            get_job_router(api).remember(seed_job_id, result, parent=job_id)
             
             # Poll for completion
             final_result = poll_job_status(api, seed_job_id)
@@ -2028,44 +1975,6 @@ def extract_seed(job_id: str):
 
 
 
-def trigger_video_animation_silent(api_token: str, job_data: dict, motion: str = "high") -> Optional[str]:
-    """
-    Background-safe version of video animation trigger using button API.
-    No Streamlit UI elements (st.status, st.error, etc.) used.
-
-    Args:
-        api_token: API token
-        job_data: Job data containing jobid
-        motion: "high" or "low" for motion intensity
-
-    Returns:
-        New job ID if successful, None otherwise
-    """
-    if not api_token:
-        return None
-
-    job_id = job_data.get("jobid")
-    if not job_id:
-        logger.error("No jobid found in job_data for animation")
-        return None
-
-    # Determine button action
-    button_action = "Animate (High motion)" if motion == "high" else "Animate (Low motion)"
-
-    try:
-        api = MidjourneyAPI(api_token)
-        code, result = api.button(job_id, button_action, stream=False)
-
-        if code in [200, 201]:
-            new_job_id = result.get("jobid")
-            logger.info(f"Video animation triggered: {new_job_id} (from {job_id})")
-            return new_job_id
-    except Exception as e:
-        logger.exception(f"Silent animation trigger failed for job {job_id}")
-
-    return None
-
-
 def create_video_animation(job_id: str, job_data: dict, motion: str = "high"):
     """
     Create a video animation using MidJourney's image-to-video workflow.
@@ -2086,19 +1995,24 @@ def create_video_animation(job_id: str, job_data: dict, motion: str = "high"):
     button_action = "Animate (High motion)" if motion == "high" else "Animate (Low motion)"
 
     with st.status(f"🎥 Creating video animation ({motion} motion)...", expanded=True) as status:
-        api = MidjourneyAPI(st.session_state.api_token)
+        api = get_client(st.session_state.api_token)
 
         status.write(f"Triggering {button_action} on image...")
+        parent = {"jobid": job_id, **(job_data or {})}
+        if not follow_up_channel_ready(api, parent):
+            status.update(label="❌ Channel unavailable", state="error")
+            return
 
         # Use the button API to trigger animation
         code, result = api.button(job_id, button_action, stream=False)
 
         if code in [200, 201]:
             new_job_id = result.get("jobid")
+            get_job_router(api).remember(new_job_id, result, parent=parent)
             st.session_state.active_jobs[new_job_id] = result
 
             # Add to history immediately so it appears
-            st.session_state.job_history.insert(0, {
+            video_entry = {
                 "jobid": new_job_id,
                 "status": "started",
                 "type": "button",
@@ -2107,8 +2021,9 @@ def create_video_animation(job_id: str, job_data: dict, motion: str = "high"):
                 "parent_jobid": job_id,
                 "created": datetime.now().isoformat(),
                 "response": result
-            })
-            save_job_history(st.session_state.job_history)
+            }
+            st.session_state.job_history.insert(0, video_entry)
+            record_job(video_entry)
 
             # Poll for completion
             status.write("⏳ Rendering video animation...")
@@ -2117,14 +2032,11 @@ def create_video_animation(job_id: str, job_data: dict, motion: str = "high"):
             if final_result.get("status") == "completed":
                 # Update history with final result
                 with state_lock:
-                    for i, job in enumerate(st.session_state.job_history):
-                        if job.get("jobid") == new_job_id:
-                            # Preserve video verb
-                            final_result["verb"] = "video"
-                            final_result["button"] = button_action
-                            st.session_state.job_history[i] = final_result
-                            break
-                    save_job_history(st.session_state.job_history)
+                    # Preserve video verb
+                    final_result["verb"] = "video"
+                    final_result["button"] = button_action
+                    if st.session_state.job_history.replace(final_result):
+                        record_job(final_result)
 
                 status.update(label=f"✅ Video Animation Complete!", state="complete")
                 st.success(f"🎥 Video ready: `{new_job_id}`")
@@ -2137,79 +2049,6 @@ def create_video_animation(job_id: str, job_data: dict, motion: str = "high"):
             st.error(f"Failed to start animation: {result.get('error', 'Unknown error')}")
 
 
-def run_autopilot_worker(api_token: str, job_id: str, full_prompt: str, batch_result: dict, context_text: str = ""):
-    """
-    Background worker to handle polling, AI selection, and animation for a batch job.
-    """
-    try:
-        api = MidjourneyAPI(api_token)
-        
-        # 1. Poll for completion
-        batch_result["thread_status"] = "⏳ Polling..."
-        final_result = poll_job_status(api, job_id)
-        
-        if final_result.get("status") == "completed":
-            batch_result["thread_status"] = "✅ Imagine Complete"
-            
-            # Save to global history (avoid duplicates)
-            # Note: Using session_state in a thread requires add_script_run_ctx
-            if "job_history" in st.session_state:
-                with state_lock:
-                    hist_ids = {j.get("jobid") for j in st.session_state.job_history}
-                    if job_id not in hist_ids:
-                        st.session_state.job_history.insert(0, final_result)
-                        save_job_history(st.session_state.job_history)
-            
-            # 2. AI Auto-Pilot Analysis
-            img_url = final_result.get("response", {}).get("attachments", [{}])[0].get("url")
-            if img_url:
-                batch_result["thread_status"] = "🧠 Analyzing..."
-                img_bytes = fetch_image_cached(img_url)
-                if img_bytes:
-                    best_quadrant, reasoning = analyze_and_select(img_bytes, full_prompt, context_text)
-                    batch_result["ai_reasoning"] = reasoning
-                    
-                    if best_quadrant > 0:
-                        batch_result["thread_status"] = f"🎯 Selected Q{best_quadrant}. Animating..."
-                        anim_id = trigger_video_animation_silent(api_token, final_result)
-                        if anim_id:
-                            batch_result["anim_jobid"] = anim_id
-                            # POLL FOR ANIMATION AS WELL
-                            batch_result["thread_status"] = "🎬 Video Polling..."
-                            anim_final = poll_job_status(api, anim_id)
-                            
-                            if anim_final.get("status") == "completed":
-                                video_url = get_video_url(anim_final)
-                                
-                                if video_url:
-                                    batch_result["anim_url"] = video_url
-                                    batch_result["thread_status"] = "✨ Animation Ready"
-                                    
-                                    # Save video to history too
-                                    if "job_history" in st.session_state:
-                                        with state_lock:
-                                            st.session_state.job_history.insert(0, anim_final)
-                                            save_job_history(st.session_state.job_history)
-                                else:
-                                    batch_result["thread_status"] = "⚠️ Video complete, no URL"
-                            else:
-                                batch_result["thread_status"] = f"❌ Animation {anim_final.get('status')}"
-                        else:
-                            batch_result["thread_status"] = "❌ Animation Trigger Failed"
-                    else:
-                        batch_result["thread_status"] = "⚠️ AI No Selection"
-                else:
-                    batch_result["thread_status"] = "❌ Image Download Failed"
-            else:
-                batch_result["thread_status"] = "❌ No Image URL Found"
-        else:
-            batch_result["thread_status"] = f"❌ Error: {final_result.get('status')}"
-            
-    except Exception as e:
-        logger.exception(f"Error in autopilot worker for job {job_id}")
-        batch_result["thread_status"] = f"💥 Error: {str(e)}"
-
-
 def render_fusion_tab():
     """
     Render the Fusion (Blend) tab.
@@ -2263,7 +2102,7 @@ def render_fusion_tab():
             st.error("Please enter your API token in the sidebar")
         else:
             with st.status("🔀 Blending images...", expanded=True) as status:
-                api = MidjourneyAPI(st.session_state.api_token)
+                api = get_client(st.session_state.api_token)
                 
                 # Prepare files for multipart upload
                 # Ref: post-midjourney-jobs-blend.md - imageBlob_1, imageBlob_2, etc.
@@ -2273,10 +2112,11 @@ def render_fusion_tab():
                     files.append((f.name, f.getvalue(), content_type))
                 
                 st.write(f"Uploading {len(files)} images...")
-                code, result = api.blend(files, dimensions=dimensions, stream=False)
+                code, result = api.blend(files, dimensions=dimensions, channel=route_new_job(api), stream=False)
                 
                 if code in [200, 201]:
                     job_id = result.get("jobid")
+                    get_job_router(api).remember(job_id, result)
                     st.write(f"✅ Blend job created: `{job_id}`")
                     
                     # Poll for completion
@@ -2342,7 +2182,7 @@ def render_analysis_tab():
             st.error("Please enter your API token in the sidebar")
         else:
             with st.status("🔍 Analyzing image...", expanded=True) as status:
-                api = MidjourneyAPI(st.session_state.api_token)
+                api = get_client(st.session_state.api_token)
                 
                 # Upload using imageBlob
                 # Ref: post-midjourney-jobs-describe.md
@@ -2352,11 +2192,13 @@ def render_analysis_tab():
                     uploaded_file.getvalue(),
                     uploaded_file.name,
                     content_type,
+                    channel=route_new_job(api),
                     stream=False
                 )
                 
                 if code in [200, 201]:
                     job_id = result.get("jobid")
+                    get_job_router(api).remember(job_id, result)
                     st.write(f"✅ Analysis job created: `{job_id}`")
                     
                     # Poll for completion
@@ -2410,160 +2252,29 @@ def render_gallery_tab():
         st.session_state.gallery_selection = set()
         
     # === GATHER ITEMS FIRST ===
-    # This allows "Select All" to function correctly
-    
-    all_items = []
-    seen_urls = set()
-    
+    # This allows "Select All" to function correctly. The index is built once
+    # per session and follows job_history changes, so reruns only re-filter.
+    index = st.session_state.get("gallery_index")
+    if index is None or not index.is_for(st.session_state.job_history):
+        if index is not None:
+            index.close()
+        index = GalleryIndex(st.session_state.job_history, searcher=get_job_store())
+        st.session_state.gallery_index = index
+    sync_batch_results()
+    index.sync_batch(st.session_state.batch_results, st.session_state.active_jobs)
+
     filter_val = st.session_state.gallery_filter
-    search_val = st.session_state.gallery_search.lower() if st.session_state.gallery_search else ""
-    
-    # 1. From Job History
-    for job in st.session_state.job_history:
-        meta = extract_job_metadata(job)
-        prompt = meta["prompt"]
-        status = meta["status"]
-        verb = meta["verb"]
-        job_type_val = meta["jobType"]
-        
-        # Check search value before proceeding
-        if search_val and search_val not in prompt.lower():
-            continue
-            
-        response = job.get("response", {})
-        attachments = response.get("attachments", [])
-        
-        if status in ["started", "progressing", "progress"] and not attachments:
-            # Add a placeholder for in-progress jobs
-            all_items.append({
-                "url": None,
-                "prompt": prompt,
-                "type": "pending",
-                "verb": verb,
-                "jobType": job_type_val,
-                "status": status,
-                "progress": job.get("progress_percent", 0),
-                "timestamp": job.get("created"),
-                "id": job.get("jobid")
-            })
-            continue
-
-        for att in attachments:
-            url = att.get("url")
-            if not url or url in seen_urls: continue
-            
-            is_grid = "grid" in att.get("filename", "").lower()
-            if filter_val == "Upscales" and is_grid: continue
-            if filter_val == "Grids" and not is_grid: continue
-            
-            seen_urls.add(url)
-            
-            # Detect type using robust utility
-            item_info = {
-                "url": url, 
-                "verb": verb, 
-                "type": job.get("type"),
-                "jobType": job_type_val,
-                "prompt": prompt
-            }
-            is_video = is_video_item(item_info)
-            item_type = "video" if is_video else ("grid" if is_grid else "upscale")
-            
-            all_items.append({
-                "url": url,
-                "prompt": prompt,
-                "type": item_type,
-                "verb": verb,
-                "jobType": job_type_val,
-                "timestamp": job.get("created"),
-                "id": job.get("jobid")
-            })
-
-    # 2. From Batch Results
-    for batch_res in st.session_state.batch_results:
-        prompt = batch_res.get("prompt", "")
-        if search_val and search_val not in prompt.lower():
-            continue
-            
-        job_id = batch_res.get("jobid")
-        if not job_id: continue
-        
-        # Check if we have the job data cached in st.session_state.active_jobs
-        job_data = st.session_state.active_jobs.get(job_id)
-        if job_data:
-            meta = extract_job_metadata(job_data)
-            p_text = meta["prompt"]
-            status = meta["status"]
-            verb = meta["verb"]
-            job_type_val = meta["jobType"]
-            
-            if status == "completed":
-                response = job_data.get("response", {})
-                attachments = response.get("attachments", [])
-                for att in attachments:
-                    url = att.get("url")
-                    if not url or url in seen_urls: continue
-                    
-                    is_grid = "grid" in att.get("filename", "").lower()
-                    if filter_val == "Upscales" and is_grid: continue
-                    if filter_val == "Grids" and not is_grid: continue
-                    
-                    seen_urls.add(url)
-                    
-                    # Detect type using robust utility
-                    item_info = {
-                        "url": url, 
-                        "verb": verb, 
-                        "jobType": job_type_val, 
-                        "prompt": p_text,
-                        "type": job_data.get("type"),
-                        "response": job_data.get("response")
-                    }
-                    is_video = is_video_item(item_info)
-                    item_type = "video" if is_video else ("grid" if is_grid else "upscale")
-                    
-                    all_items.append({
-                        "url": url,
-                        "prompt": p_text,
-                        "type": item_type,
-                        "verb": verb,
-                        "jobType": job_type_val,
-                        "timestamp": batch_res.get("submitted_at"),
-                        "id": job_id
-                    })
-            elif status in ["started", "progressing", "progress"]:
-                # Pending batch job
-                item_info = {
-                    "url": None, 
-                    "verb": verb, 
-                    "jobType": job_type_val, 
-                    "prompt": p_text,
-                    "type": "pending",
-                    "response": job_data.get("response")
-                }
-                if is_video_item(item_info) or filter_val != "Videos":
-                    all_items.append({
-                        "url": None,
-                        "prompt": p_text,
-                        "type": "pending",
-                        "verb": verb,
-                        "jobType": job_type_val,
-                        "status": status,
-                        "timestamp": batch_res.get("submitted_at"),
-                        "id": job_id
-                    })
-
-        # Check for automated animation from this batch result
-        anim_url = batch_res.get("anim_url")
-        if anim_url and anim_url not in seen_urls:
-            seen_urls.add(anim_url)
-            all_items.append({
-                "url": anim_url,
-                "prompt": prompt,
-                "type": "video",
-                "timestamp": batch_res.get("submitted_at"),
-                "id": batch_res.get("anim_jobid")
-            })
+    all_items = index.query(filter_val, st.session_state.gallery_search)
+
+    # Only the pages up to the "load more" cursor are rendered; the cursor
+    # resets whenever the view (filter, search, page size) changes
+    page_size = st.session_state.gallery_page_size
+    view = (filter_val, st.session_state.gallery_search, page_size)
+    if st.session_state.get("gallery_view") != view:
+        st.session_state.gallery_view = view
+        st.session_state.gallery_cursor = page_size
+    visible_items, total_items = index.window(filter_val, st.session_state.gallery_search,
+                                              st.session_state.gallery_cursor)
 
     # === CONTROLS ===
     col1, col2, col3, col4, col5 = st.columns([3, 2, 2, 1, 2])
@@ -2572,7 +2283,7 @@ def render_gallery_tab():
         # Search
         search = st.text_input("🔍 Search Prompts", 
                               value=st.session_state.gallery_search,
-                              placeholder="Search prompts...", 
+                              placeholder="Search prompts, e.g. cat --ar 16:9", 
                               label_visibility="hidden")
         if search != st.session_state.gallery_search:
             st.session_state.gallery_search = search
@@ -2580,7 +2291,7 @@ def render_gallery_tab():
             
     with col2:
         # Filter
-        options = ["All", "Videos", "Upscales", "Grids", "Submitted"]
+        options = GALLERY_FILTERS
         try:
             idx = options.index(filter_val)
         except ValueError:
@@ -2594,10 +2305,6 @@ def render_gallery_tab():
              st.session_state.gallery_filter = new_filter
              st.rerun()
 
-    # Re-apply filtering for Videos if selected
-    if filter_val == "Videos":
-        all_items = [item for item in all_items if item.get("type") == "video" or is_video_item(item)]
-        
     with col3:
         # Selection
         cols_sel = st.columns(2)
@@ -2621,18 +2328,20 @@ def render_gallery_tab():
 
     with col4:
         # Bulk Download
+        # We use a hash of the selection to check if it changed; a prepared
+        # archive for a different selection is dropped along with its temp file
+        current_selection_hash = hash(frozenset(st.session_state.gallery_selection))
+        if st.session_state.get("prepared_zip_hash") != current_selection_hash:
+            discard_prepared_zip()
+
         if st.session_state.gallery_selection:
-            # Check if we have a prepared zip for this specific selection
-            # We use a hash of the selection to check if it changed
-            current_selection_hash = hash(frozenset(st.session_state.gallery_selection))
             prepared_zip = st.session_state.get("prepared_zip")
-            prepared_hash = st.session_state.get("prepared_zip_hash")
             
             # If ZIP is ready and matches current selection
-            if prepared_zip and prepared_hash == current_selection_hash:
+            if prepared_zip:
                 st.download_button(
                     label=f"⬇️ Save ZIP",
-                    data=prepared_zip,
+                    data=prepared_zip.read(),
                     file_name=f"midjourney_gallery_{int(time.time())}.zip",
                     mime="application/zip",
                     width='stretch',
@@ -2642,35 +2351,36 @@ def render_gallery_tab():
                 # Show Prepare Button
                 if st.button(f"📦 Zip ({len(st.session_state.gallery_selection)})", width='stretch'):
                     progress_bar = st.progress(0, text="Starting download...")
-                    total_items = len(st.session_state.gallery_selection)
                     
-                    memory_file = BytesIO()
+                    # Entries are streamed into a spooled temp file as downloads complete
+                    export = ZipExport()
                     successful_adds = 0
                     
-                    with zipfile.ZipFile(memory_file, 'w') as zf:
-                        for i, url in enumerate(st.session_state.gallery_selection):
-                            progress_bar.progress((i + 1) / total_items, text=f"Downloading image {i+1}/{total_items}...")
-                            try:
-                                img_data = fetch_image_cached(url)
-                                if not img_data:
-                                    continue # Skip empty/failed downloads
-                                    
-                                filename = url.split("/")[-1].split("?")[0]
-                                if not filename.endswith(('.png', '.jpg', '.webp')):
-                                    filename = f"image_{int(time.time())}_{i}.png"
-                                zf.writestr(filename, img_data)
-                                successful_adds += 1
-                            except Exception as e:
-                                logger.error(f"Failed to zip image {url}: {e}")
+                    selection = list(st.session_state.gallery_selection)
+                    with export:
+                        for result in Downloader().iter_downloads(
+                            selection,
+                            on_progress=lambda done, total, r: progress_bar.progress(
+                                done / total, text=f"Downloading image {done}/{total}...")
+                        ):
+                            if not result.ok:
+                                continue # Skip empty/failed downloads
+                            url = result.url
+                            filename = url.split("/")[-1].split("?")[0]
+                            if not filename.lower().endswith(('.png', '.jpg', '.jpeg', '.webp', '.mp4')):
+                                filename = f"image_{int(time.time())}_{result.index}.png"
+                            export.add(filename, result.data)
+                            successful_adds += 1
                     
                     progress_bar.empty()
                     
                     if successful_adds > 0:
-                        memory_file.seek(0)
-                        st.session_state["prepared_zip"] = memory_file
+                        export.read()  # read the archive once; reruns reuse the bytes
+                        st.session_state["prepared_zip"] = export
                         st.session_state["prepared_zip_hash"] = current_selection_hash
                         st.rerun()
                     else:
+                        export.close()
                         st.error("Could not download any images. Links may be expired.")
         else:
              st.button("⬇️ Save (0)", disabled=True, width='stretch')
@@ -2679,27 +2389,32 @@ def render_gallery_tab():
         # Download All History button
         if st.button("📦 Download All", help="Zips entire app history", width='stretch'):
             with st.status("📦 Zipping all local history...", expanded=True) as status:
-                memory_file = BytesIO()
+                urls, fnames = [], []
+                for i, job in enumerate(st.session_state.job_history):
+                    atts = job.get("response", {}).get("attachments", [])
+                    if atts and atts[0].get("url"):
+                        urls.append(atts[0].get("url"))
+                        fnames.append(atts[0].get("filename", f"file_{i}.png"))
+
+                export = ZipExport()
                 added = 0
-                with zipfile.ZipFile(memory_file, 'w') as zf:
-                    for i, job in enumerate(st.session_state.job_history):
-                        atts = job.get("response", {}).get("attachments", [])
-                        if atts:
-                            url = atts[0].get("url")
-                            status.write(f"Adding item {i+1}...")
-                            data = fetch_image_cached(url)
-                            if data:
-                                fname = atts[0].get("filename", f"file_{i}.png")
-                                zf.writestr(fname, data)
-                                added += 1
+                with export:
+                    for result in Downloader().iter_downloads(
+                        urls,
+                        on_progress=lambda done, total, r: status.update(
+                            label=f"📦 Zipping {done}/{total} files...")
+                    ):
+                        if result.ok:
+                            export.add(fnames[result.index], result.data)
+                            added += 1
                 
                 if added > 0:
-                    memory_file.seek(0)
-                    st.download_button("⬇️ DL All History", data=memory_file, 
+                    st.download_button("⬇️ DL All History", data=export.read(), 
                                        file_name=f"midjourney_full_history_{int(time.time())}.zip",
                                        mime="application/zip")
                 else:
                     st.error("Nothing to download.")
+                export.close()
 
     st.divider()
 
@@ -2707,19 +2422,48 @@ def render_gallery_tab():
         st.info("No images found in gallery. Generate some images first!")
         return
 
-    # Display Grid
+    # Display Grid, one fragment per page so widgets on a page only rerun that page
+    for start, end in page_spans(len(visible_items), page_size):
+        render_gallery_page(visible_items[start:end], start)
+
+    col_info, col_size, col_more = st.columns([3, 1, 1])
+    with col_info:
+        st.caption(f"Showing {len(visible_items)} of {total_items} items")
+    with col_size:
+        st.selectbox("Page size", PAGE_SIZES, key="gallery_page_size", label_visibility="collapsed")
+    with col_more:
+        if len(visible_items) < total_items:
+            if st.button("⬇️ Load more", width='stretch'):
+                st.session_state.gallery_cursor += page_size
+                st.rerun()
+
+
+def toggle_gallery_selection(url: str, key: str):
+    """Select checkbox callback: update the selection and drop the now stale ZIP."""
+    if st.session_state.get(key):
+        st.session_state.gallery_selection.add(url)
+    else:
+        st.session_state.gallery_selection.discard(url)
+    discard_prepared_zip()
+    st.session_state.gallery_selection_changed = True
+
+
+@_fragment
+def render_gallery_page(items: List[Dict[str, Any]], start: int):
+    """Render one page of gallery items; `start` is the page's offset in the gallery."""
+    if st.session_state.pop("gallery_selection_changed", False):
+        # The Zip/Save counts and the prepared ZIP live outside this fragment
+        st.rerun()
     cols = st.columns(4)
-    for i, item in enumerate(all_items):
-        with cols[i % 4]:
+    for offset, item in enumerate(items):
+        i = start + offset
+        with cols[offset % 4]:
             if item.get("type") == "pending":
                 st.info(f"⏳ Processing...")
                 st.write(f"_{item['status']}_ ({item.get('progress', 0)}%)")
                 st.caption(f"ID: {item['id'][:10]}...")
             else:
-                # Detect video vs image using robust utility
-                is_video = is_video_item(item)
-                
-                if is_video:
+                if item["is_video"]:
                     st.markdown("""
                     <div style="background-color: #ff4b4b; color: white; padding: 2px 8px; border-radius: 4px; font-weight: bold; width: fit-content; margin-bottom: 5px;">
                         🎥 VIDEO
@@ -2727,18 +2471,15 @@ def render_gallery_tab():
                     """, unsafe_allow_html=True)
                     st.video(item["url"])
                 else:
-                    st.image(item["url"], width='stretch')
+                    st.image(thumbnail_media(item["url"]), width='stretch')
             
             # Selection Checkbox (only for completed items)
             if item.get("type") != "pending" and item.get("url"):
                 sel_key = f"sel_{item['url']}"
                 is_selected = item["url"] in st.session_state.gallery_selection
                 
-                if st.checkbox("Select", key=sel_key, value=is_selected):
-                    st.session_state.gallery_selection.add(item["url"])
-                else:
-                     if item["url"] in st.session_state.gallery_selection:
-                          st.session_state.gallery_selection.remove(item["url"])
+                st.checkbox("Select", key=sel_key, value=is_selected,
+                            on_change=toggle_gallery_selection, args=(item["url"], sel_key))
              
             # Animate Button for Gallery Items
             if st.button("🎥", key=f"gal_anim_{i}", help="Animate this image"):
@@ -2751,10 +2492,7 @@ def render_gallery_tab():
                  job_data = st.session_state.active_jobs.get(job_id)
                  if not job_data:
                      # Try history
-                     for h in st.session_state.job_history:
-                         if h.get("jobid") == job_id:
-                             job_data = h
-                             break
+                     job_data = st.session_state.job_history.get(job_id)
                  
                  if job_data:
                      create_video_animation(job_id, job_data)
@@ -2764,6 +2502,16 @@ def render_gallery_tab():
             with st.expander("Details"):
                 st.caption(item["prompt"][:100])
                 st.caption(f"{item['type'].upper()} • {format_elapsed_time(item['timestamp']) if item.get('timestamp') else ''}")
+                if item.get("is_grid"):
+                    splitter = get_quadrant_splitter()
+                    quadrant_previews = splitter.previews(item["url"])
+                    if quadrant_previews is None:
+                        splitter.schedule(item["url"])
+                    else:
+                        q_cols = st.columns(2)
+                        for idx, path in enumerate(quadrant_previews):
+                            with q_cols[idx % 2]:
+                                st.image(str(path), width='stretch', caption=f"U{idx + 1}")
 
 
 def render_settings_tab():
@@ -2825,7 +2573,7 @@ def render_api_configuration():
             st.error("Both API token and Discord token are required")
         else:
             with st.spinner("Configuring channel..."):
-                api = MidjourneyAPI(st.session_state.api_token)
+                api = get_client(st.session_state.api_token)
                 code, result = api.configure_channel(
                     discord_token,
                     max_jobs=max_jobs,
@@ -2845,7 +2593,7 @@ def render_api_configuration():
     if st.session_state.active_channel:
         st.divider()
         if st.button("🗑️ Delete Channel", width='stretch', type="secondary"):
-            api = MidjourneyAPI(st.session_state.api_token)
+            api = get_client(st.session_state.api_token)
             code, result = api.delete_channel(st.session_state.active_channel)
             if code == 204:
                 st.success("Channel deleted")
@@ -2869,8 +2617,8 @@ def render_mj_settings():
     # Fetch settings button
     if st.button("🔄 Fetch Current Settings", width='stretch'):
         with st.spinner("Fetching settings..."):
-            api = MidjourneyAPI(st.session_state.api_token)
-            code, result = api.get_settings(stream=False)
+            api = get_client(st.session_state.api_token)
+            code, result = api.get_settings(channel=st.session_state.active_channel, stream=False)
             
             if code in [200, 201]:
                 job_id = result.get("jobid")
@@ -2942,15 +2690,15 @@ def render_mj_settings():
 
 def toggle_speed_mode(mode: str):
     """Toggle speed mode (turbo/fast/relax)."""
-    api = MidjourneyAPI(st.session_state.api_token)
+    api = get_client(st.session_state.api_token)
     
     with st.spinner(f"Toggling {mode} mode..."):
         if mode == "turbo":
-            code, result = api.set_turbo_mode()
+            code, result = api.set_turbo_mode(channel=st.session_state.active_channel)
         elif mode == "fast":
-            code, result = api.set_fast_mode()
+            code, result = api.set_fast_mode(channel=st.session_state.active_channel)
         else:
-            code, result = api.set_relax_mode()
+            code, result = api.set_relax_mode(channel=st.session_state.active_channel)
         
         if code in [200, 201]:
             job_id = result.get("jobid")
@@ -2969,13 +2717,13 @@ def toggle_speed_mode(mode: str):
 
 def toggle_mode(mode: str):
     """Toggle remix or variability mode."""
-    api = MidjourneyAPI(st.session_state.api_token)
+    api = get_client(st.session_state.api_token)
     
     with st.spinner(f"Toggling {mode} mode..."):
         if mode == "remix":
-            code, result = api.toggle_remix()
+            code, result = api.toggle_remix(channel=st.session_state.active_channel)
         else:
-            code, result = api.toggle_variability()
+            code, result = api.toggle_variability(channel=st.session_state.active_channel)
         
         if code in [200, 201]:
             job_id = result.get("jobid")
@@ -3007,8 +2755,8 @@ def render_account_info():
     
     if st.button("📊 Fetch Account Info", width='stretch'):
         with st.spinner("Fetching account info..."):
-            api = MidjourneyAPI(st.session_state.api_token)
-            code, result = api.get_info()
+            api = get_client(st.session_state.api_token)
+            code, result = api.get_info(channel=st.session_state.active_channel)
             
             if code in [200, 201]:
                 job_id = result.get("jobid")
@@ -3038,34 +2786,35 @@ def start_recovery_polling():
     if not st.session_state.api_token or st.session_state.recovery_started:
         return
         
-    started_ids = [j.get("jobid") for j in st.session_state.job_history 
-                   if j.get("status") in ["started", "progressing", "progress"] 
-                   and j.get("jobid")]
+    # Indexed status lookup in the job store instead of scanning the history
+    flush_job_history()
+    started_ids = [j["jobid"] for j in get_job_store().query(
+                   status=("started", "progressing", "progress"), limit=None)
+                   if j.get("jobid")]
     
     if started_ids:
         logger.info(f"Starting recovery polling for {len(started_ids)} jobs")
-        from midjourney_studio.utils.polling import poll_multiple_jobs
         
+        # Callbacks run on the reconciler thread, which has no script run
+        # context, so bind the history list here instead of reading session_state.
+        job_history = st.session_state.job_history
+
         def on_complete_callback(jid, final_data):
             # Use state_lock for thread-safety
             with state_lock:
-                for i, job in enumerate(st.session_state.job_history):
-                    if job.get("jobid") == jid:
-                        # Preserving some local metadata if needed
-                        final_data["verb"] = job.get("verb", final_data.get("verb"))
-                        final_data["jobType"] = job.get("jobType", final_data.get("jobType"))
-                        st.session_state.job_history[i] = final_data
-                        break
-                save_job_history(st.session_state.job_history)
-        
-        # Note: poll_multiple_jobs creates its own threads. 
-        # We need to ensure callbacks are wrapped if they access st.session_state
-        # But wait, st.session_state access in callbacks from poll_multiple_jobs
-        # will fail unless add_script_run_ctx is used.
-        # poll_multiple_jobs doesn't do that yet.
-        
-        api = MidjourneyAPI(st.session_state.api_token)
-        poll_multiple_jobs(api, started_ids, on_complete=on_complete_callback)
+                job = job_history.get(jid)
+                if job is not None:
+                    # Preserving some local metadata if needed
+                    final_data["verb"] = job.get("verb", final_data.get("verb"))
+                    final_data["jobType"] = job.get("jobType", final_data.get("jobType"))
+                    job_history.replace(final_data)
+                    record_job(final_data)
+        
+        # Recovered jobs are reconciled in bulk: one list_running_jobs() per tick,
+        # get_job() only once a job leaves the running set
+        reconciler = get_job_reconciler(get_client(st.session_state.api_token))
+        for jid in started_ids:
+            reconciler.track(jid, on_complete=on_complete_callback)
         
     st.session_state.recovery_started = True
 
@@ -3097,7 +2846,7 @@ def render_running_jobs():
     
     if st.button("🔄 Refresh Running Jobs", width='stretch'):
         with st.spinner("Fetching running jobs..."):
-            api = MidjourneyAPI(st.session_state.api_token)
+            api = get_client(st.session_state.api_token)
             code, result = api.list_running_jobs()
             
             if code == 200:
@@ -3129,7 +2878,7 @@ def render_running_jobs():
     # Display locally tracked jobs
     if st.session_state.active_jobs:
         st.markdown("### Locally Tracked Jobs")
-        for job_id, job_data in st.session_state.active_jobs.items():
+        for job_id, job_data in list(st.session_state.active_jobs.items()):
             status = job_data.get("status", "unknown")
             progress = job_data.get("response", {}).get("progress_percent", 0)
             
@@ -3147,7 +2896,8 @@ def render_job_history():
     
     # Clear history button
     if st.button("🗑️ Clear History"):
-        st.session_state.job_history = []
+        st.session_state.job_history.clear()
+        clear_job_history()
         st.rerun()
     
     # Display history
@@ -3179,7 +2929,7 @@ def render_job_history():
                 if v_url:
                     st.video(v_url)
                 elif attachments:
-                    st.image(attachments[0].get("url"), width=150)
+                    st.image(thumbnail_media(attachments[0].get("url"), "small"), width=150)
                 elif is_video_item(job):
                     st.info("🎥 Video Result")
             
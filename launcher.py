@@ -7,6 +7,8 @@ Responsibilities
 - Copy the app assets into that runtime dir so relative paths still work.
 - Run Streamlit headlessly on a random localhost port and present it inside a
   native window via pywebview (no external browser required).
+- Start the replyUrl callback receiver in the same process so job updates
+  can be pushed to the app instead of polled.
 """
 
 import os
@@ -91,6 +93,16 @@ def _pick_port() -> int:
         return s.getsockname()[1]
 
 
+def _start_callback_server() -> None:
+    """Start the replyUrl callback receiver in-process, next to Streamlit."""
+    try:
+        from midjourney_studio.utils.webhook import start_callback_server
+
+        start_callback_server()
+    except Exception as exc:  # Polling still works without callbacks.
+        print(f"Callback server not started: {exc}", file=sys.stderr)
+
+
 def _run_streamlit(app_path: Path, port: int, workdir: Path) -> None:
     """Launch Streamlit CLI inside a daemon thread."""
     def _runner() -> None:
@@ -126,6 +138,7 @@ def main() -> None:
     _write_secrets(secrets_dir, api_token, discord_token)
 
     port = _pick_port()
+    _start_callback_server()
     _run_streamlit(app_path, port, runtime_dir)
 
     import webview  # pywebview
@@ -5,6 +5,7 @@ Professional Streamlit application for Midjourney v3 API via UseAPI.net
 
 Package structure:
 - api/: API client and error handling
+- batch/: Background batch queue engine
 - utils/: Utility functions and helpers
 """
 
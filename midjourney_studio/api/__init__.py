@@ -10,10 +10,18 @@ from .error_handler import (
     ModerationError,
     handle_api_response
 )
-from .client import MidjourneyAPI
+from .client import MidjourneyAPI, get_client, close_all_clients
+from .async_client import AsyncMidjourneyAPI
+from .rate_limit import TokenBucket, RateLimiter, get_rate_limiter
 
 __all__ = [
     'MidjourneyAPI',
+    'AsyncMidjourneyAPI',
+    'get_client',
+    'close_all_clients',
+    'TokenBucket',
+    'RateLimiter',
+    'get_rate_limiter',
     'UseAPIError',
     'AuthenticationError',
     'PaymentRequiredError',
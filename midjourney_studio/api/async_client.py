@@ -0,0 +1,355 @@
+"""
+Midjourney v3 Async API Client (UseAPI.net Provider)
+=====================================================
+
+asyncio counterpart of MidjourneyAPI built on httpx.AsyncClient.
+
+All coroutines share one connection pool, so hundreds of in-flight jobs can be
+submitted and tracked from a single event loop instead of one thread per job.
+Method names, arguments and (status_code, response_dict) return values match
+the synchronous client exactly.
+
+Requires the optional `httpx` dependency.
+"""
+
+import json
+import logging
+from typing import Dict, List, Tuple, Optional
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+from .client import API_BASE_URL, DEFAULT_POOL_SIZE, REQUEST_TIMEOUT
+from .error_handler import handle_api_response, sanitize_error_for_display
+from .rate_limit import RateLimiter, get_rate_limiter, retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncMidjourneyAPI:
+    """
+    Async Midjourney v3 API Client with the same surface as MidjourneyAPI.
+
+    Use as an async context manager, or call aclose() when done:
+
+        async with AsyncMidjourneyAPI(token) as api:
+            code, job = await api.get_job(job_id)
+    """
+
+    def __init__(self, api_token: str, pool_size: int = DEFAULT_POOL_SIZE,
+                 transport: Optional["httpx.AsyncBaseTransport"] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
+        """
+        Initialize async API client.
+
+        Args:
+            api_token: UseAPI.net API token (format: user:XXXX-XXXXX)
+            pool_size: Maximum concurrent connections to the API host
+            transport: Optional httpx transport (mainly for tests)
+            rate_limiter: RateLimiter to pace requests (defaults to the token's
+                shared one, which the sync client uses too)
+        """
+        if httpx is None:
+            raise ImportError(
+                "AsyncMidjourneyAPI requires httpx. Install it with: pip install httpx"
+            )
+        if not api_token or not api_token.strip():
+            raise ValueError("API token cannot be empty")
+
+        self.api_token = api_token.strip()
+        self.headers = {
+            "Authorization": f"Bearer {self.api_token}",
+            "Content-Type": "application/json"
+        }
+        self.pool_size = pool_size
+        self.client = httpx.AsyncClient(
+            base_url=API_BASE_URL,
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_connections=pool_size,
+                                max_keepalive_connections=pool_size),
+            transport=transport
+        )
+        self.rate_limiter = rate_limiter or get_rate_limiter(self.api_token)
+        logger.info(f"AsyncMidjourneyAPI client initialized (pool_size={pool_size})")
+
+    async def aclose(self):
+        """Close pooled connections held by this client."""
+        await self.client.aclose()
+
+    async def __aenter__(self) -> "AsyncMidjourneyAPI":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def _request(self, method: str, endpoint: str, **kwargs) -> Tuple[int, Dict]:
+        """
+        Make API request with proper error handling.
+
+        Args:
+            method: HTTP method (GET, POST, DELETE)
+            endpoint: API endpoint (e.g., '/jobs/imagine')
+            **kwargs: Additional httpx request parameters
+
+        Returns:
+            Tuple of (status_code, response_dict)
+        """
+        headers = kwargs.pop("headers", self.headers.copy())
+
+        logger.debug(f"{method} {endpoint}")
+
+        try:
+            await self.rate_limiter.acquire_async(method, endpoint)
+            response = await self.client.request(method, endpoint, headers=headers, **kwargs)
+
+            try:
+                data = response.json()
+            except json.JSONDecodeError as e:
+                logger.error(f"Failed to parse JSON response: {e}")
+                logger.debug(f"Raw response: {response.text[:500]}")
+                data = {
+                    "error": "Invalid JSON response from API",
+                    "raw": response.text[:1000]
+                }
+
+            if response.status_code == 429:
+                self.rate_limiter.backoff(method, endpoint,
+                                          retry_after_seconds(data, response.headers))
+
+            if response.status_code >= 400:
+                logger.warning(
+                    f"{method} {endpoint} -> {response.status_code}: "
+                    f"{data.get('error', 'Unknown error')}"
+                )
+            else:
+                logger.debug(f"{method} {endpoint} -> {response.status_code}")
+
+            return response.status_code, data
+
+        except httpx.TimeoutException as e:
+            logger.error(f"Request timeout: {endpoint}")
+            return 504, {"error": f"Request timeout: {str(e)}"}
+
+        except httpx.TransportError as e:
+            logger.error(f"Connection error: {endpoint}")
+            return 503, {"error": f"Connection error: {str(e)}"}
+
+        except httpx.HTTPError as e:
+            logger.error(f"Request failed: {endpoint} - {sanitize_error_for_display(e)}")
+            return 500, {"error": f"Request failed: {str(e)}"}
+
+        except Exception as e:
+            logger.exception(f"Unexpected error in API request: {endpoint}")
+            return 500, {"error": f"Unexpected error: {str(e)}"}
+
+    async def _request_with_validation(self, method: str, endpoint: str, **kwargs) -> Dict:
+        """
+        Make API request and validate response (raises exceptions on error).
+
+        Raises:
+            UseAPIError subclasses for error responses
+        """
+        status_code, data = await self._request(method, endpoint, **kwargs)
+        return handle_api_response(status_code, data)
+
+    async def _multipart(self, endpoint: str, fields: Dict[str, str],
+                         files: Dict[str, Tuple[str, bytes, str]]) -> Tuple[int, Dict]:
+        """POST multipart/form-data (Content-Type is set by httpx with the boundary)."""
+        headers = {"Authorization": f"Bearer {self.api_token}"}
+        return await self._request("POST", endpoint, headers=headers, data=fields, files=files)
+
+    # -------------------------------------------------------------------------
+    # Account Management
+    # -------------------------------------------------------------------------
+
+    async def configure_channel(self, discord_token: str, max_jobs: int = 12,
+                                max_image_jobs: int = 12, max_video_jobs: int = 3,
+                                reply_url: str = None) -> Tuple[int, Dict]:
+        """Configure Midjourney Discord channel. Ref: post-midjourney-accounts.md"""
+        payload = {
+            "discord": discord_token,
+            "maxJobs": max_jobs,
+            "maxImageJobs": max_image_jobs,
+            "maxVideoJobs": max_video_jobs
+        }
+        if reply_url:
+            payload["replyUrl"] = reply_url
+
+        logger.info(f"Configuring channel with maxJobs={max_jobs}")
+        return await self._request("POST", "/accounts", json=payload)
+
+    async def get_accounts(self) -> Tuple[int, Dict]:
+        """List all configured channels. Ref: get-midjourney-accounts.md"""
+        return await self._request("GET", "/accounts")
+
+    async def get_account_channel(self, channel_id: str) -> Tuple[int, Dict]:
+        """Get specific channel configuration. Ref: get-midjourney-accounts-channel.md"""
+        return await self._request("GET", f"/accounts/{channel_id}")
+
+    async def delete_channel(self, channel_id: str) -> Tuple[int, Dict]:
+        """Delete channel configuration. Ref: delete-midjourney-accounts-channel.md"""
+        logger.info(f"Deleting channel: {channel_id}")
+        return await self._request("DELETE", f"/accounts/{channel_id}")
+
+    async def reset_channel(self, channel_id: str) -> Tuple[int, Dict]:
+        """Reset channel after moderation/CAPTCHA (596 error). Ref: post-midjourney-accounts-reset.md"""
+        logger.info(f"Resetting channel: {channel_id}")
+        return await self._request("POST", f"/accounts/reset/{channel_id}")
+
+    # -------------------------------------------------------------------------
+    # Job Creation
+    # -------------------------------------------------------------------------
+
+    async def imagine(self, prompt: str, channel: str = None, stream: bool = False,
+                      reply_url: str = None, reply_ref: str = None) -> Tuple[int, Dict]:
+        """Generate images from text prompt. Ref: post-midjourney-jobs-imagine.md"""
+        payload = {"prompt": prompt, "stream": stream}
+        if channel:
+            payload["channel"] = channel
+        if reply_url:
+            payload["replyUrl"] = reply_url
+        if reply_ref:
+            payload["replyRef"] = reply_ref
+
+        logger.info(f"Imagine: {prompt[:100]}...")
+        return await self._request("POST", "/jobs/imagine", json=payload)
+
+    async def blend(self, files: List[Tuple[str, bytes, str]], dimensions: str = "Square",
+                    channel: str = None, stream: bool = False) -> Tuple[int, Dict]:
+        """
+        Blend 2-5 images using multipart/form-data.
+        Ref: post-midjourney-jobs-blend.md
+
+        CRITICAL: Uses imageBlob_1, imageBlob_2, ... imageBlob_5 parameter names.
+        """
+        if len(files) < 2 or len(files) > 5:
+            logger.error(f"Blend requires 2-5 images, got {len(files)}")
+            return 400, {"error": "Blend requires 2-5 images"}
+
+        for i, (filename, file_bytes, _) in enumerate(files, 1):
+            size_mb = len(file_bytes) / (1024 * 1024)
+            if size_mb > 10:
+                logger.error(f"Image {i} ({filename}) exceeds 10MB: {size_mb:.2f}MB")
+                return 400, {"error": f"Image {i} exceeds 10MB limit ({size_mb:.2f}MB)"}
+
+        fields = {"blendDimensions": dimensions, "stream": str(stream).lower()}
+        if channel:
+            fields["channel"] = channel
+
+        blobs = {
+            f"imageBlob_{i}": (filename, file_bytes, content_type)
+            for i, (filename, file_bytes, content_type) in enumerate(files, 1)
+        }
+
+        logger.info(f"Blend: {len(files)} images, dimensions={dimensions}")
+        return await self._multipart("/jobs/blend", fields, blobs)
+
+    async def describe(self, file_bytes: bytes, filename: str, content_type: str,
+                       channel: str = None, stream: bool = False) -> Tuple[int, Dict]:
+        """
+        Generate prompts from image using multipart/form-data.
+        Ref: post-midjourney-jobs-describe.md
+
+        CRITICAL: Uses imageBlob parameter name (not imageUrl).
+        """
+        size_mb = len(file_bytes) / (1024 * 1024)
+        if size_mb > 10:
+            logger.error(f"Describe image exceeds 10MB: {size_mb:.2f}MB")
+            return 400, {"error": f"Image exceeds 10MB limit ({size_mb:.2f}MB)"}
+
+        fields = {"stream": str(stream).lower()}
+        if channel:
+            fields["channel"] = channel
+
+        logger.info(f"Describe: {filename}")
+        return await self._multipart(
+            "/jobs/describe", fields, {"imageBlob": (filename, file_bytes, content_type)}
+        )
+
+    async def button(self, job_id: str, button: str, mask: str = None,
+                     prompt: str = None, stream: bool = False) -> Tuple[int, Dict]:
+        """Execute button action on completed job. Ref: post-midjourney-jobs-button.md"""
+        payload = {
+            "jobId": job_id,
+            "button": button,
+            "stream": stream
+        }
+        if mask:
+            payload["mask"] = mask
+        if prompt:
+            payload["prompt"] = prompt
+
+        logger.info(f"Button action: {button} on job {job_id[:20]}...")
+        return await self._request("POST", "/jobs/button", json=payload)
+
+    async def seed(self, job_id: str, stream: bool = False) -> Tuple[int, Dict]:
+        """Extract seed from completed imagine/blend job. Ref: post-midjourney-jobs-seed.md"""
+        payload = {"jobId": job_id, "stream": stream}
+        logger.info(f"Extracting seed from job {job_id[:20]}...")
+        return await self._request("POST", "/jobs/seed", json=payload)
+
+    # -------------------------------------------------------------------------
+    # Settings & Modes
+    # -------------------------------------------------------------------------
+
+    async def _toggle(self, endpoint: str, channel: str = None) -> Tuple[int, Dict]:
+        """POST a settings toggle with an optional channel."""
+        payload = {}
+        if channel:
+            payload["channel"] = channel
+        return await self._request("POST", endpoint, json=payload)
+
+    async def get_settings(self, channel: str = None, stream: bool = False) -> Tuple[int, Dict]:
+        """Get current Midjourney settings. Ref: post-midjourney-jobs-settings.md"""
+        payload = {"stream": stream}
+        if channel:
+            payload["channel"] = channel
+        return await self._request("POST", "/jobs/settings", json=payload)
+
+    async def set_fast_mode(self, channel: str = None) -> Tuple[int, Dict]:
+        """Toggle fast mode. Ref: post-midjourney-jobs-fast.md"""
+        logger.info("Toggling fast mode")
+        return await self._toggle("/jobs/fast", channel)
+
+    async def set_relax_mode(self, channel: str = None) -> Tuple[int, Dict]:
+        """Toggle relax mode. Ref: post-midjourney-jobs-relax.md"""
+        logger.info("Toggling relax mode")
+        return await self._toggle("/jobs/relax", channel)
+
+    async def set_turbo_mode(self, channel: str = None) -> Tuple[int, Dict]:
+        """Toggle turbo mode. Ref: post-midjourney-jobs-turbo.md"""
+        logger.info("Toggling turbo mode")
+        return await self._toggle("/jobs/turbo", channel)
+
+    async def toggle_remix(self, channel: str = None) -> Tuple[int, Dict]:
+        """Toggle remix mode. Ref: post-midjourney-jobs-remix.md"""
+        logger.info("Toggling remix mode")
+        return await self._toggle("/jobs/remix", channel)
+
+    async def toggle_variability(self, channel: str = None) -> Tuple[int, Dict]:
+        """Toggle variability (high/low). Ref: post-midjourney-jobs-variability.md"""
+        logger.info("Toggling variability")
+        return await self._toggle("/jobs/variability", channel)
+
+    async def get_info(self, channel: str = None) -> Tuple[int, Dict]:
+        """Get account info. Ref: post-midjourney-jobs-info.md"""
+        return await self._toggle("/jobs/info", channel)
+
+    # -------------------------------------------------------------------------
+    # Job Management
+    # -------------------------------------------------------------------------
+
+    async def get_job(self, job_id: str) -> Tuple[int, Dict]:
+        """Get job status and details. Ref: get-midjourney-jobs-jobid.md"""
+        return await self._request("GET", f"/jobs/{job_id}")
+
+    async def list_running_jobs(self) -> Tuple[int, Dict]:
+        """List all currently running jobs. Ref: get-midjourney-jobs.md"""
+        return await self._request("GET", "/jobs")
+
+    async def cancel_job(self, job_id: str) -> Tuple[int, Dict]:
+        """Cancel a running job. Ref: delete-midjourney-jobs-jobid.md"""
+        logger.info(f"Cancelling job: {job_id}")
+        return await self._request("DELETE", f"/jobs/{job_id}")
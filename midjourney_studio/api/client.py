@@ -15,7 +15,9 @@ Documentation References:
 import requests
 import logging
 import json
+import threading
 from typing import Dict, Any, List, Tuple, Optional
+from requests.adapters import HTTPAdapter
 from .error_handler import (
     handle_api_response,
     UseAPIError,
@@ -24,6 +26,7 @@ from .error_handler import (
     RetryConfig,
     sanitize_error_for_display
 )
+from .rate_limit import RateLimiter, get_rate_limiter, retry_after_seconds
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +34,10 @@ logger = logging.getLogger(__name__)
 API_BASE_URL = "https://api.useapi.net/v3/midjourney"
 PROXY_CDN_URL = "https://api.useapi.net/v1/proxy/cdn-midjourney/"
 
+# Connection pool configuration
+DEFAULT_POOL_SIZE = 20  # keep-alive connections kept per host
+REQUEST_TIMEOUT = 30  # seconds
+
 
 class MidjourneyAPI:
     """
@@ -39,12 +46,17 @@ class MidjourneyAPI:
     All methods reference specific UseAPI.net documentation files.
     """
 
-    def __init__(self, api_token: str):
+    def __init__(self, api_token: str, pool_size: int = DEFAULT_POOL_SIZE,
+                 session: Optional[requests.Session] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
         """
         Initialize API client.
 
         Args:
             api_token: UseAPI.net API token (format: user:XXXX-XXXXX)
+            pool_size: Maximum keep-alive connections held open to the API host
+            session: Optional pre-configured requests.Session (mainly for tests)
+            rate_limiter: RateLimiter to pace requests (defaults to the token's shared one)
         """
         if not api_token or not api_token.strip():
             raise ValueError("API token cannot be empty")
@@ -54,7 +66,29 @@ class MidjourneyAPI:
             "Authorization": f"Bearer {self.api_token}",
             "Content-Type": "application/json"
         }
-        logger.info("MidjourneyAPI client initialized")
+        self.pool_size = pool_size
+        self.session = session or self._create_session(pool_size)
+        self.rate_limiter = rate_limiter or get_rate_limiter(self.api_token)
+        logger.info(f"MidjourneyAPI client initialized (pool_size={pool_size})")
+
+    @staticmethod
+    def _create_session(pool_size: int) -> requests.Session:
+        """
+        Create a keep-alive session with a bounded connection pool.
+
+        Retries are left to the caller (see error_handler.retry_with_backoff),
+        so the adapter never silently re-sends job submissions.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                              max_retries=0, pool_block=False)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self):
+        """Close pooled connections held by this client."""
+        self.session.close()
 
     def _request(self, method: str, endpoint: str, **kwargs) -> Tuple[int, Dict]:
         """
@@ -78,7 +112,9 @@ class MidjourneyAPI:
         logger.debug(f"{method} {endpoint}")
 
         try:
-            response = requests.request(method, url, headers=headers, timeout=30, **kwargs)
+            self.rate_limiter.acquire(method, endpoint)
+            response = self.session.request(method, url, headers=headers,
+                                            timeout=REQUEST_TIMEOUT, **kwargs)
 
             # Parse JSON response
             try:
@@ -91,6 +127,10 @@ class MidjourneyAPI:
                     "raw": response.text[:1000]
                 }
 
+            if response.status_code == 429:
+                self.rate_limiter.backoff(method, endpoint,
+                                          retry_after_seconds(data, response.headers))
+
             # Log response status
             if response.status_code >= 400:
                 logger.warning(
@@ -134,7 +174,7 @@ class MidjourneyAPI:
             UseAPIError subclasses for error responses
         """
         status_code, data = self._request(method, endpoint, **kwargs)
-        return handle_api_response(status_code, data)
+        return handle_api_response(status_code, data)  # 429s already slowed the rate limiter
 
     # -------------------------------------------------------------------------
     # Account Management
@@ -283,9 +323,14 @@ class MidjourneyAPI:
         url = f"{API_BASE_URL}/jobs/blend"
 
         try:
-            response = requests.post(url, headers=headers, files=form_data, timeout=30)
+            self.rate_limiter.acquire("POST", "/jobs/blend")
+            response = self.session.post(url, headers=headers, files=form_data,
+                                         timeout=REQUEST_TIMEOUT)
             data = response.json()
 
+            if response.status_code == 429:
+                self.rate_limiter.backoff("POST", "/jobs/blend",
+                                          retry_after_seconds(data, response.headers))
             if response.status_code >= 400:
                 logger.warning(f"Blend failed: {response.status_code} - {data.get('error')}")
 
@@ -338,9 +383,14 @@ class MidjourneyAPI:
         url = f"{API_BASE_URL}/jobs/describe"
 
         try:
-            response = requests.post(url, headers=headers, files=form_data, timeout=30)
+            self.rate_limiter.acquire("POST", "/jobs/describe")
+            response = self.session.post(url, headers=headers, files=form_data,
+                                         timeout=REQUEST_TIMEOUT)
             data = response.json()
 
+            if response.status_code == 429:
+                self.rate_limiter.backoff("POST", "/jobs/describe",
+                                          retry_after_seconds(data, response.headers))
             if response.status_code >= 400:
                 logger.warning(f"Describe failed: {response.status_code} - {data.get('error')}")
 
@@ -489,3 +539,50 @@ class MidjourneyAPI:
         """
         logger.info(f"Cancelling job: {job_id}")
         return self._request("DELETE", f"/jobs/{job_id}")
+
+
+# =============================================================================
+# CLIENT REGISTRY
+# =============================================================================
+
+_clients: Dict[str, MidjourneyAPI] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_token: str, pool_size: int = DEFAULT_POOL_SIZE) -> MidjourneyAPI:
+    """
+    Return the shared MidjourneyAPI client for a token, creating it on first use.
+
+    Streamlit reruns, pollers and autopilot workers all call this instead of
+    constructing MidjourneyAPI directly, so they share one warm connection pool
+    per token rather than paying a TCP+TLS handshake per request.
+
+    Args:
+        api_token: UseAPI.net API token
+        pool_size: Pool size used if the client has to be created
+
+    Returns:
+        Process-wide MidjourneyAPI instance for this token
+    """
+    if not api_token or not api_token.strip():
+        raise ValueError("API token cannot be empty")
+
+    key = api_token.strip()
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = MidjourneyAPI(key, pool_size=pool_size)
+            _clients[key] = client
+        return client
+
+
+def close_all_clients():
+    """Close and forget every registered client (e.g. on shutdown or token change)."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            logger.debug(f"Error closing client: {e}")
@@ -0,0 +1,198 @@
+"""
+Process-wide request rate limiting.
+
+Every API call takes a token from a per-token RateLimiter before it is sent,
+so the batch engine, auto-pilot workers, pollers and UI actions share one
+request budget instead of each pacing itself. Job submissions (POST
+/jobs/...) and everything else (status reads, account calls) draw from
+separate buckets, so polling never delays a submission and vice versa.
+
+A 429 response feeds its retry_after back into the bucket that produced it:
+the bucket is emptied and blocked for that long, and every caller waiting on
+it slows down together.
+
+Buckets use the generic cell rate algorithm (a token bucket kept as a single
+"next free slot" timestamp), so acquiring is O(1) and callers are served in
+arrival order. acquire() blocks the calling thread; acquire_async() is the
+asyncio variant and shares the same state, so sync and async clients for one
+token are limited together.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SUBMIT, READ = "submit", "read"
+# Bucket -> (tokens per second, burst size)
+BUCKET_RATES = {
+    SUBMIT: (1.0, 3),
+    READ: (5.0, 10),
+}
+DEFAULT_RETRY_AFTER = 5  # seconds, same default as RateLimitError
+
+
+def retry_after_seconds(data: Any, headers: Optional[Dict[str, str]] = None) -> float:
+    """retry_after from a 429 body, else the Retry-After header, else the default."""
+    value = data.get("retry_after") if isinstance(data, dict) else None
+    if value is None and headers:
+        value = headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value is not None else DEFAULT_RETRY_AFTER
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Usage:
+        bucket = TokenBucket(rate=2, capacity=5)
+        bucket.acquire()                 # blocks until a token is free
+        await bucket.acquire_async()     # same, from a coroutine
+        bucket.backoff(10)               # server said slow down
+    """
+
+    def __init__(self, rate: float, capacity: int = 1,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst (tokens available after idling)
+            clock: Monotonic time source (mainly for tests)
+        """
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._interval = 1.0 / rate
+        self._tolerance = (capacity - 1) * self._interval
+        self._lock = threading.Lock()
+        self._next = clock()  # theoretical arrival time of the next request
+
+    def _reserve(self, tokens: int, timeout: Optional[float]) -> Optional[float]:
+        """Take `tokens` now and return how long to wait before using them, or None."""
+        with self._lock:
+            now = self._clock()
+            start = max(self._next, now)
+            delay = max(0.0, start - self._tolerance - now + (tokens - 1) * self._interval)
+            if timeout is not None and delay > timeout:
+                return None
+            self._next = start + tokens * self._interval
+            return delay
+
+    def acquire(self, tokens: int = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Block until `tokens` are available and take them.
+
+        Args:
+            tokens: Tokens to take
+            timeout: Give up (without taking anything) if the wait would be longer
+
+        Returns:
+            False if the timeout would have been exceeded
+        """
+        delay = self._reserve(tokens, timeout)
+        if delay is None:
+            return False
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+    async def acquire_async(self, tokens: int = 1, timeout: Optional[float] = None) -> bool:
+        """asyncio variant of acquire()."""
+        delay = self._reserve(tokens, timeout)
+        if delay is None:
+            return False
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return True
+
+    def try_acquire(self, tokens: int = 1) -> bool:
+        """Take `tokens` only if they are available right now."""
+        return self.acquire(tokens, timeout=0)
+
+    def backoff(self, seconds: float):
+        """Empty the bucket and hand out nothing for `seconds`."""
+        with self._lock:
+            self._next = max(self._next, self._clock() + seconds + self._tolerance)
+
+    @property
+    def available(self) -> float:
+        """Tokens that could be taken right now without waiting."""
+        with self._lock:
+            headroom = self._clock() + self._tolerance - self._next
+        return max(0.0, min(self.capacity, headroom / self._interval + 1))
+
+
+class RateLimiter:
+    """
+    Submission and read buckets for one API token.
+
+    Usage:
+        limiter = get_rate_limiter(api_token)
+        limiter.acquire("POST", "/jobs/imagine")
+        limiter.backoff("POST", "/jobs/imagine", retry_after)
+    """
+
+    def __init__(self, rates: Dict[str, tuple] = BUCKET_RATES,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            rates: Bucket name -> (tokens per second, burst size)
+            clock: Monotonic time source (mainly for tests)
+        """
+        self.buckets = {name: TokenBucket(rate, capacity, clock)
+                        for name, (rate, capacity) in rates.items()}
+
+    @staticmethod
+    def classify(method: str, endpoint: str) -> str:
+        """Bucket name for a request: job submissions vs. everything else."""
+        if method.upper() == "POST" and endpoint.startswith("/jobs"):
+            return SUBMIT
+        return READ
+
+    def bucket(self, method: str, endpoint: str) -> TokenBucket:
+        return self.buckets[self.classify(method, endpoint)]
+
+    def acquire(self, method: str, endpoint: str):
+        """Wait for a token for this request."""
+        self.bucket(method, endpoint).acquire()
+
+    async def acquire_async(self, method: str, endpoint: str):
+        """asyncio variant of acquire()."""
+        await self.bucket(method, endpoint).acquire_async()
+
+    def backoff(self, method: str, endpoint: str, retry_after: float):
+        """Slow down every caller of this request's bucket after a 429."""
+        name = self.classify(method, endpoint)
+        logger.warning(f"Rate limited on {method} {endpoint}; pausing {name} requests for {retry_after}s")
+        self.buckets[name].backoff(retry_after)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(api_token: str) -> RateLimiter:
+    """
+    Return the process-wide RateLimiter for an API token.
+
+    Args:
+        api_token: UseAPI.net API token
+
+    Returns:
+        RateLimiter shared by every client using that token
+    """
+    key = (api_token or "").strip()
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter()
+            _limiters[key] = limiter
+        return limiter
@@ -0,0 +1,24 @@
+"""
+Background batch processing for Midjourney Studio.
+"""
+
+from .engine import BatchEngine, BatchSnapshot, get_batch_engine
+from .dispatcher import CapacityDispatcher, get_capacity_dispatcher
+from .store import BatchStore
+from .concurrency import AIMDController
+from .health import ChannelHealth, CircuitBreaker
+from .router import JobRouter, get_job_router
+
+__all__ = [
+    'BatchEngine',
+    'BatchSnapshot',
+    'get_batch_engine',
+    'CapacityDispatcher',
+    'get_capacity_dispatcher',
+    'BatchStore',
+    'AIMDController',
+    'ChannelHealth',
+    'CircuitBreaker',
+    'JobRouter',
+    'get_job_router'
+]
@@ -0,0 +1,122 @@
+"""
+Adaptive (AIMD) concurrency control for job submission.
+
+Each channel has a concurrency window below its configured maxJobs. The
+window grows by one job for every accepted submission (additive increase)
+and halves on a 429 (multiplicative decrease), so a batch settles at the
+highest concurrency the account actually sustains instead of a fixed
+number. Decreases are spaced by a cooldown so one burst of 429s from
+requests already in flight counts as a single congestion signal.
+
+A 596 (moderation or CAPTCHA) freezes the channel: it gets no new work
+until thaw() is called, typically after the channel was reset.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+INITIAL_WINDOW = 3
+MIN_WINDOW = 1
+ADDITIVE_INCREASE = 1.0
+DECREASE_FACTOR = 0.5
+DECREASE_COOLDOWN = 10  # seconds between two decreases of one channel
+
+
+class AIMDController:
+    """
+    Per-channel concurrency windows.
+
+    Usage:
+        aimd = AIMDController()
+        limit = aimd.limit(channel, ceiling=max_jobs)
+        aimd.on_success(channel, ceiling=max_jobs)   # submission accepted
+        aimd.on_rate_limited(channel)                 # 429
+        aimd.freeze(channel, "596 moderation")        # until aimd.thaw(channel)
+    """
+
+    def __init__(self, initial: float = INITIAL_WINDOW, minimum: float = MIN_WINDOW,
+                 increase: float = ADDITIVE_INCREASE, decrease: float = DECREASE_FACTOR,
+                 cooldown: float = DECREASE_COOLDOWN,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            initial: Starting window for a channel
+            minimum: Smallest window a decrease can reach
+            increase: Jobs added to the window per accepted submission
+            decrease: Factor applied to the window on a 429
+            cooldown: Seconds during which further 429s do not decrease again
+            clock: Monotonic time source (mainly for tests)
+        """
+        self.initial = initial
+        self.minimum = minimum
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._windows: Dict[str, float] = {}
+        self._decreased_at: Dict[str, float] = {}
+        self._frozen: Dict[str, str] = {}  # channel -> reason
+
+    def limit(self, channel: str, ceiling: int) -> int:
+        """Jobs the channel may have in flight now (0 while frozen)."""
+        with self._lock:
+            if channel in self._frozen:
+                return 0
+            window = self._windows.get(channel, self.initial)
+        return max(int(self.minimum), min(ceiling, int(window)))
+
+    def on_success(self, channel: str, ceiling: int):
+        """Additive increase after an accepted submission."""
+        with self._lock:
+            window = self._windows.get(channel, self.initial)
+            self._windows[channel] = min(float(ceiling), window + self.increase)
+
+    def on_rate_limited(self, channel: str) -> bool:
+        """
+        Multiplicative decrease after a 429.
+
+        Returns:
+            True if the window was decreased (False inside the cooldown)
+        """
+        with self._lock:
+            now = self._clock()
+            if now - self._decreased_at.get(channel, float("-inf")) < self.cooldown:
+                return False
+            window = self._windows.get(channel, self.initial)
+            self._windows[channel] = max(self.minimum, window * self.decrease)
+            self._decreased_at[channel] = now
+            logger.warning(f"429 on channel {channel or 'default'}: "
+                           f"concurrency {window:.1f} -> {self._windows[channel]:.1f}")
+            return True
+
+    def freeze(self, channel: str, reason: str = ""):
+        """Stop admitting work on a channel until thaw()."""
+        with self._lock:
+            self._frozen[channel] = reason
+        logger.warning(f"Channel {channel or 'default'} frozen: {reason}")
+
+    def thaw(self, channel: Optional[str] = None):
+        """Unfreeze one channel (or all) and restart it from the initial window."""
+        with self._lock:
+            channels = [channel] if channel is not None else list(self._frozen)
+            for ch in channels:
+                if self._frozen.pop(ch, None) is not None:
+                    self._windows[ch] = min(self._windows.get(ch, self.initial), self.initial)
+                    logger.info(f"Channel {ch or 'default'} thawed")
+
+    def frozen(self) -> Dict[str, str]:
+        """Frozen channels and why."""
+        with self._lock:
+            return dict(self._frozen)
+
+    def state(self) -> Dict[str, Dict[str, Any]]:
+        """Per-channel window and frozen reason, for display."""
+        with self._lock:
+            channels = set(self._windows) | set(self._frozen)
+            return {ch: {"window": self._windows.get(ch, self.initial), "frozen": self._frozen.get(ch)}
+                    for ch in channels}
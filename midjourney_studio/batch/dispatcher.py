@@ -0,0 +1,441 @@
+"""
+Capacity-aware job dispatcher.
+
+Tracks in-flight image and video jobs per channel and only admits new work
+when the matching slot class has room. Each channel has three limits from
+the account configuration (maxJobs, maxImageJobs, maxVideoJobs); a job takes
+one slot of its class and one of the channel total.
+
+The in-flight set is the union of the server's running jobs (from
+list_running_jobs(), refreshed at most every few seconds) and the jobs this
+process admitted that the server does not report yet. Local admissions are
+counted immediately, so a burst of submissions fills the pipeline without
+waiting for a refresh and without overshooting the limits into 429s.
+
+With an AIMDController the channel total is further capped by an adaptive
+window fed by report(): accepted submissions grow it, 429s halve it and a
+596 freezes the channel. With a ChannelHealth, channels whose circuit
+breaker is open get no work and healthier channels are preferred.
+
+acquire(kind, channel=...) restricts admission to one channel; follow-ups
+(buttons on a finished job) use it because they always run on the channel
+that produced the parent job.
+"""
+
+import logging
+import threading
+import time
+from itertools import count
+from typing import Any, Dict, Optional, Tuple
+
+from .concurrency import AIMDController
+from .health import ChannelHealth
+
+logger = logging.getLogger(__name__)
+
+IMAGE, VIDEO = "image", "video"
+DEFAULT_LIMITS = {"maxJobs": 12, "maxImageJobs": 12, "maxVideoJobs": 3}
+REFRESH_INTERVAL = 2  # seconds a running-jobs snapshot stays fresh
+LIMITS_TTL = 300  # seconds between account limit reads
+ADMIT_GRACE = 60  # drop local admissions the server never reported after this long
+DEFAULT_CHANNEL = ""
+
+
+def job_kind(job: Dict[str, Any]) -> str:
+    """Slot class (IMAGE or VIDEO) of a running job or submission response."""
+    job_type = str(job.get("jobType") or job.get("verb") or "").lower()
+    if "video" in job_type or "animate" in job_type:
+        return VIDEO
+    button = str(job.get("button") or "").lower()
+    if button.startswith("animate"):
+        return VIDEO
+    return IMAGE
+
+
+def channel_limits(payload: Any) -> Dict[str, Dict[str, int]]:
+    """
+    Extract per-channel limits from a get_accounts() response.
+
+    Handles the v3 shape ({"channels": {id: {...}}}) and the v2 shape
+    ({id: {"channel": id, "maxJobs": ...}}). Missing limits use DEFAULT_LIMITS.
+    """
+    if not isinstance(payload, dict):
+        return {}
+    channels = payload.get("channels") if isinstance(payload.get("channels"), dict) else payload
+    limits = {}
+    for channel_id, config in channels.items():
+        if not isinstance(config, dict):
+            continue
+        limits[str(config.get("channel") or channel_id)] = {
+            key: int(config.get(key) or default) for key, default in DEFAULT_LIMITS.items()
+        }
+    return limits
+
+
+def running_jobs_by_channel(payload: Any) -> Optional[Tuple[Dict[str, Tuple[str, str]], Dict[str, int]]]:
+    """
+    Extract running jobs from a list_running_jobs() response.
+
+    Returns:
+        (job_id -> (channel, kind), channel -> count of unlisted jobs), or
+        None if the payload is not recognised. Unlisted jobs come from
+        responses that only report totals; their class is unknown.
+    """
+    def _jobs(jobs, channel, found):
+        for job in jobs or []:
+            if isinstance(job, str):
+                found[job] = (channel, IMAGE)
+            elif isinstance(job, dict):
+                job_id = job.get("jobId") or job.get("jobid")
+                if job_id:
+                    found[job_id] = (channel, job_kind(job))
+
+    found: Dict[str, Tuple[str, str]] = {}
+    unlisted: Dict[str, int] = {}
+    if isinstance(payload, list):
+        _jobs(payload, DEFAULT_CHANNEL, found)
+        return found, unlisted
+    if not isinstance(payload, dict):
+        return None
+
+    if isinstance(payload.get("channels"), dict):
+        for channel_id, ch_data in payload["channels"].items():
+            if not isinstance(ch_data, dict):
+                continue
+            before = len(found)
+            _jobs(ch_data.get("jobs"), str(channel_id), found)
+            extra = int(ch_data.get("total") or 0) - (len(found) - before)
+            if extra > 0:
+                unlisted[str(channel_id)] = extra
+        return found, unlisted
+    if "jobs" in payload or "total" in payload:
+        _jobs(payload.get("jobs"), DEFAULT_CHANNEL, found)
+        extra = int(payload.get("total") or 0) - len(found)
+        if extra > 0:
+            unlisted[DEFAULT_CHANNEL] = extra
+        return found, unlisted
+    return None
+
+
+class CapacityDispatcher:
+    """
+    Admission control for image and video slots across channels.
+
+    Usage:
+        dispatcher = CapacityDispatcher(api)
+        ticket = dispatcher.acquire(IMAGE)    # None while no slot is free
+        code, result = api.imagine(prompt)
+        dispatcher.bind(ticket, result["jobid"])   # or release(ticket) on failure
+        ...
+        dispatcher.release(job_id)            # when the job is terminal
+    """
+
+    def __init__(self, api, max_jobs: Optional[int] = None,
+                 refresh_interval: float = REFRESH_INTERVAL,
+                 controller: Optional[AIMDController] = None,
+                 health: Optional[ChannelHealth] = None):
+        """
+        Initialize dispatcher.
+
+        Args:
+            api: MidjourneyAPI instance
+            max_jobs: Cap on each channel's total job limit (optional)
+            refresh_interval: Seconds before the running-jobs snapshot is re-read
+            controller: AIMDController adapting each channel's job limit (optional)
+            health: ChannelHealth circuit breakers consulted before admitting (optional)
+        """
+        self.api = api
+        self.max_jobs = max_jobs
+        self.refresh_interval = refresh_interval
+        self.controller = controller
+        self.health = health
+
+        self._lock = threading.RLock()
+        self._tickets = count(1)
+        self._limits: Dict[str, Dict[str, int]] = {}
+        self._limits_at = 0.0
+        self._running: Dict[str, Tuple[str, str]] = {}  # job_id -> (channel, kind)
+        self._unlisted: Dict[str, int] = {}
+        self._refreshed_at = 0.0
+        self._admitted: Dict[str, Dict[str, Any]] = {}  # ticket/job_id -> channel, kind, at, seen
+        self._released: Dict[str, float] = {}  # job_id -> release time, for in-flight refreshes
+        self.error: Optional[str] = None
+
+    # -- state --------------------------------------------------------------
+
+    def _load_limits(self):
+        """Re-read the account limits when stale; the request runs without the lock."""
+        with self._lock:
+            if self._limits and time.time() - self._limits_at < LIMITS_TTL:
+                return
+        limits = {}
+        try:
+            code, payload = self.api.get_accounts()
+            if code == 200:
+                limits = channel_limits(payload)
+            else:
+                logger.warning(f"Could not read channel limits ({code}); using defaults")
+        except Exception as e:
+            logger.warning(f"Could not read channel limits: {e}")
+        with self._lock:
+            self._limits = limits or self._limits or {DEFAULT_CHANNEL: dict(DEFAULT_LIMITS)}
+            self._limits_at = time.time()
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Re-read the running jobs if the snapshot is stale (or forced).
+
+        The requests run without the lock; the parsed snapshot is swapped in
+        under it, so slow API calls never block admission or release().
+
+        Returns:
+            False if the running jobs could not be read
+        """
+        self._load_limits()
+        with self._lock:
+            if not force and time.time() - self._refreshed_at < self.refresh_interval:
+                return self.error is None
+            started = self._refreshed_at = time.time()  # concurrent callers use the current snapshot
+        try:
+            code, payload = self.api.list_running_jobs()
+        except Exception as e:
+            code, payload = 500, {"error": str(e)}
+        parsed = running_jobs_by_channel(payload) if code == 200 else None
+
+        with self._lock:
+            if parsed is None:
+                self.error = f"error {code}" if code != 200 else "unrecognised running jobs payload"
+                logger.warning(f"Could not read running jobs ({self.error}); counting local jobs only")
+                return False
+            self.error = None
+            running, self._unlisted = parsed
+            # Jobs released while the request was in flight are finished, even if listed
+            for key, released_at in list(self._released.items()):
+                if released_at >= started:
+                    running.pop(key, None)
+                else:
+                    del self._released[key]
+            now = time.time()
+            for key, entry in list(self._admitted.items()):
+                if key in running:
+                    entry["seen"] = True
+                elif entry["seen"] or (entry["job_id"] and now - entry["at"] > ADMIT_GRACE):
+                    # Left the running set, or the server never reported it
+                    del self._admitted[key]
+            self._running = running
+            return True
+
+    def _channel_of(self, channel: str) -> str:
+        """Map channels the limits do not know (e.g. flat payloads) onto the first one."""
+        return channel if channel in self._limits else next(iter(self._limits))
+
+    def _usage(self) -> Dict[str, Dict[str, int]]:
+        usage = {ch: {"jobs": 0, IMAGE: 0, VIDEO: 0} for ch in self._limits}
+        jobs = dict(self._running)
+        for key, entry in self._admitted.items():
+            jobs.setdefault(key, (entry["channel"], entry["kind"]))
+        for channel, kind in jobs.values():
+            counts = usage[self._channel_of(channel)]
+            counts["jobs"] += 1
+            counts[kind] += 1
+        for channel, extra in self._unlisted.items():
+            usage[self._channel_of(channel)]["jobs"] += extra
+        return usage
+
+    def _limit(self, channel: str, key: str) -> int:
+        limit = self._limits[channel][key]
+        if self.max_jobs is not None:
+            limit = min(limit, self.max_jobs)
+        if key == "maxJobs" and self.controller is not None:
+            limit = self.controller.limit(channel, limit)
+        return limit
+
+    def _free(self, channel: str, kind: str, counts: Dict[str, int]) -> int:
+        kind_key = "maxVideoJobs" if kind == VIDEO else "maxImageJobs"
+        return min(self._limit(channel, "maxJobs") - counts["jobs"],
+                   self._limit(channel, kind_key) - counts[kind])
+
+    # -- admission ----------------------------------------------------------
+
+    def _best(self, kind: str, channel: Optional[str]) -> Optional[str]:
+        """Channel with the most room for `kind`, weighted by health (only `channel` if given)."""
+        usage = self._usage()
+        if channel is not None:
+            if channel not in self._limits:
+                if set(self._limits) != {DEFAULT_CHANNEL}:
+                    return None  # never admit a pinned job on another channel's slots
+                channel = DEFAULT_CHANNEL  # channels unknown: everything shares one bucket
+            usage = {channel: usage[channel]}
+        free = {ch: self._free(ch, kind, counts) for ch, counts in usage.items()}
+        open_channels = [ch for ch in free if free[ch] > 0]
+        if self.health is not None:
+            # Probes are network calls; acquire()/pick() run them before taking the lock
+            open_channels = [ch for ch in open_channels if self.health.available(ch, probe=False)]
+        if not open_channels:
+            return None
+        return max(open_channels, key=lambda ch: free[ch] * self._score(ch))
+
+    def acquire(self, kind: str = IMAGE, channel: Optional[str] = None) -> Optional[str]:
+        """
+        Reserve a slot of the given class on the channel with the most room.
+
+        Args:
+            kind: Slot class (IMAGE or VIDEO)
+            channel: Only admit on this channel, e.g. the parent job's channel
+                for a button follow-up (optional)
+
+        Returns:
+            A ticket to bind() to the submitted job or release(), or None if
+            every eligible channel is full for that class
+        """
+        self.refresh()
+        self._probe_due()
+        with self._lock:
+            channel = self._best(kind, channel)
+            if channel is None:
+                return None
+            ticket = f"_slot{next(self._tickets)}"
+            self._admitted[ticket] = {"channel": channel, "kind": kind, "at": time.time(),
+                                      "job_id": None, "seen": False}
+            return ticket
+
+    def pick(self, kind: str = IMAGE) -> Optional[str]:
+        """Channel a new job of `kind` should go to, without reserving a slot (None if all full)."""
+        self.refresh()
+        self._probe_due()
+        with self._lock:
+            return self._best(kind, None)
+
+    def channel(self, key: str) -> Optional[str]:
+        """Channel a ticket or job ID was admitted on (None if unknown or the default channel)."""
+        with self._lock:
+            entry = self._admitted.get(key)
+            channel = entry["channel"] if entry else self._running.get(key, (None,))[0]
+            return channel or None
+
+    def bind(self, ticket: str, job_id: str):
+        """Attach the submitted job's ID to a ticket (the slot stays taken)."""
+        with self._lock:
+            entry = self._admitted.pop(ticket, None)
+            if entry is None or not job_id:
+                return
+            entry.update(job_id=job_id, at=time.time(), seen=job_id in self._running)
+            self._admitted[job_id] = entry
+
+    def release(self, key: str):
+        """Free the slot held by a ticket or job ID (failed submit or terminal job)."""
+        with self._lock:
+            self._admitted.pop(key, None)
+            self._running.pop(key, None)
+            if not key.startswith("_slot"):
+                self._released[key] = time.time()
+
+    def _probe_due(self):
+        """Half-open probes of cooled-off channels, run without holding the lock."""
+        if self.health is not None:
+            self.health.probe_due()
+
+    def _score(self, channel: str) -> float:
+        # Floor keeps a fresh or recovering channel eligible for work
+        return max(self.health.score(channel), 0.05) if self.health is not None else 1.0
+
+    def report(self, key: str, status_code: int, response: Optional[Dict[str, Any]] = None,
+               latency: Optional[float] = None):
+        """
+        Feed a submission result for a ticket (or bound job ID) to the
+        controller and the channel's circuit breaker.
+
+        200/201 grow the channel's window, 429 halves it and 596 freezes the
+        channel; the channel comes from the response if it names one.
+        """
+        if self.controller is None and self.health is None:
+            return
+        with self._lock:
+            entry = self._admitted.get(key) or {}
+            channel = entry.get("channel", DEFAULT_CHANNEL)
+            named = (response or {}).get("channel") if isinstance(response, dict) else None
+            if named and str(named) in self._limits:
+                channel = str(named)
+            ceiling = self._limits[channel]["maxJobs"] if channel in self._limits else DEFAULT_LIMITS["maxJobs"]
+            if self.max_jobs is not None:
+                ceiling = min(ceiling, self.max_jobs)
+        if self.health is not None:
+            self.health.record(channel, status_code, latency, response)
+        if self.controller is None:
+            return
+        if status_code in (200, 201):
+            self.controller.on_success(channel, ceiling)
+        elif status_code == 429:
+            self.controller.on_rate_limited(channel)
+        elif status_code == 596:
+            error = (response or {}).get("error", "") if isinstance(response, dict) else ""
+            self.controller.freeze(channel, f"596 moderation/CAPTCHA {error}".strip())
+
+    def frozen(self) -> Dict[str, str]:
+        """Channels frozen by a 596, and why."""
+        return self.controller.frozen() if self.controller is not None else {}
+
+    def all_frozen(self) -> bool:
+        """True if no known channel can take work until thawed."""
+        frozen = self.frozen()
+        with self._lock:
+            return bool(frozen) and all(ch in frozen for ch in (self._limits or {DEFAULT_CHANNEL: None}))
+
+    def unavailable(self) -> Dict[str, str]:
+        """Channels that cannot take work (frozen or circuit open), and why."""
+        reasons = self.frozen()
+        if self.health is not None:
+            for channel, info in self.health.snapshot().items():
+                if info["state"] != "closed":
+                    reasons.setdefault(channel, f"circuit {info['state']}: {info['error']}")
+        return reasons
+
+    def thaw(self, channel: Optional[str] = None):
+        """Unfreeze one channel (or all), e.g. after a channel reset; open circuits are probed next."""
+        if self.controller is not None:
+            self.controller.thaw(channel)
+        if self.health is not None:
+            self.health.probe_now(channel)
+
+    def window(self, channel: Optional[str] = None) -> Optional[int]:
+        """Current adaptive job limit of a channel (the first one by default)."""
+        self._load_limits()
+        with self._lock:
+            channel = channel if channel in self._limits else next(iter(self._limits))
+            return self._limit(channel, "maxJobs")
+
+    def usage(self) -> Dict[str, Tuple[int, int]]:
+        """In-flight vs. limit across all channels: {"jobs"|"image"|"video": (used, limit)}."""
+        self._load_limits()
+        with self._lock:
+            totals = {"jobs": [0, 0], IMAGE: [0, 0], VIDEO: [0, 0]}
+            for channel, counts in self._usage().items():
+                for key, limit_key in (("jobs", "maxJobs"), (IMAGE, "maxImageJobs"),
+                                       (VIDEO, "maxVideoJobs")):
+                    totals[key][0] += counts[key]
+                    totals[key][1] += self._limit(channel, limit_key)
+            return {key: tuple(value) for key, value in totals.items()}
+
+
+_dispatchers: Dict[str, CapacityDispatcher] = {}
+_dispatchers_lock = threading.Lock()
+
+
+def get_capacity_dispatcher(api) -> CapacityDispatcher:
+    """
+    Return the shared CapacityDispatcher for an API client's token.
+
+    Args:
+        api: MidjourneyAPI instance
+
+    Returns:
+        Process-wide CapacityDispatcher bound to that token
+    """
+    key = getattr(api, "api_token", None) or str(id(api))
+    with _dispatchers_lock:
+        dispatcher = _dispatchers.get(key)
+        if dispatcher is None:
+            dispatcher = CapacityDispatcher(api, controller=AIMDController(),
+                                            health=ChannelHealth(api))
+            _dispatchers[key] = dispatcher
+        return dispatcher
@@ -0,0 +1,670 @@
+"""
+Background batch engine.
+
+A worker thread owns the batch queue, so a batch keeps submitting while the
+page is closed or rerunning. The Streamlit UI only enqueues prompts, pauses,
+resumes or cancels, and renders snapshots; capacity waits and the delay
+between jobs are interruptible, so pause and cancel take effect at once.
+
+Every submission is admitted by a CapacityDispatcher and sent to the channel
+it was admitted on, so a batch spreads across all channels of the account.
+Each prompt's animation waits for a video slot on that same channel instead
+of failing. Submission results feed back into the dispatcher: a 429 puts the
+prompt back at the head of the queue and halves the channel's concurrency
+window, and a 596 freezes the channel until the batch is resumed.
+
+Completion is event-driven through the shared JobReconciler and replyUrl
+callbacks, and the auto-pilot follow-up (AI selection and animation) runs on
+a small thread pool. With a BatchStore every item change is written to disk,
+and a new engine resumes each item from its last completed stage without
+submitting anything twice.
+"""
+
+import copy
+import hashlib
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from ..utils.prompt_builder import build_prompt
+from ..utils.media import get_video_url
+from ..utils.media_cache import MediaCache, get_media_cache
+from ..utils.quadrants import QuadrantSplitter, get_quadrant_splitter
+from ..utils.reconciler import JobReconciler
+from ..utils.webhook import CALLBACK_TIMEOUT
+from .concurrency import AIMDController
+from .dispatcher import IMAGE, VIDEO, CapacityDispatcher
+from .router import channel_of
+from .health import ChannelHealth
+from .store import BATCH_DB_FILE, BatchStore
+
+logger = logging.getLogger(__name__)
+
+CAPACITY_POLL_INTERVAL = 5  # seconds between capacity checks while full
+CAPACITY_TIMEOUT = 300  # pause the batch after waiting this long for a slot
+FOLLOW_UP_WORKERS = 4
+MAX_RATE_LIMIT_RETRIES = 5  # 429s tolerated per submission before it fails
+ANIMATE_BUTTON = "Animate (High motion)"
+
+IDLE, RUNNING, PAUSED = "idle", "running", "paused"
+
+# Item stages, in order; each is persisted before the step it names starts
+STAGE_QUEUED = "queued"
+STAGE_SUBMITTING = "submitting"  # imagine request sent, jobid not known yet
+STAGE_IMAGINING = "imagining"  # imagine job running
+STAGE_ANALYZING = "analyzing"  # imagine complete, auto-pilot selecting
+STAGE_ANIMATING = "animating"  # animate button pressed / animation running
+STAGE_DONE = "done"
+
+
+@dataclass
+class BatchSnapshot:
+    """Point-in-time copy of the engine state for rendering."""
+    state: str
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    message: str = ""
+    running_jobs: Optional[int] = None
+    max_concurrent: Optional[int] = None
+    capacity: Dict[str, Tuple[int, int]] = field(default_factory=dict)  # class -> (in flight, limit)
+
+    def count(self, status: str) -> int:
+        return sum(1 for item in self.items if item.get("status") == status)
+
+    @property
+    def total(self) -> int:
+        return len(self.items)
+
+    @property
+    def processed(self) -> int:
+        """Items that left the queue (submitted, failed or cancelled)."""
+        return sum(1 for item in self.items if item.get("status") not in ("queued", "submitting"))
+
+    @property
+    def progress(self) -> float:
+        return self.processed / self.total if self.total else 0.0
+
+
+class BatchEngine:
+    """
+    Background batch submission queue.
+
+    Usage:
+        engine = BatchEngine(api, reconciler, on_job=record)
+        engine.enqueue(prompts, params, delay=3)
+        engine.pause(); engine.resume(); engine.cancel()
+        snapshot = engine.snapshot()
+        version, jobs = engine.jobs_since(version)   # job records for a UI session
+    """
+
+    def __init__(self, api, reconciler: Optional[JobReconciler] = None, callback_server=None,
+                 on_job: Optional[Callable[[str, Dict], None]] = None,
+                 analyzer: Optional[Callable[..., Any]] = None,
+                 max_concurrent: Optional[int] = None,
+                 media_cache: Optional[MediaCache] = None,
+                 dispatcher: Optional[CapacityDispatcher] = None,
+                 store: Optional[BatchStore] = None):
+        """
+        Initialize batch engine.
+
+        Args:
+            api: MidjourneyAPI instance
+            reconciler: JobReconciler that reports job completion
+            callback_server: CallbackServer for replyUrl callbacks (optional)
+            on_job: Called as (job_id, job_data) from engine threads when a job
+                is submitted or reaches a terminal state, e.g. to persist it;
+                sessions read the same records through jobs_since()
+            analyzer: analyze_and_select-compatible function used by auto-pilot
+            max_concurrent: Cap on each channel's job limit (account limits if None)
+            media_cache: Cache used to fetch grids for auto-pilot (defaults to the shared cache)
+            dispatcher: CapacityDispatcher admitting jobs (a private one if None)
+            store: BatchStore to persist items to and resume them from (optional)
+        """
+        self.api = api
+        self.reconciler = reconciler or JobReconciler(api)
+        self.callback_server = callback_server
+        self.on_job = on_job
+        self.analyzer = analyzer
+        self.dispatcher = dispatcher or CapacityDispatcher(api, max_jobs=max_concurrent,
+                                                           controller=AIMDController(),
+                                                           health=ChannelHealth(api))
+        self.media_cache = media_cache
+        self.store = store
+
+        self._items: List[Dict[str, Any]] = []
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._done: Dict[str, threading.Event] = {}
+        self._cond = threading.Condition(threading.RLock())
+        self._paused = False
+        self._stopping = False
+        self._submitting = False
+        self._releases = 0
+        self._next_index = 1
+        self._jobs: Dict[str, Tuple[int, Dict]] = {}  # job_id -> (version, latest data)
+        self._jobs_version = 0
+        self._live_from = 1  # items below this index were detached by clear()
+        self._thread: Optional[threading.Thread] = None
+        self._follow_ups = ThreadPoolExecutor(max_workers=FOLLOW_UP_WORKERS,
+                                              thread_name_prefix="mj-batch-followup")
+        self.message = ""
+        self.capacity: Dict[str, Tuple[int, int]] = {}
+        if store is not None:
+            self._restore()
+
+    # -- controls -----------------------------------------------------------
+
+    def enqueue(self, prompts: Sequence[str], params: Optional[Dict[str, Any]] = None,
+                delay: float = 3, autopilot: bool = False, context: str = "",
+                wait_for_completion: bool = False) -> List[Dict[str, Any]]:
+        """
+        Queue prompts for submission.
+
+        Args:
+            prompts: Raw prompts, one job each
+            params: build_prompt() parameters applied to every prompt
+            delay: Seconds to wait between submissions
+            autopilot: Let the analyzer pick and animate the best image
+            context: Story/thematic context for the analyzer
+            wait_for_completion: Wait for each job to finish before the next
+
+        Returns:
+            Snapshot copies of the queued items
+        """
+        options = {"delay": delay, "autopilot": autopilot, "context": context,
+                   "wait_for_completion": wait_for_completion}
+        with self._cond:
+            items = []
+            next_index = self._allocate(len(prompts))
+            for n, raw_prompt in enumerate(prompts):
+                item = {
+                    "index": next_index + n,
+                    "prompt": raw_prompt,
+                    "params": params,
+                    "full_prompt": build_prompt(raw_prompt, params) if params else raw_prompt,
+                    "jobid": None,
+                    "status": "queued",
+                    "stage": STAGE_QUEUED,
+                    "submitted_at": None,
+                    "anim_jobid": None,
+                    "ai_reasoning": None,
+                    "thread_status": "🕒 Queued",
+                    "options": options,
+                }
+                self._items.append(item)
+                self._queue.append(item)
+                items.append(item)
+            self._persist(*items)
+            self._stopping = False
+            self._cond.notify_all()
+            snapshot = copy.deepcopy(items)
+        self._start()
+        return snapshot
+
+    def pause(self):
+        """Stop submitting after the current job; queued items are kept."""
+        with self._cond:
+            self._paused = True
+            self.message = "⏸️ Paused"
+            self._cond.notify_all()
+
+    def resume(self):
+        """Continue submitting; channels frozen by a 596 are assumed reset and thawed."""
+        self.dispatcher.thaw()
+        with self._cond:
+            self._paused = False
+            self.message = "▶️ Resumed"
+            self._cond.notify_all()
+
+    def cancel(self):
+        """Drop all queued items. Jobs already submitted keep processing."""
+        with self._cond:
+            for item in self._queue:
+                item.update(status="cancelled", stage=STAGE_DONE, thread_status="⏹️ Cancelled")
+            self._persist(*self._queue)
+            cancelled = len(self._queue)
+            self._queue.clear()
+            self._paused = False
+            self.message = f"⏹️ Batch stopped ({cancelled} queued prompts cancelled)"
+            for event in self._done.values():
+                event.set()
+            self._cond.notify_all()
+
+    def clear(self):
+        """
+        Cancel the queue and forget all items. Jobs already in flight keep
+        running, but their later updates are no longer stored.
+        """
+        with self._cond:
+            self.cancel()
+            self._items.clear()
+            self._live_from = self._next_index
+            if self.store is not None:
+                self.store.clear()
+            self.message = ""
+
+    @property
+    def state(self) -> str:
+        with self._cond:
+            if not self._queue and not self._submitting:
+                return IDLE
+            return PAUSED if self._paused else RUNNING
+
+    def snapshot(self) -> BatchSnapshot:
+        """Copy of the current state, safe to render from the script thread."""
+        with self._cond:
+            jobs = self.capacity.get("jobs")
+            return BatchSnapshot(
+                state=self.state,
+                items=copy.deepcopy(self._items),
+                message=self.message,
+                running_jobs=jobs[0] if jobs else None,
+                max_concurrent=jobs[1] if jobs else None,
+                capacity=dict(self.capacity),
+            )
+
+    def jobs_since(self, version: int = 0) -> Tuple[int, Dict[str, Dict]]:
+        """
+        Job records (submissions and terminal states) reported after `version`.
+
+        Each UI session keeps the returned version and merges the jobs into
+        its own state, so any number of sessions can follow one engine.
+
+        Returns:
+            (current version, job_id -> latest job data)
+        """
+        with self._cond:
+            jobs = {job_id: data for job_id, (seen, data) in self._jobs.items() if seen > version}
+            return self._jobs_version, jobs
+
+    def stop(self):
+        """
+        Stop the worker thread. Queued items are not cancelled, so a stored
+        queue resumes in the next engine; call cancel() first to drop it.
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._follow_ups.shutdown(wait=False)
+
+    # -- persistence --------------------------------------------------------
+
+    def _allocate(self, count: int) -> int:
+        """First of `count` fresh item indices (never reused, even after clear())."""
+        first = self._next_index
+        if self.store is not None:
+            try:
+                first = max(first, self.store.allocate(count))
+            except Exception as e:
+                logger.error(f"Could not reserve batch indices: {e}")
+        self._next_index = first + count
+        return first
+
+    def _persist(self, *items: Dict[str, Any]):
+        items = [item for item in items if item["index"] >= self._live_from]
+        if self.store is None or not items:
+            return
+        try:
+            self.store.save_many(items)
+        except Exception as e:
+            logger.error(f"Could not persist batch items: {e}")
+
+    def _restore(self):
+        """Reload stored items and pick each one up after its last completed stage."""
+        try:
+            items = self.store.load()
+        except Exception as e:
+            logger.error(f"Could not load the stored batch queue: {e}")
+            return
+        if not items:
+            return
+
+        tracked = []
+        with self._cond:
+            for item in items:
+                stage = item.get("stage")
+                if stage == STAGE_QUEUED:
+                    self._queue.append(item)
+                elif stage == STAGE_SUBMITTING:
+                    # The imagine request may have gone through: never resubmit blindly
+                    item.update(status="failed", stage=STAGE_DONE,
+                                error="Interrupted while submitting; not resubmitted to avoid a duplicate job",
+                                thread_status="⚠️ Interrupted while submitting")
+                elif stage in (STAGE_IMAGINING, STAGE_ANALYZING) and item.get("jobid"):
+                    # An analysis in progress restarts from the completed imagine job
+                    tracked.append((item["jobid"], self._on_complete, item))
+                    item["thread_status"] = "🔄 Resumed"
+                elif stage == STAGE_ANIMATING and item.get("anim_jobid"):
+                    tracked.append((item["anim_jobid"], self._on_animation_complete, item))
+                    item["thread_status"] = "🔄 Resumed (video polling)"
+                elif stage == STAGE_ANIMATING:
+                    item.update(stage=STAGE_DONE, thread_status="⚠️ Interrupted while animating")
+                self._items.append(item)
+            self._next_index = max(item["index"] for item in self._items) + 1
+            self._persist(*self._items)
+            queued = len(self._queue)
+            if queued or tracked:
+                self.message = f"🔄 Resumed batch ({queued} queued, {len(tracked)} in progress)"
+
+        logger.info(f"Restored {len(items)} batch items ({len(self._queue)} queued, {len(tracked)} running)")
+        for job_id, handler, item in tracked:
+            self.reconciler.track(job_id, on_complete=lambda jid, data, i=item, h=handler: h(i, jid, data))
+        if self._queue:
+            self._start()
+
+    # -- worker -------------------------------------------------------------
+
+    def _start(self):
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="mj-batch", daemon=True)
+            self._thread.start()
+
+    def _interrupted(self) -> bool:
+        return self._stopping or self._paused or not self._queue
+
+    def _wait(self, seconds: float) -> bool:
+        """Wait up to `seconds`; returns False if paused, cancelled or stopped meanwhile."""
+        with self._cond:
+            self._cond.wait_for(self._interrupted, timeout=seconds)
+            return not self._interrupted()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopping or (self._queue and not self._paused))
+                if self._stopping:
+                    return
+                item = self._queue[0]
+
+            ticket = self._wait_for_capacity(IMAGE, self._interrupted, self._set_message)
+            if ticket is None:
+                with self._cond:
+                    if not self._interrupted():
+                        self._paused = True
+                        if self.dispatcher.all_frozen():
+                            self.message = ("🛑 Channel frozen after a moderation/CAPTCHA error (596). "
+                                            "Reset the channel, then resume the batch.")
+                        else:
+                            self.message = "⏰ Timeout waiting for capacity. Batch paused."
+                continue
+
+            with self._cond:
+                if self._interrupted() or self._queue[0] is not item:
+                    self.dispatcher.release(ticket)
+                    continue
+                self._queue.popleft()
+                self._submitting = True
+                self._set_status(item, status="submitting", stage=STAGE_SUBMITTING)
+            try:
+                self._submit(item, ticket)
+            except Exception as e:
+                logger.exception(f"Unexpected error submitting batch prompt {item['index']}")
+                self._set_status(item, status="failed", stage=STAGE_DONE, error=str(e),
+                                 thread_status=f"💥 Error: {e}")
+            finally:
+                # No-op once the ticket is bound to the submitted job
+                self.dispatcher.release(ticket)
+                with self._cond:
+                    self._submitting = False
+
+            options = item["options"]
+            if options["wait_for_completion"] and item.get("jobid"):
+                with self._cond:
+                    self.message = f"⏳ [{item['index']}] Waiting for job to complete..."
+                done = self._done.get(item["jobid"])
+                while done and not done.is_set() and not self._stopping:
+                    done.wait(1)
+            if options["delay"] > 0:
+                with self._cond:
+                    if self._queue:
+                        self.message = f"⏳ Next job in {options['delay']}s..."
+                self._wait(options["delay"])
+
+    def _set_message(self, message: str):
+        with self._cond:
+            self.message = message
+
+    def _release_slot(self, key: str):
+        """Free a dispatcher slot and wake anything waiting for one."""
+        self.dispatcher.release(key)
+        with self._cond:
+            self._releases += 1
+            self._cond.notify_all()
+
+    def _wait_for_capacity(self, kind: str, interrupted: Callable[[], bool],
+                           on_wait: Callable[[str], None],
+                           channel: Optional[str] = None) -> Optional[str]:
+        """
+        Block until the dispatcher admits a job of `kind` (on `channel` if given).
+
+        Waits are cut short when a slot is released. Returns the dispatcher
+        ticket, or None if interrupted, every eligible channel is frozen, or
+        nothing freed up within CAPACITY_TIMEOUT.
+        """
+        started = time.time()
+        while not interrupted():
+            ticket = self.dispatcher.acquire(kind, channel=channel)
+            usage = self.dispatcher.usage()
+            with self._cond:
+                self.capacity = usage
+            if ticket is not None:
+                return ticket
+            waited = int(time.time() - started)
+            if (waited >= CAPACITY_TIMEOUT or self.dispatcher.all_frozen()
+                    or (channel and channel in self.dispatcher.frozen())):
+                return None
+            (jobs, max_jobs), (used, limit) = usage["jobs"], usage[kind]
+            unavailable = self.dispatcher.unavailable()
+            if unavailable:
+                reasons = "; ".join(f"{ch or 'default'} {why}" for ch, why in unavailable.items())
+                on_wait(f"🔌 Waiting for a healthy channel ({reasons}). Waiting ({waited}s)")
+            else:
+                on_wait(f"⏳ At capacity ({jobs}/{max_jobs} jobs, {used}/{limit} {kind}). Waiting ({waited}s)")
+            with self._cond:
+                releases = self._releases
+                self._cond.wait_for(lambda: interrupted() or self._releases != releases,
+                                    timeout=CAPACITY_POLL_INTERVAL)
+        return None
+
+    def _submit(self, item: Dict[str, Any], ticket: str):
+        callback_server = self.callback_server
+        if callback_server and not callback_server.reply_url:
+            callback_server = None
+
+        with self._cond:
+            self.message = f"🎨 [{item['index']}] Submitting Imagine..."
+        logger.info(f"Batch SUBMIT [{item['index']}]: {item['prompt']}")
+
+        reply_ref = callback_server.register(on_update=self.reconciler.apply) if callback_server else None
+        started = time.monotonic()
+        code, result = self.api.imagine(
+            item["full_prompt"], channel=self.dispatcher.channel(ticket), stream=False,
+            reply_url=callback_server.reply_url if callback_server else None,
+            reply_ref=reply_ref
+        )
+        self.dispatcher.report(ticket, code, result, latency=time.monotonic() - started)
+
+        if code in [200, 201]:
+            job_id = result.get("jobid")
+            self.dispatcher.bind(ticket, job_id)
+            with self._cond:
+                self._done[job_id] = threading.Event()
+                self._set_status(item, jobid=job_id, status="submitted", stage=STAGE_IMAGINING,
+                                 submitted_at=datetime.now().isoformat(),
+                                 thread_status="🚀 Submitted")
+                self.message = f"✅ [{item['index']}] Submitted: {job_id}"
+            self._notify_job(job_id, result)
+            self.reconciler.track(
+                job_id, result,
+                on_complete=lambda jid, data: self._on_complete(item, jid, data),
+                callback_timeout=CALLBACK_TIMEOUT if reply_ref else None
+            )
+            if reply_ref:
+                callback_server.bind(reply_ref, job_id)  # replays callbacks received meanwhile
+        elif code == 429 and item.get("rate_limited", 0) < MAX_RATE_LIMIT_RETRIES:
+            if reply_ref:
+                callback_server.discard(reply_ref)
+            with self._cond:
+                self._set_status(item, status="queued", stage=STAGE_QUEUED,
+                                 rate_limited=item.get("rate_limited", 0) + 1,
+                                 thread_status="⏳ Rate limited, will retry")
+                self._queue.appendleft(item)
+                self.message = (f"⚠️ [{item['index']}] Rate limited (429); "
+                                f"concurrency lowered to {self.dispatcher.window()}")
+        else:
+            if reply_ref:
+                callback_server.discard(reply_ref)
+            error_msg = result.get("error", "Unknown submission error")
+            logger.error(f"Batch FAIL [{item['index']}]: {error_msg} | Response: {result}")
+            with self._cond:
+                self._set_status(item, status="failed", stage=STAGE_DONE, error=error_msg,
+                                 thread_status="❌ Submission Failed")
+                self.message = f"❌ [{item['index']}] Failed: {error_msg}"
+                if code == 596:
+                    self.message += " 🛑 Channel frozen until the batch is resumed."
+
+    def _notify_job(self, job_id: str, job_data: Dict):
+        with self._cond:
+            self._jobs_version += 1
+            self._jobs[job_id] = (self._jobs_version, job_data)
+        if self.on_job:
+            try:
+                self.on_job(job_id, job_data)
+            except Exception as e:
+                logger.error(f"Batch on_job hook failed for {job_id[:20]}: {e}")
+
+    # -- follow-ups ---------------------------------------------------------
+
+    def _on_complete(self, item: Dict[str, Any], job_id: str, job_data: Dict):
+        """Reconciler callback: the imagine job reached a terminal state."""
+        status = job_data.get("status")
+        self._release_slot(job_id)
+        self._notify_job(job_id, job_data)
+        with self._cond:
+            if status != "completed":
+                self._set_status(item, stage=STAGE_DONE, thread_status=f"❌ Error: {status}")
+            elif item["options"]["autopilot"]:
+                self._set_status(item, stage=STAGE_ANALYZING, thread_status="✅ Imagine Complete")
+                self._follow_ups.submit(self._autopilot, item, job_data)
+            else:
+                self._set_status(item, stage=STAGE_DONE, thread_status="✅ Complete")
+            done = self._done.pop(job_id, None)
+        if done:
+            done.set()
+
+    def _set_status(self, item: Dict[str, Any], **fields):
+        with self._cond:
+            item.update(fields)
+            self._persist(item)
+
+    def _autopilot(self, item: Dict[str, Any], final_result: Dict):
+        """Pick the best image with the analyzer and animate it."""
+        try:
+            if self.analyzer is None:
+                self._set_status(item, stage=STAGE_DONE, thread_status="⚠️ Auto-pilot unavailable")
+                return
+            img_url = final_result.get("response", {}).get("attachments", [{}])[0].get("url")
+            if not img_url:
+                self._set_status(item, stage=STAGE_DONE, thread_status="❌ No Image URL Found")
+                return
+
+            self._set_status(item, thread_status="🧠 Analyzing...")
+            cache = self.media_cache or get_media_cache()
+            img_bytes = cache.fetch(img_url)
+            if not img_bytes:
+                self._set_status(item, stage=STAGE_DONE, thread_status="❌ Image Download Failed")
+                return
+            splitter = QuadrantSplitter(cache) if self.media_cache else get_quadrant_splitter()
+            quadrants = splitter.crops(img_url)
+            best_quadrant, reasoning = self.analyzer(img_bytes, item["full_prompt"],
+                                                     item["options"]["context"], quadrants=quadrants)
+            self._set_status(item, ai_reasoning=reasoning)
+            if best_quadrant <= 0:
+                self._set_status(item, stage=STAGE_DONE, thread_status="⚠️ AI No Selection")
+                return
+
+            # The Animate button runs on the channel that produced the image
+            channel = channel_of(final_result) or self.dispatcher.channel(final_result.get("jobid"))
+            anim_id = None
+            for _ in range(MAX_RATE_LIMIT_RETRIES + 1):
+                self._set_status(item, thread_status=f"🎯 Selected Q{best_quadrant}. Waiting for a video slot...")
+                ticket = self._wait_for_capacity(VIDEO, lambda: self._stopping,
+                                                 lambda message: self._set_status(item, thread_status=message),
+                                                 channel=channel)
+                if ticket is None:
+                    if not self._stopping:  # on shutdown the stored item resumes from analysis
+                        self._set_status(item, stage=STAGE_DONE, thread_status="⏰ No video slot available")
+                    return
+                try:
+                    self._set_status(item, stage=STAGE_ANIMATING,
+                                     thread_status=f"🎯 Selected Q{best_quadrant}. Animating...")
+                    started = time.monotonic()
+                    code, result = self.api.button(final_result.get("jobid"), ANIMATE_BUTTON, stream=False)
+                    self.dispatcher.report(ticket, code, result, latency=time.monotonic() - started)
+                    anim_id = result.get("jobid") if code in [200, 201] else None
+                    if anim_id:
+                        self.dispatcher.bind(ticket, anim_id)
+                finally:
+                    self.dispatcher.release(ticket)
+                if code != 429:
+                    break
+            if not anim_id:
+                self._set_status(item, stage=STAGE_DONE, thread_status="❌ Animation Trigger Failed")
+                return
+
+            logger.info(f"Video animation triggered: {anim_id} (from {final_result.get('jobid')})")
+            self._set_status(item, anim_jobid=anim_id, thread_status="🎬 Video Polling...")
+            self.reconciler.track(anim_id, result,
+                                  on_complete=lambda jid, data: self._on_animation_complete(item, jid, data))
+        except Exception as e:
+            logger.exception(f"Error in auto-pilot for batch prompt {item['index']}")
+            self._set_status(item, stage=STAGE_DONE, thread_status=f"💥 Error: {e}")
+
+    def _on_animation_complete(self, item: Dict[str, Any], job_id: str, anim_final: Dict):
+        self._release_slot(job_id)
+        if anim_final.get("status") != "completed":
+            self._set_status(item, stage=STAGE_DONE, thread_status=f"❌ Animation {anim_final.get('status')}")
+            return
+        video_url = get_video_url(anim_final)
+        if video_url:
+            self._set_status(item, stage=STAGE_DONE, anim_url=video_url, thread_status="✨ Animation Ready")
+            self._notify_job(job_id, anim_final)
+        else:
+            self._set_status(item, stage=STAGE_DONE, thread_status="⚠️ Video complete, no URL")
+
+
+_engines: Dict[str, BatchEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_batch_engine(api, **kwargs) -> BatchEngine:
+    """
+    Return the process-wide BatchEngine for an API client's token.
+
+    The first call creates it with `kwargs` and a BatchStore for the token,
+    which resumes any batch stored by a previous process.
+
+    Args:
+        api: MidjourneyAPI instance
+        **kwargs: BatchEngine arguments, used only when creating the engine
+
+    Returns:
+        Shared BatchEngine bound to that token
+    """
+    key = getattr(api, "api_token", None) or str(id(api))
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            if "store" not in kwargs:
+                account = hashlib.sha256(key.encode()).hexdigest()[:16]
+                kwargs["store"] = BatchStore(BATCH_DB_FILE, account=account)
+            engine = BatchEngine(api, **kwargs)
+            _engines[key] = engine
+        return engine
@@ -0,0 +1,206 @@
+"""
+Per-channel circuit breakers and health scores.
+
+Every submission result (status code and latency) is recorded against the
+channel it went to. A channel's breaker opens after two consecutive
+failures, or at once on 401/402/596, so a broken channel stops costing
+request quota within one or two failures. After a cool-off the breaker goes
+half-open and a single cheap probe (get_account_channel) decides whether it
+closes again or stays open for twice as long.
+
+The health score (0..1) combines a moving average of the success rate with
+submission latency and is zero while the breaker is open; the dispatcher
+uses it to skip unhealthy channels and to prefer healthy ones.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+FAILURE_THRESHOLD = 2  # consecutive failures that open the breaker
+OPEN_TIMEOUT = 30  # seconds before the first half-open probe
+MAX_OPEN_TIMEOUT = 300
+LATENCY_TARGET = 5.0  # seconds; slower submissions lower the health score
+EWMA_ALPHA = 0.3
+FATAL_CODES = {401, 402, 596}  # open immediately
+FAILURE_CODES = FATAL_CODES | {500, 502, 503, 504}
+
+
+class CircuitBreaker:
+    """Closed/open/half-open state and health of one channel."""
+
+    def __init__(self, channel: str, failure_threshold: int = FAILURE_THRESHOLD,
+                 open_timeout: float = OPEN_TIMEOUT, max_open_timeout: float = MAX_OPEN_TIMEOUT,
+                 clock: Callable[[], float] = time.monotonic):
+        self.channel = channel
+        self.failure_threshold = failure_threshold
+        self.open_timeout = open_timeout
+        self.max_open_timeout = max_open_timeout
+        self._clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.timeout = open_timeout
+        self.opened_at = 0.0
+        self.success_rate = 1.0
+        self.latency: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def _open(self, error: Optional[str]):
+        if self.state == HALF_OPEN:
+            self.timeout = min(self.timeout * 2, self.max_open_timeout)
+        elif self.state == CLOSED:
+            self.timeout = self.open_timeout
+        self.state = OPEN
+        self.opened_at = self._clock()
+        self.last_error = error
+        logger.warning(f"Circuit open for channel {self.channel or 'default'} "
+                       f"({error}); probing in {self.timeout:.0f}s")
+
+    def _close(self):
+        if self.state != CLOSED:
+            logger.info(f"Circuit closed for channel {self.channel or 'default'}")
+        self.state = CLOSED
+        self.failures = 0
+        self.timeout = self.open_timeout
+        self.last_error = None
+
+    def record(self, status_code: int, latency: Optional[float] = None, error: Optional[str] = None):
+        """Update the breaker from one response."""
+        if latency is not None:
+            self.latency = latency if self.latency is None else (
+                EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.latency)
+        if status_code in FAILURE_CODES:
+            self.success_rate *= 1 - EWMA_ALPHA
+            self.failures += 1
+            if status_code in FATAL_CODES or self.failures >= self.failure_threshold:
+                self._open(error or f"HTTP {status_code}")
+        elif 200 <= status_code < 300:
+            self.success_rate = EWMA_ALPHA + (1 - EWMA_ALPHA) * self.success_rate
+            self._close()
+
+    def probe_due(self) -> bool:
+        """True once an open breaker has cooled off and may be probed."""
+        return self.state == OPEN and self._clock() - self.opened_at >= self.timeout
+
+    def probe_result(self, ok: bool, error: Optional[str] = None):
+        if ok:
+            self.success_rate = max(self.success_rate, 0.5)
+            self._close()
+        else:
+            self._open(error or "probe failed")
+
+    @property
+    def health(self) -> float:
+        """0 (unusable) .. 1 (healthy)."""
+        if self.state != CLOSED:
+            return 0.0
+        latency_factor = 1.0
+        if self.latency:
+            latency_factor = min(1.0, LATENCY_TARGET / self.latency)
+        return round(self.success_rate * latency_factor, 3)
+
+
+class ChannelHealth:
+    """
+    Circuit breakers for all channels of one account.
+
+    Usage:
+        health = ChannelHealth(api)
+        if health.available(channel):       # probes a cooled-off open channel (network)
+            ...submit...
+        health.record(channel, status_code, latency)
+        health.score(channel)
+    """
+
+    def __init__(self, api, clock: Callable[[], float] = time.monotonic, **breaker_options):
+        """
+        Args:
+            api: MidjourneyAPI instance (used for half-open probes)
+            clock: Monotonic time source (mainly for tests)
+            **breaker_options: CircuitBreaker settings (failure_threshold, open_timeout, ...)
+        """
+        self.api = api
+        self._clock = clock
+        self._options = breaker_options
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def _breaker(self, channel: str) -> CircuitBreaker:
+        breaker = self._breakers.get(channel)
+        if breaker is None:
+            breaker = CircuitBreaker(channel, clock=self._clock, **self._options)
+            self._breakers[channel] = breaker
+        return breaker
+
+    def record(self, channel: str, status_code: int, latency: Optional[float] = None,
+               response: Optional[Dict[str, Any]] = None):
+        """Feed a response code (and request latency) for a channel."""
+        error = response.get("error") if isinstance(response, dict) else None
+        with self._lock:
+            self._breaker(channel).record(status_code, latency, error)
+
+    def available(self, channel: str, probe: bool = True) -> bool:
+        """
+        True if the channel may take work.
+
+        With `probe`, a cooled-off open channel is probed first (a network
+        call); callers holding a lock pass probe=False and run probe_due()
+        outside it.
+        """
+        with self._lock:
+            breaker = self._breaker(channel)
+            if breaker.state == CLOSED:
+                return True
+            if not probe or not breaker.probe_due():
+                return False
+            breaker.state = HALF_OPEN  # one probe at a time
+        ok, error = self._probe(channel)
+        with self._lock:
+            breaker.probe_result(ok, error)
+            return breaker.state == CLOSED
+
+    def probe_due(self):
+        """Run the half-open probe of every open channel that has cooled off."""
+        with self._lock:
+            due = [ch for ch, breaker in self._breakers.items() if breaker.probe_due()]
+        for channel in due:
+            self.available(channel)
+
+    def _probe(self, channel: str):
+        try:
+            if channel:
+                code, data = self.api.get_account_channel(channel)
+            else:
+                code, data = self.api.get_accounts()
+        except Exception as e:
+            return False, str(e)
+        if code != 200:
+            return False, f"probe HTTP {code}"
+        error = data.get("error") if isinstance(data, dict) else None
+        return not error, error
+
+    def probe_now(self, channel: Optional[str] = None):
+        """Make open breakers (one or all) due for a probe on their next check."""
+        with self._lock:
+            breakers = [self._breaker(channel)] if channel is not None else self._breakers.values()
+            for breaker in breakers:
+                if breaker.state == OPEN:
+                    breaker.opened_at = float("-inf")
+
+    def score(self, channel: str) -> float:
+        with self._lock:
+            return self._breaker(channel).health
+
+    def state(self, channel: str) -> str:
+        with self._lock:
+            return self._breaker(channel).state
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-channel state, health, failures and last error, for display."""
+        with self._lock:
+            return {ch: {"state": b.state, "health": b.health, "failures": b.failures,
+                         "error": b.last_error} for ch, b in self._breakers.items()}
@@ -0,0 +1,133 @@
+"""
+Multi-channel job routing.
+
+New jobs (imagine, blend, describe) are sent with an explicit channel: the
+one with the most free capacity for the job's slot class, weighted by
+health, as chosen by the CapacityDispatcher. An account with several
+Discord channels therefore fills all of them instead of queueing everything
+on the first.
+
+Follow-ups (button, seed) always run on the channel holding the parent job's
+message. The router remembers which channel each job went to (from the
+submission response, or inherited from its parent) so follow-ups can be
+checked against, and admitted on, that channel.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Union
+
+from .dispatcher import IMAGE, CapacityDispatcher, get_capacity_dispatcher
+
+MAX_REMEMBERED = 2000  # job -> channel entries kept for follow-ups
+
+Job = Union[str, Dict[str, Any], None]
+
+
+def channel_of(job: Any) -> Optional[str]:
+    """Channel named by a job or submission response (None if it names none)."""
+    if not isinstance(job, dict):
+        return None
+    channel = job.get("channel") or (job.get("response") or {}).get("channel")
+    return str(channel) if channel else None
+
+
+class JobRouter:
+    """
+    Channel selection for new jobs and sticky routing for follow-ups.
+
+    Usage:
+        router = get_job_router(api)
+        channel = router.route(IMAGE, fallback=active_channel)
+        code, result = api.imagine(prompt, channel=channel)
+        router.remember(result["jobid"], result)
+        ...
+        channel = router.route(parent=job_id)      # the parent's channel
+        if router.available(channel):
+            code, result = api.button(job_id, "U1")
+            router.remember(result["jobid"], result, parent=job_id)
+    """
+
+    def __init__(self, dispatcher: CapacityDispatcher, max_remembered: int = MAX_REMEMBERED):
+        """
+        Args:
+            dispatcher: CapacityDispatcher providing per-channel capacity and health
+            max_remembered: Job -> channel entries kept (oldest are dropped)
+        """
+        self.dispatcher = dispatcher
+        self.max_remembered = max_remembered
+        self._lock = threading.Lock()
+        self._channels: "OrderedDict[str, str]" = OrderedDict()
+
+    def channel_for(self, job: Job) -> Optional[str]:
+        """Channel a job ran on: remembered, named by the job data, or None."""
+        if isinstance(job, dict):
+            return channel_of(job) or self.channel_for(job.get("jobid"))
+        if not job:
+            return None
+        with self._lock:
+            channel = self._channels.get(job)
+        return channel or self.dispatcher.channel(job)
+
+    def remember(self, job_id: str, job: Optional[Dict[str, Any]] = None, parent: Job = None):
+        """Record a submitted job's channel (from its response, else its parent's)."""
+        channel = channel_of(job) or self.channel_for(parent)
+        if not job_id or not channel:
+            return
+        with self._lock:
+            self._channels[job_id] = channel
+            self._channels.move_to_end(job_id)
+            while len(self._channels) > self.max_remembered:
+                self._channels.popitem(last=False)
+
+    def route(self, kind: str = IMAGE, parent: Job = None,
+              fallback: Optional[str] = None) -> Optional[str]:
+        """
+        Channel for a job.
+
+        Args:
+            kind: Slot class of the new job (IMAGE or VIDEO)
+            parent: Parent job (ID or data) of a follow-up; pins it to that job's channel
+            fallback: Channel to use when no channel has free capacity
+
+        Returns:
+            A channel ID, or None to let the server choose
+        """
+        if parent is not None:
+            return self.channel_for(parent) or fallback
+        return self.dispatcher.pick(kind) or fallback
+
+    def available(self, channel: Optional[str]) -> bool:
+        """False while a channel is frozen or its circuit is open (probes it when due)."""
+        if not channel:
+            return True
+        if channel in self.dispatcher.frozen():
+            return False
+        health = self.dispatcher.health
+        return health is None or health.available(channel)
+
+    def unavailable_reason(self, channel: Optional[str]) -> Optional[str]:
+        return self.dispatcher.unavailable().get(channel) if channel else None
+
+
+_routers: Dict[str, JobRouter] = {}
+_routers_lock = threading.Lock()
+
+
+def get_job_router(api) -> JobRouter:
+    """
+    Return the shared JobRouter for an API client's token.
+
+    Args:
+        api: MidjourneyAPI instance
+
+    Returns:
+        Process-wide JobRouter over that token's CapacityDispatcher
+    """
+    key = getattr(api, "api_token", None) or str(id(api))
+    with _routers_lock:
+        router = _routers.get(key)
+        if router is None:
+            router = JobRouter(get_capacity_dispatcher(api))
+            _routers[key] = router
+        return router
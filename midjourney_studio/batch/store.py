@@ -0,0 +1,136 @@
+"""
+SQLite-backed batch queue.
+
+BatchStore keeps one durable record per batch item (prompt, build
+parameters, options, status, stage, jobid, anim_jobid and the rest of the
+item dict) in a WAL-mode SQLite database, so a batch survives browser
+refreshes, process restarts and crashes. The BatchEngine writes every item
+change through and reloads the records on startup to resume each item from
+its last completed stage. Item indices come from a per-account counter that
+survives clear(), so a late update for a cleared item can never overwrite a
+newer item's record.
+"""
+
+import json
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Union
+
+logger = logging.getLogger(__name__)
+
+BATCH_DB_FILE = Path("batch_queue.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batch_items (
+    account    TEXT NOT NULL,
+    idx        INTEGER NOT NULL,
+    status     TEXT,
+    stage      TEXT,
+    jobid      TEXT,
+    anim_jobid TEXT,
+    updated    TEXT,
+    data       TEXT NOT NULL,
+    PRIMARY KEY (account, idx)
+);
+CREATE INDEX IF NOT EXISTS idx_batch_items_stage ON batch_items(account, stage);
+CREATE TABLE IF NOT EXISTS batch_counters (
+    account  TEXT PRIMARY KEY,
+    next_idx INTEGER NOT NULL
+);
+"""
+
+
+class BatchStore:
+    """
+    Batch item records for one account, keyed by item index.
+
+    Usage:
+        store = BatchStore(BATCH_DB_FILE, account=account_key)
+        store.save(item)
+        items = store.load()    # oldest first
+    """
+
+    def __init__(self, path: Union[str, Path] = BATCH_DB_FILE, account: str = ""):
+        """
+        Args:
+            path: Database file (or ":memory:")
+            account: Key separating the queues of different API tokens
+        """
+        self.path = Path(path) if str(path) != ":memory:" else path
+        self.account = account
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        if str(path) != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _row(self, item: Dict[str, Any]) -> tuple:
+        return (
+            self.account,
+            item["index"],
+            item.get("status"),
+            item.get("stage"),
+            item.get("jobid"),
+            item.get("anim_jobid"),
+            datetime.now().isoformat(),
+            json.dumps(item, separators=(",", ":"), ensure_ascii=False, default=str),
+        )
+
+    def allocate(self, count: int) -> int:
+        """Reserve `count` new item indices and return the first; indices are never reused."""
+        with self._lock:
+            row = self._conn.execute("SELECT next_idx FROM batch_counters WHERE account = ?",
+                                     (self.account,)).fetchone()
+            if row is None:
+                row = self._conn.execute("SELECT COALESCE(MAX(idx), 0) + 1 FROM batch_items "
+                                         "WHERE account = ?", (self.account,)).fetchone()
+            first = row[0]
+            self._conn.execute("INSERT OR REPLACE INTO batch_counters (account, next_idx) VALUES (?, ?)",
+                               (self.account, first + count))
+            self._conn.commit()
+            return first
+
+    def save_many(self, items: Iterable[Dict[str, Any]]):
+        """Insert or replace item records in a single transaction."""
+        rows = [self._row(item) for item in items]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO batch_items "
+                "(account, idx, status, stage, jobid, anim_jobid, updated, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def save(self, item: Dict[str, Any]):
+        """Insert or replace one item record."""
+        self.save_many([item])
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Every item of this account, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM batch_items WHERE account = ? ORDER BY idx",
+                (self.account,)).fetchall()
+        items = []
+        for (data,) in rows:
+            try:
+                items.append(json.loads(data))
+            except ValueError as e:
+                logger.error(f"Skipping unreadable batch record: {e}")
+        return items
+
+    def clear(self):
+        """Forget every item of this account (the index counter is kept)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM batch_items WHERE account = ?", (self.account,))
+            self._conn.commit()
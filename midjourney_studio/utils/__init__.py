@@ -3,7 +3,21 @@ Utility functions for Midjourney Studio.
 """
 
 from .prompt_builder import build_prompt, parse_describe_prompts
-from .polling import poll_job_status, poll_job_status_async
+from .polling import (
+    poll_job_status,
+    poll_job_status_async,
+    PollScheduler,
+    get_poll_scheduler
+)
+from .reconciler import JobReconciler, get_job_reconciler
+from .webhook import CallbackServer, start_callback_server, get_callback_server
+from .job_store import JobStore, JobHistory
+from .projection import Projection, slim_job
+from .media_cache import MediaCache, get_media_cache
+from .thumbnails import Thumbnailer, get_thumbnailer
+from .quadrants import QuadrantSplitter, split_grid, get_quadrant_splitter
+from .downloader import Downloader, DownloadResult
+from .gallery_index import GalleryIndex
 from .secrets import load_secrets, save_secrets, validate_api_token
 
 __all__ = [
@@ -11,6 +25,27 @@ __all__ = [
     'parse_describe_prompts',
     'poll_job_status',
     'poll_job_status_async',
+    'PollScheduler',
+    'get_poll_scheduler',
+    'JobReconciler',
+    'get_job_reconciler',
+    'CallbackServer',
+    'start_callback_server',
+    'get_callback_server',
+    'JobStore',
+    'JobHistory',
+    'Projection',
+    'slim_job',
+    'MediaCache',
+    'get_media_cache',
+    'Thumbnailer',
+    'get_thumbnailer',
+    'QuadrantSplitter',
+    'split_grid',
+    'get_quadrant_splitter',
+    'Downloader',
+    'DownloadResult',
+    'GalleryIndex',
     'load_secrets',
     'save_secrets',
     'validate_api_token'
@@ -2,7 +2,7 @@
 import os
 import logging
 import google.generativeai as genai
-from typing import Optional
+from typing import List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -12,7 +12,8 @@ def configure_gemini(api_key: str):
         return
     genai.configure(api_key=api_key)
 
-def analyze_and_select(image_bytes: bytes, prompt: str, context: str = ""):
+def analyze_and_select(image_bytes: bytes, prompt: str, context: str = "",
+                       quadrants: Optional[List[bytes]] = None):
     """
     Analyze the image grid using Gemini 1.5 Pro and select the best match.
     
@@ -20,6 +21,8 @@ def analyze_and_select(image_bytes: bytes, prompt: str, context: str = ""):
         image_bytes: The image data in bytes.
         prompt: The original prompt used to generate the image.
         context: Optional story or thematic context to guide selection.
+        quadrants: Optional PNG crops of the grid (U1-U4 order); when given they
+            are sent as four separate images instead of the whole grid.
         
     Returns:
         tuple: (selected_quadrant_int, reasoning_str)
@@ -28,10 +31,20 @@ def analyze_and_select(image_bytes: bytes, prompt: str, context: str = ""):
         # Using Gemini 3 Flash Preview - the absolute latest frontier model
         model = genai.GenerativeModel('gemini-3-flash-preview')
         
-        # Construct the prompt for Gemini
+        # Construct the prompt for Gemini; separate crops need no grid layout
+        separate = bool(quadrants) and len(quadrants) == 4
+        if separate:
+            intro = ("I will show you 4 images generated by Midjourney, sent separately "
+                     "and labelled Image 1 to Image 4.")
+            task = "Analyze the 4 images below (numbered by their labels, Image 1 to Image 4)."
+        else:
+            intro = "I will show you a 2x2 grid of 4 images generated by Midjourney."
+            task = ("Analyze the 4 images in the grid (Quadrant 1 is Top-Left, 2 is Top-Right, "
+                    "3 is Bottom-Left, 4 is Bottom-Right).")
+        choice = "image" if separate else "quadrant"
         analysis_prompt = f"""
         You are an expert art director and visual storyteller.
-        I will show you a 2x2 grid of 4 images generated by Midjourney.
+        {intro}
         
         Original User Prompt: "{prompt}"
         
@@ -41,12 +54,12 @@ def analyze_and_select(image_bytes: bytes, prompt: str, context: str = ""):
         ---
         
         Task:
-        1. Analyze the 4 images in the grid (Quadrant 1 is Top-Left, 2 is Top-Right, 3 is Bottom-Left, 4 is Bottom-Right).
+        1. {task}
         2. Select the single image that BEST captures the essence of the prompt and the provided criteria.
         
         SAFEGUARD AGAINST REJECTION:
         - If the director's criteria contains strict "REJECT" rules and NO image perfectly matches every single one, you MUST still pick the ONE image that is the CLOSEST match or violates the rules the least. 
-        - DO NOT refuse to make a selection. One of the 4 quadrants MUST be selected.
+        - DO NOT refuse to make a selection. One of the 4 {choice}s MUST be selected.
         - Prioritize character consistency (hair/eyes/clothes) first, then aesthetic quality.
         
         Return your response in this exact format:
@@ -55,12 +68,19 @@ def analyze_and_select(image_bytes: bytes, prompt: str, context: str = ""):
         """
         
         # Prepare content parts
-        cookie_picture = {
-            'mime_type': 'image/png',
-            'data': image_bytes
-        }
+        if separate:
+            contents = [analysis_prompt]
+            for n, crop in enumerate(quadrants, 1):
+                contents.append(f"Image {n}:")
+                contents.append({'mime_type': 'image/png', 'data': crop})
+        else:
+            cookie_picture = {
+                'mime_type': 'image/png',
+                'data': image_bytes
+            }
+            contents = [analysis_prompt, cookie_picture]
         
-        response = model.generate_content([analysis_prompt, cookie_picture])
+        response = model.generate_content(contents)
         
         if response and response.text:
             text = response.text.replace('*', '').strip()
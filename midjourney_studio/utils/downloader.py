@@ -0,0 +1,133 @@
+"""
+Parallel, bounded-concurrency media downloader.
+
+Used by the ZIP exports: fetches many URLs through the media cache with a
+fixed worker pool, a per-host connection limit and retries with
+exponential backoff. Results are yielded in the calling thread as they
+complete, so Streamlit progress widgets can be updated from the loop.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Callable, Iterator
+from urllib.parse import urlsplit
+
+from ..api.error_handler import RetryConfig, retry_with_backoff
+from .media_cache import MediaCache, get_media_cache
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_WORKERS = 8
+PER_HOST_LIMIT = 4
+DOWNLOAD_RETRY = RetryConfig(max_attempts=3, base_delay=0.5, max_delay=8.0)
+
+
+class DownloadError(Exception):
+    """A download attempt returned no data."""
+
+
+@dataclass
+class DownloadResult:
+    """Outcome of one URL download."""
+    index: int
+    url: str
+    data: bytes = b""
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return bool(self.data)
+
+
+class Downloader:
+    """
+    Fetch many URLs concurrently through a MediaCache.
+
+    Usage:
+        for result in Downloader().iter_downloads(urls):
+            if result.ok:
+                zf.writestr(names[result.index], result.data)
+    """
+
+    def __init__(self, cache: Optional[MediaCache] = None, workers: int = DOWNLOAD_WORKERS,
+                 per_host: int = PER_HOST_LIMIT, retry_config: RetryConfig = DOWNLOAD_RETRY):
+        """
+        Initialize downloader.
+
+        Args:
+            cache: MediaCache to fetch through (defaults to the shared cache)
+            workers: Maximum concurrent downloads overall
+            per_host: Maximum concurrent downloads per host
+            retry_config: Backoff settings for failed downloads
+        """
+        self.cache = cache or get_media_cache()
+        self.workers = max(1, workers)
+        self.per_host = max(1, per_host)
+        self.retry_config = retry_config
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc.lower()
+        with self._host_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host)
+                self._host_slots[host] = slot
+            return slot
+
+    def _download(self, index: int, url: str) -> DownloadResult:
+        cached = self.cache.get(url)
+        if cached is not None:
+            return DownloadResult(index, url, cached)
+
+        def attempt() -> bytes:
+            with self._slot(url):
+                data = self.cache.fetch(url)
+            if not data:
+                raise DownloadError(f"No data from {url[:80]}")
+            return data
+
+        try:
+            return DownloadResult(index, url, retry_with_backoff(
+                attempt, self.retry_config, retry_on=(DownloadError,)))
+        except Exception as e:
+            return DownloadResult(index, url, error=str(e))
+
+    def iter_downloads(self, urls: List[str],
+                       on_progress: Optional[Callable[[int, int, DownloadResult], None]] = None
+                       ) -> Iterator[DownloadResult]:
+        """
+        Download URLs concurrently, yielding results as they complete.
+
+        Args:
+            urls: URLs to fetch (DownloadResult.index refers to this list)
+            on_progress: Called as (done, total, result) in the caller's thread
+
+        Yields:
+            DownloadResult per URL, in completion order
+        """
+        total = len(urls)
+        if not total:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.workers, total),
+                                thread_name_prefix="mj-download") as pool:
+            futures = [pool.submit(self._download, i, url) for i, url in enumerate(urls)]
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                if not result.ok:
+                    logger.warning(f"Download failed: {result.url[:80]} ({result.error})")
+                if on_progress:
+                    on_progress(done, total, result)
+                yield result
+
+    def download_all(self, urls: List[str],
+                     on_progress: Optional[Callable[[int, int, DownloadResult], None]] = None
+                     ) -> List[DownloadResult]:
+        """Download URLs concurrently and return results in input order."""
+        results = [None] * len(urls)
+        for result in self.iter_downloads(urls, on_progress):
+            results[result.index] = result
+        return results
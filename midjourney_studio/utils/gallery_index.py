@@ -0,0 +1,309 @@
+"""
+Incremental gallery index.
+
+Builds the gallery's item records (one per attachment, or a placeholder for
+in-progress jobs) once per job and keeps them up to date from JobHistory
+change events, instead of re-deriving every item on each Streamlit rerun.
+Item records carry precomputed type, is_grid, is_video and prompt_lower
+fields, and filtered/searched views are memoized until the index changes.
+With a searcher (the JobStore's FTS index) history items are matched and
+ranked by full-text search instead of a substring scan. The gallery renders
+them a page at a time behind a "load more" cursor.
+"""
+
+import re
+import logging
+import threading
+from typing import Dict, List, Optional, Any, Tuple
+
+from .media import is_video_item, extract_job_metadata
+
+logger = logging.getLogger(__name__)
+
+PENDING_STATES = {"started", "progressing", "progress"}
+GALLERY_FILTERS = ["All", "Videos", "Upscales", "Grids", "Submitted"]
+_QUERY_CACHE_SIZE = 32
+PAGE_SIZES = [12, 24, 48, 96]
+DEFAULT_PAGE_SIZE = 24
+
+
+def _job_key(job: Dict[str, Any]) -> str:
+    return job.get("jobid") or f"_obj{id(job)}"
+
+
+def _attachment_items(job: Dict[str, Any], meta: Dict[str, Any], timestamp: Optional[str],
+                      prompt_lower: str, with_response: bool = False) -> List[Dict[str, Any]]:
+    items = []
+    for att in job.get("response", {}).get("attachments", []) or []:
+        url = att.get("url")
+        if not url:
+            continue
+        is_grid = "grid" in att.get("filename", "").lower()
+        item_info = {
+            "url": url,
+            "verb": meta["verb"],
+            "type": job.get("type"),
+            "jobType": meta["jobType"],
+            "prompt": meta["prompt"],
+        }
+        if with_response:
+            item_info["response"] = job.get("response")
+        is_video = is_video_item(item_info)
+        items.append({
+            "url": url,
+            "prompt": meta["prompt"],
+            "prompt_lower": prompt_lower,
+            "type": "video" if is_video else ("grid" if is_grid else "upscale"),
+            "is_grid": is_grid,
+            "is_video": is_video,
+            "attachment": True,
+            "verb": meta["verb"],
+            "jobType": meta["jobType"],
+            "timestamp": timestamp,
+            "id": job.get("jobid"),
+        })
+    return items
+
+
+def _pending_item(job: Dict[str, Any], meta: Dict[str, Any], timestamp: Optional[str],
+                  prompt_lower: str) -> Dict[str, Any]:
+    return {
+        "url": None,
+        "prompt": meta["prompt"],
+        "prompt_lower": prompt_lower,
+        "type": "pending",
+        "is_grid": False,
+        "is_video": is_video_item({"verb": meta["verb"], "jobType": meta["jobType"],
+                                   "prompt": meta["prompt"], "response": job.get("response")}),
+        "attachment": False,
+        "verb": meta["verb"],
+        "jobType": meta["jobType"],
+        "status": meta["status"],
+        "progress": job.get("progress_percent", 0),
+        "timestamp": timestamp,
+        "id": job.get("jobid"),
+    }
+
+
+def build_history_items(job: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Gallery items for one history job."""
+    meta = extract_job_metadata(job)
+    prompt_lower = meta["prompt"].lower()
+    attachments = job.get("response", {}).get("attachments", [])
+    if meta["status"] in PENDING_STATES and not attachments:
+        items = [_pending_item(job, meta, job.get("created"), prompt_lower)]
+    else:
+        items = _attachment_items(job, meta, job.get("created"), prompt_lower)
+    for item in items:
+        item["source"] = "history"
+    return items
+
+
+def build_batch_items(batch_result: Dict[str, Any],
+                      job_data: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Gallery items for one batch result (searched by its raw batch prompt)."""
+    prompt = batch_result.get("prompt", "")
+    prompt_lower = prompt.lower()
+    timestamp = batch_result.get("submitted_at")
+    items = []
+
+    if job_data:
+        meta = extract_job_metadata(job_data)
+        if meta["status"] == "completed":
+            items.extend(_attachment_items(job_data, meta, timestamp, prompt_lower, with_response=True))
+        elif meta["status"] in PENDING_STATES:
+            items.append(_pending_item(job_data, meta, timestamp, prompt_lower))
+
+    anim_url = batch_result.get("anim_url")
+    if anim_url:
+        items.append({
+            "url": anim_url,
+            "prompt": prompt,
+            "prompt_lower": prompt_lower,
+            "type": "video",
+            "is_grid": False,
+            "is_video": True,
+            "attachment": False,
+            "timestamp": timestamp,
+            "id": batch_result.get("anim_jobid"),
+        })
+    for item in items:
+        item["source"] = "batch"
+    return items
+
+
+def page_spans(count: int, page_size: int) -> List[Tuple[int, int]]:
+    """(start, end) offsets splitting the first `count` items into pages."""
+    page_size = max(1, page_size)
+    return [(start, min(start + page_size, count)) for start in range(0, count, page_size)]
+
+
+def _matches(item: Dict[str, Any], filter_val: str) -> bool:
+    if filter_val == "Videos":
+        return item["is_video"]
+    if item["attachment"]:
+        if filter_val == "Upscales" and item["is_grid"]:
+            return False
+        if filter_val == "Grids" and not item["is_grid"]:
+            return False
+    return True
+
+
+class GalleryIndex:
+    """
+    Gallery items keyed by jobid, maintained incrementally.
+
+    Usage:
+        index = GalleryIndex(st.session_state.job_history, searcher=get_job_store())
+        index.sync_batch(batch_results, active_jobs)
+        items = index.query("Grids", "cat")
+    """
+
+    def __init__(self, history=None, searcher=None):
+        """
+        Args:
+            history: JobHistory to index and subscribe to (optional)
+            searcher: Object with search_ids(text), known_ids(ids) and a version
+                counter, such as a JobStore, used to match history items (optional)
+        """
+        self._lock = threading.RLock()
+        self._history = history
+        self._searcher = searcher
+        self._job_items: Dict[str, List[Dict[str, Any]]] = {}
+        self._batch_order: List[str] = []
+        self._batch_items: Dict[str, List[Dict[str, Any]]] = {}
+        self._batch_sigs: Dict[str, Tuple] = {}
+        self._flat: Optional[List[Dict[str, Any]]] = None
+        self._queries: Dict[Tuple, List[Dict[str, Any]]] = {}
+        self.version = 0
+
+        if history is not None:
+            for job in history:
+                self._job_items[_job_key(job)] = build_history_items(job)
+            self._unsubscribe = history.subscribe(self._on_history_event)
+
+    def is_for(self, history) -> bool:
+        """True if this index follows `history` (False once it has been replaced)."""
+        return self._history is history
+
+    def close(self):
+        """Stop following the history."""
+        if self._history is not None:
+            self._unsubscribe()
+
+    def _invalidate(self):
+        self.version += 1
+        self._flat = None
+        self._queries.clear()
+
+    def _on_history_event(self, event: str, job: Optional[Dict[str, Any]]):
+        with self._lock:
+            if event == "clear":
+                self._job_items.clear()
+            elif event == "remove":
+                self._job_items.pop(_job_key(job), None)
+            else:
+                self._job_items[_job_key(job)] = build_history_items(job)
+            self._invalidate()
+
+    def update_job(self, job: Dict[str, Any]):
+        """Re-index one job (for changes made outside JobHistory)."""
+        self._on_history_event("upsert", job)
+
+    def sync_batch(self, batch_results: List[Dict[str, Any]], active_jobs: Dict[str, Dict[str, Any]]):
+        """Refresh batch items whose job status or animation changed."""
+        with self._lock:
+            order = []
+            changed = False
+            for res in batch_results:
+                key = res.get("jobid")
+                if not key:
+                    continue
+                order.append(key)
+                job_data = active_jobs.get(key)
+                sig = (res.get("prompt"), res.get("anim_url"),
+                       id(job_data), job_data.get("status") if job_data else None)
+                if self._batch_sigs.get(key) != sig:
+                    self._batch_sigs[key] = sig
+                    self._batch_items[key] = build_batch_items(res, job_data)
+                    changed = True
+            if order != self._batch_order:
+                for key in set(self._batch_order) - set(order):
+                    self._batch_items.pop(key, None)
+                    self._batch_sigs.pop(key, None)
+                self._batch_order = order
+                changed = True
+            if changed:
+                self._invalidate()
+
+    def items(self) -> List[Dict[str, Any]]:
+        """All items: history (newest first) then batch results, deduplicated by URL."""
+        with self._lock:
+            if self._flat is None:
+                flat, seen = [], set()
+                jobs = self._history if self._history is not None else []
+                groups = [self._job_items.get(_job_key(job), []) for job in jobs]
+                groups += [self._batch_items.get(key, []) for key in self._batch_order]
+                for group in groups:
+                    for item in group:
+                        url = item["url"]
+                        if url:
+                            if url in seen:
+                                continue
+                            seen.add(url)
+                        flat.append(item)
+                self._flat = flat
+            return self._flat
+
+    def _search(self, items: List[Dict[str, Any]], search: str) -> List[Dict[str, Any]]:
+        # Searches without a word (e.g. "--") have no full-text terms
+        if self._searcher is None or not re.search(r"\w", search):
+            return [item for item in items if search in item["prompt_lower"]]
+        try:
+            ranks = {job_id: rank for rank, job_id in enumerate(self._searcher.search_ids(search))}
+            known = self._searcher.known_ids(
+                {item["id"] for item in items if item["source"] == "history" and item["id"]})
+        except Exception as e:
+            logger.error(f"Prompt search failed, using substring match: {e}")
+            return [item for item in items if search in item["prompt_lower"]]
+        ranked, rest = [], []
+        for item in items:
+            if item["source"] == "history" and item["id"] in known:
+                if item["id"] in ranks:
+                    ranked.append(item)
+            elif search in item["prompt_lower"]:
+                rest.append(item)  # batch items and history the searcher has not seen
+        ranked.sort(key=lambda item: ranks[item["id"]])
+        return ranked + rest
+
+    def query(self, filter_val: str = "All", search: str = "") -> List[Dict[str, Any]]:
+        """
+        Items matching a gallery filter and a case-insensitive prompt search.
+
+        Without a searcher, search is a substring match. With one, stored
+        history items are those it returns, best match first, followed by
+        batch items and not-yet-stored history items matched by substring.
+        Results are memoized until the index (or the searcher) next changes.
+        """
+        search = (search or "").strip().lower()
+        searcher_version = getattr(self._searcher, "version", None) if search else None
+        key = (filter_val, search, searcher_version)
+        with self._lock:
+            cached = self._queries.get(key)
+            if cached is not None:
+                return cached
+            result = [item for item in self.items() if _matches(item, filter_val)]
+            if search:
+                result = self._search(result, search)
+            if len(self._queries) >= _QUERY_CACHE_SIZE:
+                self._queries.clear()
+            self._queries[key] = result
+            return result
+
+    def window(self, filter_val: str = "All", search: str = "",
+               limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        First `limit` matching items (the loaded pages) and the total match count.
+        """
+        items = self.query(filter_val, search)
+        return items[:max(0, limit)], len(items)
@@ -0,0 +1,486 @@
+"""
+SQLite-backed job history.
+
+JobStore persists jobs in a WAL-mode SQLite database with indexed jobid,
+status, verb and created columns, so lookups and filtered, paginated
+queries stay fast with tens of thousands of jobs. Prompts are indexed in
+an FTS5 table for ranked word, prefix and parameter search (falling back
+to LIKE where SQLite lacks FTS5). JobHistory is the list-like view kept in
+st.session_state.job_history: newest-first iteration and slicing like the
+old list, plus O(1) lookup by jobid.
+"""
+
+import re
+import json
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Sequence, Set, Union, Callable
+
+from .media import extract_job_metadata
+
+logger = logging.getLogger(__name__)
+
+DB_FILE = Path("job_history.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    jobid    TEXT UNIQUE,
+    status   TEXT,
+    verb     TEXT,
+    job_type TEXT,
+    created  TEXT,
+    updated  TEXT,
+    prompt   TEXT,
+    data     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+CREATE INDEX IF NOT EXISTS idx_jobs_verb ON jobs(verb);
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created);
+"""
+
+# '-', ':' and '.' are token characters so parameters such as --ar, 16:9 and
+# --v 6.1 are indexed as whole tokens
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+    prompt, content='jobs', content_rowid='id', tokenize="unicode61 tokenchars '-:.'"
+);
+CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+    INSERT INTO jobs_fts(rowid, prompt) VALUES (new.id, new.prompt);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+    INSERT INTO jobs_fts(jobs_fts, rowid, prompt) VALUES ('delete', old.id, old.prompt);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF prompt ON jobs BEGIN
+    INSERT INTO jobs_fts(jobs_fts, rowid, prompt) VALUES ('delete', old.id, old.prompt);
+    INSERT INTO jobs_fts(rowid, prompt) VALUES (new.id, new.prompt);
+END;
+"""
+
+_COLUMNS = "jobid, status, verb, job_type, created, updated, prompt, data"
+
+
+def _columns(job: Dict[str, Any]) -> tuple:
+    return (
+        job.get("jobid") or None,
+        job.get("status"),
+        job.get("verb"),
+        job.get("jobType"),
+        job.get("created"),
+        job.get("updated"),
+        extract_job_metadata(job)["prompt"] or None,
+        json.dumps(job, separators=(",", ":"), ensure_ascii=False),
+    )
+
+
+def _search_terms(text: str) -> List[tuple]:
+    """Split a search string into ("phrase" | "prefix", term) pairs."""
+    terms = []
+    for match in re.finditer(r'"([^"]*)"|(\S+)', text or ""):
+        phrase, word = match.group(1), match.group(2)
+        term = (phrase if phrase is not None else word).strip()
+        if re.search(r"\w", term):
+            terms.append(("phrase" if phrase is not None else "prefix", term))
+    return terms
+
+
+def fts_query(text: str) -> str:
+    """
+    Build an FTS5 MATCH expression from user input.
+
+    Bare words become prefix queries ("cat" matches "cats"), quoted text is
+    matched as an exact phrase, and all terms must match.
+    """
+    parts = []
+    for kind, term in _search_terms(text):
+        quoted = '"' + term.replace('"', '""') + '"'
+        parts.append(quoted if kind == "phrase" else quoted + "*")
+    return " ".join(parts)
+
+
+class JobStore:
+    """
+    Job records in SQLite (WAL mode), ordered by first insertion.
+
+    Upserting a known jobid replaces its data but keeps its position, the
+    same semantics as updating an entry of the old history list in place.
+    """
+
+    def __init__(self, path: Union[str, Path] = DB_FILE):
+        self.path = Path(path) if str(path) != ":memory:" else path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        if str(path) != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+        self.fts = self._create_fts()
+        self._conn.commit()
+        self.version = 0  # Bumped on every write, for callers caching search results
+
+    def _migrate(self):
+        """Add and backfill the prompt column on databases created before it."""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "prompt" in columns:
+            return
+        self._conn.execute("ALTER TABLE jobs ADD COLUMN prompt TEXT")
+        rows = self._conn.execute("SELECT id, data FROM jobs").fetchall()
+        self._conn.executemany("UPDATE jobs SET prompt = ? WHERE id = ?", [
+            (extract_job_metadata(json.loads(data))["prompt"] or None, row_id) for row_id, data in rows
+        ])
+
+    def _create_fts(self) -> bool:
+        try:
+            exists = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'jobs_fts'").fetchone()
+            self._conn.executescript(_FTS_SCHEMA)
+            if not exists:
+                self._conn.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite FTS5 unavailable, prompt search falls back to LIKE: {e}")
+            return False
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # -- writes -------------------------------------------------------------
+
+    def _upsert(self, job: Dict[str, Any]):
+        row = _columns(job)
+        self.version += 1
+        if row[0] is None:
+            self._conn.execute(
+                f"INSERT INTO jobs ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row)
+        else:
+            self._conn.execute(
+                f"INSERT INTO jobs ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(jobid) DO UPDATE SET status=excluded.status, verb=excluded.verb, "
+                "job_type=excluded.job_type, created=excluded.created, "
+                "updated=excluded.updated, prompt=excluded.prompt, data=excluded.data", row)
+
+    def upsert(self, job: Dict[str, Any]):
+        """Insert a job or update it in place by jobid."""
+        with self._lock:
+            self._upsert(job)
+            self._conn.commit()
+
+    def upsert_many(self, jobs: List[Dict[str, Any]]):
+        """Upsert jobs (oldest first) in a single transaction."""
+        with self._lock:
+            for job in jobs:
+                self._upsert(job)
+            self._conn.commit()
+
+    def replace_all(self, jobs: List[Dict[str, Any]]):
+        """Atomically replace every stored job (oldest first)."""
+        with self._lock:
+            self.version += 1
+            self._conn.execute("DELETE FROM jobs")
+            for job in jobs:
+                self._upsert(job)
+            self._conn.commit()
+
+    def delete(self, job_id: str):
+        with self._lock:
+            self.version += 1
+            self._conn.execute("DELETE FROM jobs WHERE jobid = ?", (job_id,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self._conn.execute("DELETE FROM jobs")
+            self._conn.commit()
+
+    # -- reads --------------------------------------------------------------
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch one job by jobid."""
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM jobs WHERE jobid = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def known_ids(self, job_ids: Iterable[str]) -> Set[str]:
+        """The given jobids that are stored."""
+        ids = list(dict.fromkeys(i for i in job_ids if i))
+        known = set()
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT jobid FROM jobs WHERE jobid IN ({', '.join('?' * len(chunk))})", chunk)
+                known.update(r[0] for r in rows)
+        return known
+
+    @staticmethod
+    def _conditions(status: Union[str, Sequence[str], None], verb: Optional[str],
+                    table: str = "") -> tuple:
+        clauses, params = [], []
+        if isinstance(status, str):
+            clauses.append(f"{table}status = ?")
+            params.append(status)
+        elif status:
+            clauses.append(f"{table}status IN ({', '.join('?' * len(status))})")
+            params.extend(status)
+        if verb:
+            clauses.append(f"{table}verb = ?")
+            params.append(verb)
+        return clauses, params
+
+    @classmethod
+    def _where(cls, status: Union[str, Sequence[str], None], verb: Optional[str]) -> tuple:
+        clauses, params = cls._conditions(status, verb)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, status: Optional[str] = None, verb: Optional[str] = None) -> int:
+        where, params = self._where(status, verb)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM jobs{where}", params).fetchone()[0]
+
+    def query(self, status: Union[str, Sequence[str], None] = None, verb: Optional[str] = None,
+              limit: Optional[int] = 50, offset: int = 0,
+              order_by: str = "id") -> List[Dict[str, Any]]:
+        """
+        Fetch a page of jobs, newest first.
+
+        Args:
+            status: Only jobs with this status (or any of these statuses)
+            verb: Only jobs with this verb (imagine, video, ...)
+            limit: Page size (None for all)
+            offset: Number of jobs to skip
+            order_by: "id" (insertion order) or "created"
+
+        Returns:
+            List of job dictionaries
+        """
+        if order_by not in ("id", "created"):
+            raise ValueError(f"Unsupported order_by: {order_by}")
+        where, params = self._where(status, verb)
+        sql = f"SELECT data FROM jobs{where} ORDER BY {order_by} DESC"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def all(self) -> List[Dict[str, Any]]:
+        """Every job, newest first."""
+        return self.query(limit=None)
+
+    # -- search -------------------------------------------------------------
+
+    def _search_rows(self, text: str, columns: str, status: Optional[str], verb: Optional[str],
+                     limit: Optional[int]) -> List[tuple]:
+        terms = _search_terms(text)
+        if not terms:
+            return []
+        clauses, params = self._conditions(status, verb, "j.")
+        limit_sql = " LIMIT ?" if limit is not None else ""
+        params += [limit] if limit is not None else []
+
+        if self.fts:
+            where = " AND ".join(["jobs_fts MATCH ?"] + clauses)
+            sql = (f"SELECT {columns} FROM jobs_fts JOIN jobs j ON j.id = jobs_fts.rowid "
+                   f"WHERE {where} ORDER BY jobs_fts.rank{limit_sql}")
+            try:
+                with self._lock:
+                    return self._conn.execute(sql, [fts_query(text)] + params).fetchall()
+            except sqlite3.OperationalError as e:
+                logger.warning(f"FTS query failed for {text!r}, using LIKE: {e}")
+
+        likes = ["j.prompt LIKE ? ESCAPE '\\'" for _ in terms]
+        patterns = ["%" + re.sub(r"([%_\\])", r"\\\1", term) + "%" for _, term in terms]
+        where = " AND ".join(likes + clauses)
+        sql = f"SELECT {columns} FROM jobs j WHERE {where} ORDER BY j.id DESC{limit_sql}"
+        with self._lock:
+            return self._conn.execute(sql, patterns + params).fetchall()
+
+    def search(self, text: str, status: Optional[str] = None, verb: Optional[str] = None,
+               limit: Optional[int] = 50) -> List[Dict[str, Any]]:
+        """
+        Jobs whose prompt matches a search string, best match first.
+
+        Words match as prefixes, quoted text as a phrase, and parameters such
+        as `--ar 16:9` or `--sref` as whole tokens; results are ranked by BM25.
+
+        Args:
+            text: Search string
+            status: Only jobs with this status
+            verb: Only jobs with this verb
+            limit: Maximum results (None for all)
+
+        Returns:
+            List of job dictionaries
+        """
+        return [json.loads(r[0]) for r in self._search_rows(text, "j.data", status, verb, limit)]
+
+    def search_ids(self, text: str, limit: Optional[int] = None) -> List[str]:
+        """Jobids whose prompt matches a search string, best match first."""
+        return [r[0] for r in self._search_rows(text, "j.jobid", None, None, limit) if r[0]]
+
+
+class JobHistory:
+    """
+    List-like, newest-first job history with O(1) lookup by jobid.
+
+    Drop-in for the plain list previously kept in session state: supports
+    iteration, len, indexing, slicing, insert(0, job), item assignment and
+    `in`. Items are held oldest-first internally so inserting a new job at
+    the front is an append. Persisting is left to the caller (record_job).
+
+    Listeners registered with subscribe() are called as (event, job) with
+    event "upsert", "remove" or "clear" after each change.
+    """
+
+    def __init__(self, jobs: Optional[List[Dict[str, Any]]] = None):
+        """
+        Args:
+            jobs: Initial jobs, newest first
+        """
+        self._lock = threading.RLock()
+        self._items: List[Dict[str, Any]] = list(reversed(jobs or []))
+        self._pos: Dict[str, int] = {}
+        self._listeners: List[Callable[[str, Optional[Dict[str, Any]]], None]] = []
+        self._reindex()
+
+    def subscribe(self, listener: Callable[[str, Optional[Dict[str, Any]]], None]) -> Callable[[], None]:
+        """
+        Register a change listener.
+
+        Returns:
+            Function that unregisters the listener
+        """
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener) if listener in self._listeners else None
+
+    def _notify(self, event: str, job: Optional[Dict[str, Any]] = None):
+        for listener in list(self._listeners):
+            try:
+                listener(event, job)
+            except Exception as e:
+                logger.error(f"Job history listener failed: {e}")
+
+    def _reindex(self):
+        self._pos = {job.get("jobid"): i for i, job in enumerate(self._items) if job.get("jobid")}
+
+    def _to_internal(self, index: int) -> int:
+        n = len(self._items)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("job history index out of range")
+        return n - 1 - index
+
+    # -- list protocol ------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            snapshot = list(reversed(self._items))
+        return iter(snapshot)
+
+    def __getitem__(self, index):
+        with self._lock:
+            if isinstance(index, slice):
+                n = len(self._items)
+                start, stop, step = index.indices(n)
+                if step == 1:
+                    return self._items[n - stop:n - start][::-1] if stop > start else []
+                return list(reversed(self._items))[index]
+            return self._items[self._to_internal(index)]
+
+    def __setitem__(self, index: int, job: Dict[str, Any]):
+        with self._lock:
+            i = self._to_internal(index)
+            old = self._items[i]
+            old_id = old.get("jobid")
+            if old_id and self._pos.get(old_id) == i:
+                del self._pos[old_id]
+            self._items[i] = job
+            if job.get("jobid"):
+                self._pos[job["jobid"]] = i
+        if old_id != job.get("jobid"):
+            self._notify("remove", old)
+        self._notify("upsert", job)
+
+    def __contains__(self, job) -> bool:
+        if isinstance(job, dict) and job.get("jobid"):
+            return job["jobid"] in self._pos
+        if isinstance(job, str):
+            return job in self._pos
+        with self._lock:
+            return job in self._items
+
+    def insert(self, index: int, job: Dict[str, Any]):
+        """Insert a job; index 0 (newest) is O(1)."""
+        with self._lock:
+            n = len(self._items)
+            if index < 0:
+                index = max(0, index + n)
+            internal = n - min(index, n)
+            if internal == n:
+                self._items.append(job)
+                if job.get("jobid"):
+                    self._pos[job["jobid"]] = n
+            else:
+                self._items.insert(internal, job)
+                self._reindex()
+        self._notify("upsert", job)
+
+    def append(self, job: Dict[str, Any]):
+        """Add a job at the end (oldest position)."""
+        self.insert(len(self._items), job)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._pos.clear()
+        self._notify("clear")
+
+    # -- jobid helpers ------------------------------------------------------
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job with this jobid, or None."""
+        with self._lock:
+            i = self._pos.get(job_id)
+            return self._items[i] if i is not None else None
+
+    def replace(self, job: Dict[str, Any]) -> bool:
+        """
+        Replace the entry with the same jobid in place.
+
+        Returns:
+            True if the job was present
+        """
+        with self._lock:
+            i = self._pos.get(job.get("jobid"))
+            if i is None:
+                return False
+            self._items[i] = job
+        self._notify("upsert", job)
+        return True
+
+    def upsert(self, job: Dict[str, Any]):
+        """Replace by jobid, or insert as newest."""
+        with self._lock:
+            if not self.replace(job):
+                self.insert(0, job)
+
+    def latest(self, **filters) -> Optional[Dict[str, Any]]:
+        """Newest job whose fields equal all the given filters."""
+        with self._lock:
+            for job in reversed(self._items):
+                if all(job.get(k) == v for k, v in filters.items()):
+                    return job
+        return None
@@ -0,0 +1,119 @@
+"""
+Helpers for classifying job records as media items.
+
+Shared by the gallery, history, video studio and the gallery index.
+"""
+
+import re
+from typing import Optional
+
+VIDEO_INDICATORS = {'.mp4', '.mov', '.webm', 'video-cdn', 'timelapse'}
+
+
+def is_video_item(item_data: dict) -> bool:
+    """
+    Robustly detect if an item is a video.
+    Checks URL extensions, substrings, job verbs, jobType, and prompt strings.
+    """
+    if not item_data:
+        return False
+        
+    # Check verb/type/jobType explicitly set (checking both top-level and in item_data)
+    # item_data might be a prepared "item" or a raw "job"
+    verb = item_data.get("verb") or item_data.get("response", {}).get("verb")
+    job_type = item_data.get("jobType") or item_data.get("response", {}).get("jobType")
+    data_type = item_data.get("type")
+    
+    if verb == "video" or job_type == "video" or data_type == "video":
+        return True
+        
+    # Check for --video parameter in prompt
+    prompt = item_data.get("prompt", "").lower()
+    if not prompt:
+        prompt = item_data.get("request", {}).get("prompt", "").lower()
+    if not prompt:
+        content = item_data.get("response", {}).get("content", "")
+        if content:
+             prompt = content.lower()
+
+    if "--video" in prompt:
+        return True
+    
+    # Check all attachments for video indicators
+    video_indicators = VIDEO_INDICATORS
+    
+    # Check top-level URL
+    url = item_data.get("url")
+    if url and any(ind in url.lower() for ind in video_indicators):
+        return True
+        
+    # Check nested response attachments
+    response = item_data.get("response", {})
+    attachments = response.get("attachments", [])
+    for att in attachments:
+        att_url = att.get("url", "").lower()
+        if any(ind in att_url for ind in video_indicators):
+            return True
+        # Also check filename if available
+        filename = att.get("filename", "").lower()
+        if any(ind in filename for ind in video_indicators):
+            return True
+            
+    return False
+
+
+def get_video_url(item_data: dict) -> Optional[str]:
+    """
+    Extract the first video URL found in a job/item.
+    """
+    if not item_data:
+        return None
+        
+    video_indicators = VIDEO_INDICATORS
+    
+    # Check top-level URL
+    url = item_data.get("url")
+    if url and any(ind in url.lower() for ind in video_indicators):
+        return url
+        
+    # Check nested response attachments
+    response = item_data.get("response", {})
+    attachments = response.get("attachments", [])
+    for att in attachments:
+        att_url = att.get("url", "")
+        if any(ind in att_url.lower() for ind in video_indicators):
+            return att_url
+        filename = att.get("filename", "").lower()
+        if any(ind in filename for ind in video_indicators):
+            return att_url
+            
+    return None
+
+
+def extract_job_metadata(job: dict) -> dict:
+    """
+    Robustly extract core metadata from a job object (from history or live).
+    Returns a dict with 'prompt', 'verb', 'jobType', and 'status'.
+    """
+    # 1. Prompt Extraction
+    prompt = job.get("request", {}).get("prompt", "") or job.get("prompt", "")
+    if not prompt:
+        content = job.get("response", {}).get("content", "")
+        if content:
+            # Extract text between ** and ** or use whole content
+            match = re.search(r'\*\*(.*?)\*\*', content)
+            prompt = match.group(1) if match else content
+            
+    # 2. Status
+    status = job.get("status", "completed")
+    
+    # 3. Verb & Type
+    verb = job.get("verb") or job.get("response", {}).get("verb")
+    job_type = job.get("jobType") or job.get("response", {}).get("jobType")
+    
+    return {
+        "prompt": prompt,
+        "status": status,
+        "verb": verb,
+        "jobType": job_type
+    }
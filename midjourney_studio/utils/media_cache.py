@@ -0,0 +1,294 @@
+"""
+Content-addressed on-disk media cache.
+
+Downloaded images and videos are stored once per SHA-256 of their content
+under the cache directory, with a SQLite index mapping URLs to blobs. The
+cache survives restarts, is capped in size with least-recently-used
+eviction, and collapses concurrent requests for the same URL into a single
+download. Discord CDN URLs are keyed without their expiring signature
+parameters so a refreshed link still hits the cache. Files derived from a
+blob (thumbnails, crops) live under derived/ and are evicted with it.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(os.getenv("MJ_MEDIA_CACHE_DIR", "media_cache"))
+MAX_CACHE_BYTES = int(os.getenv("MJ_MEDIA_CACHE_MB", "2048")) * 1024 * 1024
+FETCH_TIMEOUT = (3.05, 30)  # fail fast on dead hosts, allow large grids to stream
+TOUCH_FLUSH_COUNT = 256      # pending LRU touches written in one transaction
+TOUCH_FLUSH_INTERVAL = 30.0  # seconds before pending touches are written anyway
+
+# Discord signs attachment URLs with expiring query parameters
+_SIGNATURE_PARAMS = {"ex", "is", "hm"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256       TEXT PRIMARY KEY,
+    size         INTEGER NOT NULL,
+    content_type TEXT,
+    last_access  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS urls (
+    url    TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL REFERENCES blobs(sha256) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_blobs_access ON blobs(last_access);
+CREATE INDEX IF NOT EXISTS idx_urls_sha ON urls(sha256);
+"""
+
+
+def cache_key(url: str) -> str:
+    """Normalize a URL for cache lookup (drops Discord signature params)."""
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if k not in _SIGNATURE_PARAMS]
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(query), ""))
+
+
+class _Flight:
+    """An in-progress download other threads can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.data = b""
+
+
+class MediaCache:
+    """
+    Disk cache of URL contents with an LRU size cap.
+
+    Usage:
+        cache = MediaCache(Path("media_cache"))
+        data = cache.fetch(url)        # bytes, b'' on failure
+        path = cache.path_for(url)     # local file if already cached
+    """
+
+    def __init__(self, root: Path = CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES,
+                 session: Optional[requests.Session] = None, timeout=FETCH_TIMEOUT):
+        """
+        Initialize media cache.
+
+        Args:
+            root: Cache directory (created if missing)
+            max_bytes: Total blob size above which least-recently-used blobs are evicted
+            session: requests session used for downloads
+            timeout: requests timeout for downloads
+        """
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.derived_dir = self.root / "derived"
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.session = session or self._create_session()
+
+        self._lock = threading.RLock()
+        self._flights: Dict[str, _Flight] = {}
+        self._touched: Dict[str, float] = {}  # sha256 -> last access not yet written
+        self._touches_flushed = time.monotonic()
+        self._conn = sqlite3.connect(str(self.root / "index.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    @staticmethod
+    def _create_session() -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _blob_path(self, sha256: str) -> Path:
+        return self.blob_dir / sha256[:2] / sha256
+
+    def derived_path(self, sha256: str, suffix: str) -> Path:
+        """Location for a file derived from a blob, e.g. derived_path(sha, "w384.webp")."""
+        return self.derived_dir / sha256[:2] / f"{sha256}.{suffix}"
+
+    # -- lookups ------------------------------------------------------------
+
+    def _lookup(self, key: str) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT b.sha256, b.content_type FROM urls u JOIN blobs b ON b.sha256 = u.sha256 "
+                "WHERE u.url = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if not self._blob_path(row[0]).exists():
+                self._conn.execute("DELETE FROM blobs WHERE sha256 = ?", (row[0],))
+                self._conn.commit()
+                return None
+            self._touch(row[0])
+            return row
+
+    def _touch(self, sha256: str):
+        """Record a cache hit; access times are written in batches, not per lookup."""
+        self._touched[sha256] = time.time()
+        if (len(self._touched) >= TOUCH_FLUSH_COUNT
+                or time.monotonic() - self._touches_flushed >= TOUCH_FLUSH_INTERVAL):
+            self.flush_touches()
+
+    def flush_touches(self):
+        """Write pending access times to the index."""
+        with self._lock:
+            self._touches_flushed = time.monotonic()
+            if not self._touched:
+                return
+            touched = [(t, s) for s, t in self._touched.items()]
+            self._touched.clear()
+            self._conn.executemany(
+                "UPDATE blobs SET last_access = MAX(last_access, ?) WHERE sha256 = ?", touched)
+            self._conn.commit()
+
+    def path_for(self, url: str) -> Optional[Path]:
+        """Local file holding the URL's content, or None if not cached."""
+        if not url:
+            return None
+        row = self._lookup(cache_key(url))
+        return self._blob_path(row[0]) if row else None
+
+    def get(self, url: str) -> Optional[bytes]:
+        """Cached bytes for a URL, or None."""
+        path = self.path_for(url)
+        if path is None:
+            return None
+        try:
+            return path.read_bytes()
+        except OSError:
+            return None
+
+    def __contains__(self, url: str) -> bool:
+        return self.path_for(url) is not None
+
+    # -- fills --------------------------------------------------------------
+
+    def put(self, url: str, data: bytes, content_type: Optional[str] = None) -> Path:
+        """Store content for a URL; identical content is stored once."""
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(sha256)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{sha256}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO blobs (sha256, size, content_type, last_access) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(sha256) DO UPDATE SET last_access = excluded.last_access",
+                (sha256, len(data), content_type, time.time()))
+            self._conn.execute("INSERT OR REPLACE INTO urls (url, sha256) VALUES (?, ?)",
+                               (cache_key(url), sha256))
+            self._conn.commit()
+            self._evict()
+        return path
+
+    def fetch(self, url: str) -> bytes:
+        """
+        Return the URL's content, downloading it at most once.
+
+        Concurrent callers for the same URL wait for the first caller's
+        download instead of starting their own.
+
+        Returns:
+            Content bytes, or b'' if the download failed
+        """
+        if not url:
+            return b""
+        cached = self.get(url)
+        if cached is not None:
+            return cached
+
+        key = cache_key(url)
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+
+        if not leader:
+            flight.done.wait()
+            return flight.data
+
+        try:
+            # A previous leader may have stored it between our miss and our flight
+            cached = self.get(url)
+            if cached is not None:
+                flight.data = cached
+                return cached
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            flight.data = response.content
+            self.put(url, flight.data, response.headers.get("Content-Type"))
+        except Exception as e:
+            logger.error(f"Failed to fetch media from {url[:80]}: {e}")
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+        return flight.data
+
+    # -- eviction -----------------------------------------------------------
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def _evict(self):
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+        self.flush_touches()
+        rows = self._conn.execute("SELECT sha256, size FROM blobs ORDER BY last_access").fetchall()
+        evicted = []
+        for sha256, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append(sha256)
+            total -= size
+        self._conn.executemany("DELETE FROM blobs WHERE sha256 = ?", [(s,) for s in evicted])
+        self._conn.commit()
+        for sha256 in evicted:
+            paths = [self._blob_path(sha256)]
+            paths.extend((self.derived_dir / sha256[:2]).glob(f"{sha256}.*"))
+            for path in paths:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+        logger.info(f"Evicted {len(evicted)} media blobs from cache")
+
+    def close(self):
+        with self._lock:
+            self.flush_touches()
+            self._conn.close()
+        self.session.close()
+
+
+_cache: Optional[MediaCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_media_cache() -> MediaCache:
+    """Return the process-wide MediaCache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = MediaCache()
+        return _cache
@@ -1,35 +1,241 @@
 
+import os
 import json
+import atexit
 import logging
+import itertools
+import threading
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Callable
+
+from .job_store import JobStore, JobHistory, DB_FILE
+from .projection import Projection, PayloadArchive, default_projection
+from .polling import TERMINAL_STATES
 
 logger = logging.getLogger(__name__)
 
-HISTORY_FILE = Path("job_history.json")
+HISTORY_FILE = Path("job_history.json")  # legacy whole-file format
+
+# Write-behind: coalesced jobs are flushed every FLUSH_INTERVAL seconds or
+# as soon as FLUSH_BATCH distinct jobs are pending
+FLUSH_INTERVAL = 0.25
+FLUSH_BATCH = 50
+
+# Stored records are projected to a compact form; full payloads of finished
+# jobs go to the gzip side archive unless MJ_ARCHIVE_PAYLOADS=0.
+projection: Projection = default_projection
+payload_archive: Optional[PayloadArchive] = (
+    PayloadArchive() if os.getenv("MJ_ARCHIVE_PAYLOADS", "1") != "0" else None
+)
 
-def load_job_history() -> List[Dict[str, Any]]:
-    """Load job history from JSON file."""
-    if not HISTORY_FILE.exists():
+
+def load_legacy_history(path: Path = HISTORY_FILE) -> List[Dict[str, Any]]:
+    """
+    Read the job_history.json list written before the SQLite store (newest first).
+
+    The file is only read, never written; an empty JobStore imports it once.
+    """
+    path = Path(path)
+    if not path.exists():
         return []
-    
     try:
-        data = json.loads(HISTORY_FILE.read_text(encoding='utf-8'))
-        # Ensure it's a list
-        if isinstance(data, list):
-            logger.info(f"Loaded {len(data)} jobs from history")
-            return data
-        else:
-            logger.warning("History file is not a list, resetting")
-            return []
+        history = json.loads(path.read_text(encoding="utf-8"))
     except Exception as e:
-        logger.error(f"Failed to load history: {e}")
+        logger.error(f"Failed to read legacy history: {e}")
         return []
+    if not isinstance(history, list):
+        logger.warning("Legacy history file is not a list, skipping import")
+        return []
+    logger.info(f"Read {len(history)} jobs from legacy history")
+    return history
+
+
+class WriteBehindPersister:
+    """
+    Coalescing background writer for job records.
+
+    Callers enqueue jobs and return immediately; repeated updates of the
+    same jobid before a flush collapse into one write. A single writer
+    thread commits everything pending in one transaction every `interval`
+    seconds, or sooner once `batch_size` jobs are dirty. flush() writes
+    synchronously and is registered to run at interpreter exit.
+    """
+
+    def __init__(self, write: Callable[[List[Dict[str, Any]], List[Dict[str, Any]]], None],
+                 interval: float = FLUSH_INTERVAL, batch_size: int = FLUSH_BATCH):
+        """
+        Args:
+            write: Called with (records, raw_payloads) from the writer thread
+            interval: Maximum seconds a dirty job waits before being written
+            batch_size: Number of dirty jobs that triggers an early flush
+        """
+        self._write = write
+        self.interval = interval
+        self.batch_size = batch_size
+        self._pending: Dict[Any, Dict[str, Any]] = {}
+        self._archive: List[Dict[str, Any]] = []
+        self._anonymous = itertools.count()
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()  # serializes writer thread and flush()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def enqueue(self, record: Dict[str, Any], raw: Optional[Dict[str, Any]] = None):
+        """Mark a job dirty; `raw` is an optional payload for the side archive."""
+        key = record.get("jobid") or ("_anon", next(self._anonymous))
+        with self._cond:
+            was_idle = not self._pending and not self._archive
+            self._pending.pop(key, None)  # re-insert to keep write order = last update
+            self._pending[key] = record
+            if raw is not None:
+                self._archive.append(raw)
+            if self._thread is None or not self._thread.is_alive():
+                self._start()
+            if was_idle or len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def _start(self):
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="mj-history-writer", daemon=True)
+        self._thread.start()
+
+    def _take(self):
+        records = list(self._pending.values())
+        raws = self._archive
+        self._pending = {}
+        self._archive = []
+        return records, raws
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped and not self._pending and not self._archive:
+                    self._cond.wait()
+                if not self._stopped and len(self._pending) < self.batch_size:
+                    # Coalescing window; cut short once batch_size jobs are dirty
+                    self._cond.wait(self.interval)
+                stopped = self._stopped
+            self.flush()
+            if stopped:
+                return
+
+    def flush(self):
+        """Synchronously write everything pending."""
+        with self._write_lock:
+            with self._cond:
+                records, raws = self._take()
+            if not records and not raws:
+                return
+            try:
+                self._write(records, raws)
+            except Exception as e:
+                logger.error(f"Failed to write {len(records)} job records: {e}")
+                with self._cond:
+                    # Requeue unless a newer version arrived meanwhile
+                    for record in records:
+                        key = record.get("jobid") or ("_anon", next(self._anonymous))
+                        if key not in self._pending:
+                            self._pending[key] = record
+                    self._archive = raws + self._archive
+
+    def discard(self):
+        """Drop pending writes (e.g. before clearing the history)."""
+        with self._write_lock:
+            with self._cond:
+                self._take()
+
+    def close(self):
+        """Stop the writer thread after flushing."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+
+_store: Optional[JobStore] = None
+_store_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """
+    Return the process-wide JobStore, the system of record for history.
+
+    On first use an empty store imports the legacy job_history.json once.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            store = JobStore(DB_FILE)
+            if store.count() == 0:
+                legacy = load_legacy_history()
+                if legacy:
+                    store.upsert_many([projection.apply(j) for j in reversed(legacy)])
+                    logger.info(f"Imported {len(legacy)} jobs into {DB_FILE}")
+            _store = store
+        return _store
+
+
+def _write_records(records: List[Dict[str, Any]], raws: List[Dict[str, Any]]):
+    if records:
+        get_job_store().upsert_many(records)
+    if raws and payload_archive is not None:
+        payload_archive.extend(raws)
+
+
+persister = WriteBehindPersister(_write_records)
+atexit.register(persister.close)
+
+
+def flush_job_history():
+    """Block until every recorded job has been written."""
+    persister.flush()
+
+
+def load_job_history() -> JobHistory:
+    """Load job history from the job store as a list-like JobHistory."""
+    try:
+        persister.flush()
+        history = JobHistory(get_job_store().all())
+        logger.info(f"Loaded {len(history)} jobs from history")
+        return history
+    except Exception as e:
+        logger.error(f"Failed to load history: {e}")
+        return JobHistory()
+
+
+def record_job(job: Dict[str, Any]) -> bool:
+    """Queue a single job insert/update for the background writer."""
+    try:
+        raw = job if payload_archive is not None and job.get("status") in TERMINAL_STATES else None
+        persister.enqueue(projection.apply(job), raw)
+        return True
+    except Exception as e:
+        logger.error(f"Failed to record job: {e}")
+        return False
+
+
+def clear_job_history() -> bool:
+    """Persist clearing the whole history."""
+    try:
+        persister.discard()
+        get_job_store().clear()
+        return True
+    except Exception as e:
+        logger.error(f"Failed to clear history: {e}")
+        return False
+
 
 def save_job_history(history: List[Dict[str, Any]]) -> bool:
-    """Save job history to JSON file."""
+    """Replace the whole stored history (prefer record_job for single-job changes)."""
     try:
-        HISTORY_FILE.write_text(json.dumps(history, indent=2), encoding='utf-8')
+        persister.discard()
+        get_job_store().replace_all([projection.apply(j) for j in reversed(list(history))])
         return True
     except Exception as e:
         logger.error(f"Failed to save history: {e}")
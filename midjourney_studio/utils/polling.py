@@ -5,9 +5,18 @@ CRITICAL FIX: Replaces the blocking poll_job_status() that freezes Streamlit UI.
 """
 
 import time
+import heapq
+import random
+import statistics
+import asyncio
 import logging
+import itertools
 import threading
-from typing import Dict, Optional, Callable, Any
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Callable, Any, Tuple
 from queue import Queue, Empty
 try:
     from streamlit.runtime.scriptrunner import add_script_run_ctx
@@ -19,9 +28,199 @@ logger = logging.getLogger(__name__)
 # Job polling configuration
 POLL_INTERVAL = 3  # seconds between status checks
 DEFAULT_TIMEOUT = 600  # 10 minutes max polling time
+TERMINAL_STATES = {"completed", "failed", "moderated"}
 
 
-def poll_job_status(api, job_id: str, timeout: int = DEFAULT_TIMEOUT) -> Dict:
+# ============================================================================
+# ADAPTIVE POLL INTERVAL
+# ============================================================================
+
+POLL_JITTER = 0.2  # +/- fraction applied to every computed delay
+POLL_BACKOFF = 1.5  # growth factor while a job shows no progress
+RENDER_SAMPLES = 50  # completed durations remembered per verb/jobType
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO timestamp as stored by UseAPI ('...Z' suffix allowed)."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        return None
+
+
+def _job_age(job: Dict) -> Optional[float]:
+    """Seconds since the job's `created` timestamp, or None if it has none."""
+    created = _parse_timestamp(job.get("created") or (job.get("response") or {}).get("created"))
+    if created is None:
+        return None
+    return max(0.0, (datetime.now(created.tzinfo) - created).total_seconds())
+
+
+def _job_kind(job: Dict) -> Tuple[Optional[str], Optional[str]]:
+    """Return (verb, jobType) from a job record or live job response."""
+    response = job.get("response") or {}
+    return (job.get("verb") or response.get("verb"),
+            job.get("jobType") or response.get("jobType"))
+
+
+class RenderTimeStats:
+    """
+    Typical render durations per (verb, jobType), learned from job history.
+
+    Seeded from completed jobs in job_history.json (created -> updated) and
+    updated online as pollers see jobs finish.
+    """
+
+    def __init__(self, max_samples: int = RENDER_SAMPLES):
+        self.max_samples = max_samples
+        self._samples: Dict[Tuple[Optional[str], Optional[str]], deque] = {}
+        self._lock = threading.Lock()
+        self.seeded = False
+
+    def record(self, verb: Optional[str], job_type: Optional[str], seconds: float):
+        """Record one completed render duration."""
+        if seconds <= 0:
+            return
+        with self._lock:
+            for key in ((verb, job_type), (verb, None)):
+                self._samples.setdefault(key, deque(maxlen=self.max_samples)).append(seconds)
+
+    def observe_job(self, job: Dict):
+        """Record the duration of a completed job, if it carries timestamps."""
+        if job.get("status") != "completed":
+            return
+        created = _parse_timestamp(job.get("created"))
+        updated = _parse_timestamp(job.get("updated"))
+        if created and updated and created.tzinfo == updated.tzinfo:
+            verb, job_type = _job_kind(job)
+            self.record(verb, job_type, (updated - created).total_seconds())
+
+    def observe_history(self, history: List[Dict]):
+        """Seed statistics from a job history list."""
+        for job in history:
+            self.observe_job(job)
+        self.seeded = True
+
+    def expected(self, verb: Optional[str], job_type: Optional[str]) -> Optional[float]:
+        """Median duration for this kind of job, falling back to the verb alone."""
+        with self._lock:
+            for key in ((verb, job_type), (verb, None)):
+                samples = self._samples.get(key)
+                if samples:
+                    return statistics.median(samples)
+        return None
+
+
+render_stats = RenderTimeStats()
+
+
+@dataclass
+class PollState:
+    """Per-job observations used by AdaptivePollInterval."""
+    started_at: float = field(default_factory=time.monotonic)  # moved back to `created` on first data
+    age_known: bool = False
+    last_progress: Optional[float] = None
+    last_progress_at: Optional[float] = None
+    rate: Optional[float] = None  # percent per second
+    unchanged_polls: int = 0
+
+
+class AdaptivePollInterval:
+    """
+    Compute the delay before the next status check of a job.
+
+    The time to completion is estimated from progress_percent deltas, or from
+    the typical duration of similar jobs when no progress is reported. The
+    next poll lands halfway to the estimate, so checks get denser near the
+    end; jobs that stop changing back off geometrically. Jitter keeps many
+    jobs from polling in lockstep.
+    """
+
+    def __init__(self, base: float = POLL_INTERVAL,
+                 min_interval: Optional[float] = None,
+                 max_interval: Optional[float] = None,
+                 jitter: float = POLL_JITTER,
+                 stats: Optional[RenderTimeStats] = None):
+        """
+        Args:
+            base: Interval used when nothing is known about the job
+            min_interval: Lower bound (defaults to base / 3)
+            max_interval: Upper bound (defaults to base * 5)
+            jitter: Random +/- fraction applied to each delay
+            stats: Render duration statistics (defaults to the shared render_stats)
+        """
+        self.base = base
+        self.min_interval = min_interval if min_interval is not None else base / 3
+        self.max_interval = max_interval if max_interval is not None else base * 5
+        self.jitter = jitter
+        self.stats = stats if stats is not None else render_stats
+
+    def new_state(self) -> PollState:
+        return PollState()
+
+    def estimate_remaining(self, state: PollState, job_data: Dict) -> Optional[float]:
+        """Estimated seconds until the job completes, or None if unknown."""
+        now = time.monotonic()
+        if not state.age_known:
+            # Jobs picked up mid-render (recovery, reconciler) are not brand new
+            state.age_known = True
+            age = _job_age(job_data)
+            if age is not None:
+                state.started_at = min(state.started_at, now - age)
+        progress = job_data.get("progress_percent")
+        if progress is None:
+            progress = (job_data.get("response") or {}).get("progress_percent")
+
+        if progress is not None:
+            try:
+                progress = float(progress)
+            except (TypeError, ValueError):
+                progress = None
+
+        if progress is not None:
+            if state.last_progress is not None and progress > state.last_progress:
+                elapsed = now - state.last_progress_at
+                if elapsed > 0:
+                    state.rate = (progress - state.last_progress) / elapsed
+                state.unchanged_polls = 0
+            elif state.last_progress is not None:
+                state.unchanged_polls += 1
+            if state.last_progress is None or progress != state.last_progress:
+                state.last_progress, state.last_progress_at = progress, now
+        else:
+            state.unchanged_polls += 1
+
+        if state.rate and progress is not None:
+            return max(0.0, (100.0 - progress) / state.rate)
+
+        verb, job_type = _job_kind(job_data)
+        expected = self.stats.expected(verb, job_type)
+        if expected is not None:
+            return expected - (now - state.started_at)
+        return None
+
+    def next_delay(self, state: PollState, job_data: Optional[Dict] = None) -> float:
+        """Seconds to wait before polling this job again."""
+        remaining = self.estimate_remaining(state, job_data) if job_data else None
+
+        if remaining is None:
+            delay = self.base * (POLL_BACKOFF ** state.unchanged_polls)
+        elif remaining <= 0:
+            # Overdue against the estimate: poll briskly, backing off if stuck
+            delay = min(self.base, self.min_interval * (POLL_BACKOFF ** state.unchanged_polls))
+        else:
+            delay = remaining / 2
+
+        delay = min(max(delay, self.min_interval), self.max_interval)
+        if self.jitter:
+            delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return delay
+
+
+def poll_job_status(api, job_id: str, timeout: int = DEFAULT_TIMEOUT,
+                    interval: Optional[AdaptivePollInterval] = None) -> Dict:
     """
     BLOCKING job status polling (legacy compatibility).
 
@@ -32,13 +231,16 @@ def poll_job_status(api, job_id: str, timeout: int = DEFAULT_TIMEOUT) -> Dict:
         api: MidjourneyAPI instance
         job_id: Job ID to poll
         timeout: Maximum polling time in seconds
+        interval: Poll interval policy (defaults to AdaptivePollInterval())
 
     Returns:
         Final job data when completed/failed/moderated
     """
     logger.warning("Using BLOCKING poll_job_status - UI will freeze during polling!")
 
-    terminal_states = {"completed", "failed", "moderated"}
+    terminal_states = TERMINAL_STATES
+    interval = interval or AdaptivePollInterval()
+    state = interval.new_state()
     start_time = time.time()
 
     while True:
@@ -61,10 +263,11 @@ def poll_job_status(api, job_id: str, timeout: int = DEFAULT_TIMEOUT) -> Dict:
 
         if status in terminal_states:
             logger.info(f"Job {job_id[:20]} completed with status: {status}")
+            interval.stats.observe_job(job_data)
             return job_data
 
         # Wait before next poll
-        time.sleep(POLL_INTERVAL)
+        time.sleep(interval.next_delay(state, job_data))
 
 
 class AsyncJobPoller:
@@ -101,7 +304,9 @@ class AsyncJobPoller:
 
     def _poll_loop(self):
         """Background polling loop."""
-        terminal_states = {"completed", "failed", "moderated"}
+        terminal_states = TERMINAL_STATES
+        interval = AdaptivePollInterval()
+        state = interval.new_state()
         start_time = time.time()
 
         logger.info(f"Starting async poll for job {self.job_id[:20]}")
@@ -127,7 +332,7 @@ class AsyncJobPoller:
                 if status_code != 200:
                     logger.error(f"Failed to poll job: {status_code}")
                     # Don't fail immediately - keep retrying
-                    time.sleep(POLL_INTERVAL)
+                    time.sleep(interval.next_delay(state))
                     continue
 
                 # Update callback
@@ -141,6 +346,7 @@ class AsyncJobPoller:
                 status = job_data.get("status", "unknown")
                 if status in terminal_states:
                     logger.info(f"Job {self.job_id[:20]} reached terminal state: {status}")
+                    interval.stats.observe_job(job_data)
                     self.result_queue.put(job_data)
                     if self.on_complete:
                         try:
@@ -150,7 +356,7 @@ class AsyncJobPoller:
                     break
 
                 # Wait before next poll
-                time.sleep(POLL_INTERVAL)
+                time.sleep(interval.next_delay(state, job_data))
 
         except Exception as e:
             logger.exception(f"Exception in async poll loop: {e}")
@@ -230,7 +436,7 @@ def poll_job_status_async(api, job_id: str,
     Args:
         api: MidjourneyAPI instance
         job_id: Job ID to poll
-        on_update: Callback for status updates (called every POLL_INTERVAL)
+        on_update: Callback for status updates (called on every poll)
         on_complete: Callback when job reaches terminal state
         timeout: Maximum polling time in seconds
 
@@ -249,9 +455,12 @@ def poll_job_status_async(api, job_id: str,
 def poll_multiple_jobs(api, job_ids: list,
                        on_update: Optional[Callable[[str, Dict], None]] = None,
                        on_complete: Optional[Callable[[str, Dict], None]] = None,
-                       timeout: int = DEFAULT_TIMEOUT) -> Dict[str, AsyncJobPoller]:
+                       timeout: int = DEFAULT_TIMEOUT) -> "PollScheduler":
     """
-    Poll multiple jobs concurrently using async pollers.
+    Poll multiple jobs concurrently through the shared PollScheduler.
+
+    All jobs are multiplexed onto the scheduler for this API client, so the
+    cost per job is a heap entry rather than a dedicated thread.
 
     Args:
         api: MidjourneyAPI instance
@@ -261,24 +470,357 @@ def poll_multiple_jobs(api, job_ids: list,
         timeout: Maximum polling time per job
 
     Returns:
-        Dictionary mapping job_id -> AsyncJobPoller
+        The PollScheduler tracking the jobs (use .cancel(job_id) to stop one)
     """
-    pollers = {}
+    scheduler = get_poll_scheduler(api)
 
     for job_id in job_ids:
-        # Wrap callbacks to include job_id
-        update_cb = (lambda jid: lambda data: on_update(jid, data))(job_id) if on_update else None
-        complete_cb = (lambda jid: lambda data: on_complete(jid, data))(job_id) if on_complete else None
-
-        poller = AsyncJobPoller(
-            api=api,
-            job_id=job_id,
-            on_update=update_cb,
-            on_complete=complete_cb,
-            timeout=timeout
-        )
-        poller.start()
-        pollers[job_id] = poller
+        scheduler.subscribe(job_id, on_update=on_update, on_complete=on_complete,
+                            timeout=timeout)
+
+    logger.info(f"Scheduled polling for {len(job_ids)} jobs")
+    return scheduler
+
+
+# ============================================================================
+# MULTIPLEXED POLL SCHEDULER
+# ============================================================================
+
+MAX_IN_FLIGHT = 4  # global cap on outstanding GET /jobs/{id} requests
+
+
+@dataclass
+class _TrackedJob:
+    """Book-keeping for one job tracked by PollScheduler."""
+    job_id: str
+    timeout: float
+    deadline: float
+    subscribers: Dict[int, Tuple[Optional[Callable], Optional[Callable]]] = field(default_factory=dict)
+    generation: int = 0
+    in_flight: bool = False
+    last_data: Optional[Dict] = None
+    poll_state: PollState = field(default_factory=PollState)
+
+
+class PollScheduler:
+    """
+    Single scheduler thread that polls any number of jobs.
+
+    Jobs live in a priority queue keyed on their next poll time. The scheduler
+    thread pops due jobs and hands the GET to a small worker pool whose size is
+    the global cap on outstanding requests; results are re-queued after an
+    adaptive delay or, on a terminal state, delivered to subscribers and dropped.
+
+    Callbacks receive (job_id, job_data) and run on a worker thread.
+    """
+
+    def __init__(self, api, max_in_flight: int = MAX_IN_FLIGHT,
+                 poll_interval: float = POLL_INTERVAL,
+                 timeout: int = DEFAULT_TIMEOUT,
+                 interval: Optional[AdaptivePollInterval] = None):
+        """
+        Initialize scheduler.
+
+        Args:
+            api: MidjourneyAPI instance used for get_job()
+            max_in_flight: Maximum concurrent status requests
+            poll_interval: Base seconds between polls of the same job
+            timeout: Default maximum tracking time per job in seconds
+            interval: Poll interval policy (defaults to AdaptivePollInterval(poll_interval))
+        """
+        self.api = api
+        self.max_in_flight = max_in_flight
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.interval = interval or AdaptivePollInterval(base=poll_interval)
+
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._jobs: Dict[str, _TrackedJob] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_flag = threading.Event()
+
+    # -- public API ---------------------------------------------------------
+
+    def subscribe(self, job_id: str,
+                  on_update: Optional[Callable[[str, Dict], None]] = None,
+                  on_complete: Optional[Callable[[str, Dict], None]] = None,
+                  timeout: Optional[int] = None) -> int:
+        """
+        Track a job (if not already tracked) and register callbacks for it.
+
+        Returns:
+            Subscription token for unsubscribe()
+        """
+        token = next(self._seq)
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                job_timeout = timeout or self.timeout
+                job = _TrackedJob(job_id=job_id, timeout=job_timeout,
+                                  deadline=time.monotonic() + job_timeout)
+                self._jobs[job_id] = job
+                self._push(job, delay=0)
+            job.subscribers[token] = (on_update, on_complete)
+            self._cond.notify()
+        self.start()
+        return token
+
+    def track(self, job_id: str, timeout: Optional[int] = None) -> int:
+        """Track a job without callbacks (results via last_result())."""
+        return self.subscribe(job_id, timeout=timeout)
+
+    def unsubscribe(self, job_id: str, token: Optional[int] = None):
+        """
+        Remove one subscription (or all subscriptions when token is None).
+
+        The job itself keeps being tracked until cancel() or a terminal state.
+        """
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            if token is None:
+                job.subscribers.clear()
+            else:
+                job.subscribers.pop(token, None)
+
+    def cancel(self, job_id: str) -> bool:
+        """Stop tracking a job. Its heap entry is discarded lazily."""
+        with self._cond:
+            return self._jobs.pop(job_id, None) is not None
+
+    def is_tracking(self, job_id: str) -> bool:
+        with self._cond:
+            return job_id in self._jobs
+
+    def tracked_jobs(self) -> List[str]:
+        with self._cond:
+            return list(self._jobs)
+
+    def last_result(self, job_id: str) -> Optional[Dict]:
+        """Most recent job data seen for a tracked job."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return job.last_data if job else None
+
+    def start(self):
+        """Start the scheduler thread if it is not running."""
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_flag.clear()
+            self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight,
+                                                thread_name_prefix="mj-poll")
+            self._thread = threading.Thread(target=self._run, name="mj-poll-scheduler",
+                                            daemon=True)
+            add_script_run_ctx(self._thread)
+            self._thread.start()
+        logger.info("Poll scheduler started")
+
+    def stop(self):
+        """Stop the scheduler thread. Tracked jobs are kept for a later start()."""
+        self._stop_flag.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if self._executor:
+            self._executor.shutdown(wait=False)
+
+    # -- internals ----------------------------------------------------------
+
+    def _push(self, job: _TrackedJob, delay: float):
+        """Queue the next poll for a job (caller holds the lock)."""
+        job.generation += 1
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq),
+                                    job.job_id, job.generation))
+
+    def _next_due(self) -> Optional[_TrackedJob]:
+        """Block until a job is due, discarding stale heap entries."""
+        with self._cond:
+            while not self._stop_flag.is_set():
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due_at, _, job_id, generation = self._heap[0]
+                job = self._jobs.get(job_id)
+                if job is None or job.generation != generation:
+                    heapq.heappop(self._heap)
+                    continue
+                wait = due_at - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(timeout=wait)
+                    continue
+                heapq.heappop(self._heap)
+                job.in_flight = True
+                return job
+        return None
+
+    def _run(self):
+        """Scheduler loop: dispatch due jobs while respecting the in-flight cap."""
+        while not self._stop_flag.is_set():
+            job = self._next_due()
+            if job is None:
+                break
+            self._slots.acquire()
+            try:
+                self._executor.submit(self._poll_once, job)
+            except RuntimeError:
+                self._slots.release()
+                break
+
+    def _poll_once(self, job: _TrackedJob):
+        """Worker: fetch one job status and route the result."""
+        try:
+            if time.monotonic() > job.deadline:
+                logger.error(f"Poll timeout for job {job.job_id}")
+                self._finish(job, {
+                    "error": f"Job polling timeout after {job.timeout}s",
+                    "status": "timeout",
+                    "jobid": job.job_id
+                })
+                return
+
+            status_code, job_data = self.api.get_job(job.job_id)
+            if status_code != 200:
+                logger.error(f"Failed to poll job {job.job_id[:20]}: {status_code}")
+                self._reschedule(job)
+                return
+
+            if job_data.get("status", "unknown") in TERMINAL_STATES:
+                logger.info(f"Job {job.job_id[:20]} reached terminal state: {job_data.get('status')}")
+                self.interval.stats.observe_job(job_data)
+                self._finish(job, job_data)
+            else:
+                self._notify(job, job_data, complete=False)
+                self._reschedule(job, job_data)
+
+        except Exception as e:
+            logger.exception(f"Exception polling job {job.job_id}: {e}")
+            self._reschedule(job)
+        finally:
+            self._slots.release()
+
+    def _reschedule(self, job: _TrackedJob, job_data: Optional[Dict] = None):
+        delay = self.interval.next_delay(job.poll_state, job_data)
+        with self._cond:
+            job.in_flight = False
+            if self._jobs.get(job.job_id) is job:
+                self._push(job, delay=delay)
+                self._cond.notify()
+
+    def _finish(self, job: _TrackedJob, job_data: Dict):
+        with self._cond:
+            job.in_flight = False
+            if self._jobs.get(job.job_id) is not job:
+                return  # cancelled while the request was in flight
+            del self._jobs[job.job_id]
+        self._notify(job, job_data, complete=True)
+
+    def _notify(self, job: _TrackedJob, job_data: Dict, complete: bool):
+        """Deliver job data to subscribers, isolating callback errors."""
+        with self._cond:
+            job.last_data = job_data
+            subscribers = list(job.subscribers.values())
+        for on_update, on_complete in subscribers:
+            callback = on_complete if complete else on_update
+            if callback is None:
+                continue
+            try:
+                callback(job.job_id, job_data)
+            except Exception as e:
+                logger.error(f"Error in poll callback for {job.job_id[:20]}: {e}")
+
+
+_schedulers: Dict[str, PollScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_poll_scheduler(api) -> PollScheduler:
+    """
+    Return the shared PollScheduler for an API client's token.
+
+    Args:
+        api: MidjourneyAPI instance
+
+    Returns:
+        Process-wide PollScheduler bound to that token
+    """
+    key = getattr(api, "api_token", None) or str(id(api))
+    with _schedulers_lock:
+        scheduler = _schedulers.get(key)
+        if scheduler is None:
+            scheduler = PollScheduler(api)
+            _schedulers[key] = scheduler
+        return scheduler
+
+
+async def await_job_status(api, job_id: str, timeout: int = DEFAULT_TIMEOUT,
+                           interval: Optional[AdaptivePollInterval] = None) -> Dict:
+    """
+    Coroutine counterpart of poll_job_status() for AsyncMidjourneyAPI.
+
+    Sleeps with asyncio.sleep, so any number of jobs can be awaited from one
+    event loop without parking a thread per job.
+
+    Args:
+        api: AsyncMidjourneyAPI instance
+        job_id: Job ID to poll
+        timeout: Maximum polling time in seconds
+        interval: Poll interval policy (defaults to AdaptivePollInterval())
+
+    Returns:
+        Final job data when completed/failed/moderated (or a timeout/error dict)
+    """
+    terminal_states = TERMINAL_STATES
+    interval = interval or AdaptivePollInterval()
+    state = interval.new_state()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
 
-    logger.info(f"Started polling {len(pollers)} jobs concurrently")
-    return pollers
+    while True:
+        if loop.time() > deadline:
+            logger.error(f"Poll timeout after {timeout}s for job {job_id}")
+            return {
+                "error": f"Job polling timeout after {timeout}s",
+                "status": "timeout",
+                "jobid": job_id
+            }
+
+        status_code, job_data = await api.get_job(job_id)
+
+        if status_code != 200:
+            logger.error(f"Failed to get job status: {status_code} - {job_data}")
+            return {"error": f"Failed to get job status: {job_data}", "jobid": job_id}
+
+        if job_data.get("status", "unknown") in terminal_states:
+            logger.info(f"Job {job_id[:20]} completed with status: {job_data.get('status')}")
+            interval.stats.observe_job(job_data)
+            return job_data
+
+        await asyncio.sleep(interval.next_delay(state, job_data))
+
+
+async def await_multiple_jobs(api, job_ids: list,
+                              timeout: int = DEFAULT_TIMEOUT,
+                              interval: Optional[AdaptivePollInterval] = None) -> Dict[str, Dict]:
+    """
+    Await many jobs concurrently on the current event loop.
+
+    Args:
+        api: AsyncMidjourneyAPI instance
+        job_ids: List of job IDs to poll
+        timeout: Maximum polling time per job
+        interval: Poll interval policy shared by all jobs
+
+    Returns:
+        Dictionary mapping job_id -> final job data
+    """
+    results = await asyncio.gather(
+        *(await_job_status(api, jid, timeout, interval) for jid in job_ids)
+    )
+    return dict(zip(job_ids, results))
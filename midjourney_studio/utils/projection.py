@@ -0,0 +1,141 @@
+"""
+Compact job records for storage.
+
+UseAPI job responses embed the full Discord message (author avatars,
+components, interaction metadata, flags, ...), most of which the app never
+reads. Projection keeps only the fields used by the gallery, history and
+video helpers, preserving the original nesting so existing readers such as
+job["response"]["attachments"][0]["url"] keep working. Raw payloads can be
+kept in a gzip side archive instead.
+"""
+
+import json
+import gzip
+import logging
+import threading
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple, Iterator
+
+logger = logging.getLogger(__name__)
+
+PAYLOAD_ARCHIVE = Path("job_payloads.jsonl.gz")
+
+JOB_FIELDS = (
+    "jobid", "status", "verb", "jobType", "code", "created", "updated",
+    "progress_percent", "error", "errorDetails", "channel",
+    # Added locally for button/video jobs
+    "type", "button", "parent_jobid", "prompt",
+)
+REQUEST_FIELDS = ("prompt",)
+RESPONSE_FIELDS = ("content", "attachments", "imageUx", "buttons", "embeds", "progress_percent")
+ATTACHMENT_FIELDS = ("url", "filename", "content_type", "width", "height", "size")
+IMAGE_UX_FIELDS = ("id", "url")
+EMBED_FIELDS = ("title", "description")
+
+
+def _pick(data: Any, fields: Tuple[str, ...]) -> Dict[str, Any]:
+    if not isinstance(data, dict):
+        return {}
+    return {k: data[k] for k in fields if k in data and data[k] is not None}
+
+
+@dataclass
+class Projection:
+    """
+    Field selection for stored job records.
+
+    Each tuple lists the keys kept at one level of the job; everything else
+    is dropped. Override fields to keep more (or less) of the payload.
+    """
+    job_fields: Tuple[str, ...] = JOB_FIELDS
+    request_fields: Tuple[str, ...] = REQUEST_FIELDS
+    response_fields: Tuple[str, ...] = RESPONSE_FIELDS
+    attachment_fields: Tuple[str, ...] = ATTACHMENT_FIELDS
+    image_ux_fields: Tuple[str, ...] = IMAGE_UX_FIELDS
+    embed_fields: Tuple[str, ...] = EMBED_FIELDS
+
+    def apply(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Project a job to its compact form (idempotent).
+
+        Args:
+            job: Full job dictionary as returned by the API or built locally
+
+        Returns:
+            New dictionary with only the configured fields
+        """
+        slim = _pick(job, self.job_fields)
+
+        request = _pick(job.get("request"), self.request_fields)
+        if request:
+            slim["request"] = request
+
+        raw_response = job.get("response")
+        if isinstance(raw_response, dict):
+            response = _pick(raw_response, self.response_fields)
+            if "attachments" in response:
+                response["attachments"] = [_pick(a, self.attachment_fields)
+                                           for a in response["attachments"] or []]
+            if "imageUx" in response:
+                response["imageUx"] = [_pick(u, self.image_ux_fields)
+                                       for u in response["imageUx"] or []]
+            if "embeds" in response:
+                response["embeds"] = [_pick(e, self.embed_fields)
+                                      for e in response["embeds"] or []]
+            if response:
+                slim["response"] = response
+
+        return slim
+
+
+default_projection = Projection()
+
+
+def slim_job(job: Dict[str, Any], projection: Optional[Projection] = None) -> Dict[str, Any]:
+    """Project a job with the given (or default) Projection."""
+    return (projection or default_projection).apply(job)
+
+
+class PayloadArchive:
+    """
+    Append-only gzip archive of raw job payloads (one JSON object per line).
+
+    Each append writes a separate gzip member; readers decode the
+    concatenated members transparently.
+    """
+
+    def __init__(self, path: Path = PAYLOAD_ARCHIVE):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def append(self, job: Dict[str, Any]):
+        """Archive one raw payload."""
+        self.extend([job])
+
+    def extend(self, jobs: List[Dict[str, Any]]):
+        """Archive several raw payloads as one gzip member."""
+        data = "".join(json.dumps(j, separators=(",", ":"), ensure_ascii=False) + "\n" for j in jobs)
+        with self._lock:
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(data)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if not self.path.exists():
+            return
+        with self._lock:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                lines = f.readlines()
+        for line in lines:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("Skipping corrupt archive line")
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Latest archived raw payload for a job (linear scan)."""
+        found = None
+        for job in self:
+            if job.get("jobid") == job_id:
+                found = job
+        return found
@@ -0,0 +1,204 @@
+"""
+Local quadrant splitting of Midjourney grids.
+
+A 2x2 grid is cropped into its four images on disk, so previews and AI
+analysis can use the individual images without fetching the imageUx URLs
+or spending Midjourney capacity on U1-U4 upscale jobs. Crops are stored
+next to the grid's blob in the media cache (lossless PNG for analysis plus
+a small WebP preview) and evicted with it. Render code only reads crops
+that already exist and schedule()s the split in the background otherwise.
+Pillow is optional; without it callers fall back to the imageUx URLs.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import List, Optional, Set
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+from .media_cache import MediaCache, get_media_cache
+
+logger = logging.getLogger(__name__)
+
+# Midjourney numbers grid images left-to-right, top-to-bottom (U1-U4)
+QUADRANT_LABELS = ("top-left", "top-right", "bottom-left", "bottom-right")
+PREVIEW_EDGE = 384
+PREVIEW_QUALITY = 80
+SPLIT_WORKERS = 2
+
+
+def quadrant_boxes(width: int, height: int) -> List[tuple]:
+    """(left, upper, right, lower) crop boxes for a 2x2 grid, in U1-U4 order."""
+    half_w, half_h = width // 2, height // 2
+    return [
+        (0, 0, half_w, half_h),
+        (half_w, 0, width, half_h),
+        (0, half_h, half_w, height),
+        (half_w, half_h, width, height),
+    ]
+
+
+def split_grid(data: bytes) -> List[bytes]:
+    """
+    Split an encoded 2x2 grid image into four PNG-encoded quadrants.
+
+    Raises:
+        ImportError: If Pillow is not installed
+        OSError: If the data is not a decodable image
+    """
+    if Image is None:
+        raise ImportError("Quadrant splitting requires Pillow. Install it with: pip install pillow")
+    crops = []
+    with Image.open(BytesIO(data)) as grid:
+        grid.load()
+        for box in quadrant_boxes(*grid.size):
+            buf = BytesIO()
+            grid.crop(box).save(buf, "PNG")
+            crops.append(buf.getvalue())
+    return crops
+
+
+class QuadrantSplitter:
+    """
+    Cached quadrant crops for grid URLs.
+
+    Usage:
+        splitter = QuadrantSplitter()
+        crops = splitter.crops(grid_url)              # [U1, U2, U3, U4] PNG bytes (blocking)
+        previews = splitter.previews(grid_url)        # existing small WebP files, or None
+        if previews is None:
+            splitter.schedule(grid_url)               # split in the background
+    """
+
+    def __init__(self, cache: Optional[MediaCache] = None, workers: int = SPLIT_WORKERS):
+        """
+        Args:
+            cache: MediaCache holding the grids (defaults to the shared cache)
+            workers: Background threads used by schedule()
+        """
+        self.cache = cache or get_media_cache()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="mj-quadrants")
+        self._pending_lock = threading.Lock()
+        self._pending: Set[str] = set()
+
+    @property
+    def available(self) -> bool:
+        """True if Pillow is installed."""
+        return Image is not None
+
+    def _crop_paths(self, sha256: str) -> List[Path]:
+        return [self.cache.derived_path(sha256, f"q{n}.png") for n in range(1, 5)]
+
+    def _preview_paths(self, sha256: str) -> List[Path]:
+        return [self.cache.derived_path(sha256, f"q{n}.w{PREVIEW_EDGE}.webp") for n in range(1, 5)]
+
+    def _split(self, blob: Path) -> bool:
+        """Write crops and previews for one grid blob from a single decode."""
+        sha256 = blob.name
+        try:
+            with Image.open(blob) as grid:
+                grid.load()
+                boxes = quadrant_boxes(*grid.size)
+                targets = zip(boxes, self._crop_paths(sha256), self._preview_paths(sha256))
+                for box, crop_path, preview_path in targets:
+                    crop = grid.crop(box)
+                    crop_path.parent.mkdir(parents=True, exist_ok=True)
+                    for path, image, fmt, options in (
+                        (crop_path, crop, "PNG", {}),
+                        (preview_path, self._preview(crop), "WEBP", {"quality": PREVIEW_QUALITY}),
+                    ):
+                        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+                        image.save(tmp, fmt, **options)
+                        tmp.replace(path)
+            return True
+        except Exception as e:
+            logger.warning(f"Quadrant split failed for {sha256[:12]}: {e}")
+            return False
+
+    @staticmethod
+    def _preview(crop):
+        preview = crop.convert("RGBA" if crop.mode in ("RGBA", "LA", "P") else "RGB")
+        preview.thumbnail((PREVIEW_EDGE, PREVIEW_EDGE), Image.LANCZOS)
+        return preview
+
+    def _ensure(self, url: str, fetch: bool) -> Optional[str]:
+        """sha256 of the grid blob with crops on disk, or None."""
+        if not self.available or not url:
+            return None
+        blob = self.cache.path_for(url)
+        if blob is None and fetch and self.cache.fetch(url):
+            blob = self.cache.path_for(url)
+        if blob is None:
+            return None
+        if all(p.exists() for p in self._preview_paths(blob.name)):
+            return blob.name
+        with self._lock:
+            if all(p.exists() for p in self._preview_paths(blob.name)) or self._split(blob):
+                return blob.name
+        return None
+
+    def paths(self, url: str, fetch: bool = False) -> Optional[List[Path]]:
+        """Full-resolution PNG crops (U1-U4 order), or None."""
+        sha256 = self._ensure(url, fetch)
+        return self._crop_paths(sha256) if sha256 else None
+
+    def previews(self, url: str) -> Optional[List[Path]]:
+        """Existing WebP previews of the crops (U1-U4 order), or None; never splits."""
+        if not self.available or not url:
+            return None
+        blob = self.cache.path_for(url)
+        if blob is None:
+            return None
+        paths = self._preview_paths(blob.name)
+        return paths if all(p.exists() for p in paths) else None
+
+    def schedule(self, url: str):
+        """Fetch the grid and split it in the background."""
+        if not self.available or not url:
+            return
+        with self._pending_lock:
+            if url in self._pending:
+                return
+            self._pending.add(url)
+
+        def work():
+            try:
+                self._ensure(url, fetch=True)
+            finally:
+                with self._pending_lock:
+                    self._pending.discard(url)
+
+        self._pool.submit(work)
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+
+    def crops(self, url: str, fetch: bool = True) -> Optional[List[bytes]]:
+        """PNG bytes of the four crops (U1-U4 order), or None."""
+        paths = self.paths(url, fetch)
+        if not paths:
+            return None
+        try:
+            return [p.read_bytes() for p in paths]
+        except OSError:
+            return None
+
+
+_splitter: Optional[QuadrantSplitter] = None
+_splitter_lock = threading.Lock()
+
+
+def get_quadrant_splitter() -> QuadrantSplitter:
+    """Return the process-wide QuadrantSplitter."""
+    global _splitter
+    with _splitter_lock:
+        if _splitter is None:
+            _splitter = QuadrantSplitter()
+        return _splitter
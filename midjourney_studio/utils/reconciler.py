@@ -0,0 +1,288 @@
+"""
+Bulk job status reconciliation.
+
+Instead of issuing GET /jobs/{id} for every tracked job on every refresh, the
+reconciler calls list_running_jobs() once per tick, diffs the running set
+against the locally tracked jobs, and fetches full details only for jobs that
+are no longer running. With 50 jobs in flight that is one request per tick
+instead of 50.
+"""
+
+import time
+import logging
+import threading
+from typing import Dict, List, Optional, Callable, Set, Tuple, Any
+
+from .polling import POLL_INTERVAL, TERMINAL_STATES, render_stats
+
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx
+except ImportError:
+    add_script_run_ctx = lambda x: x
+
+logger = logging.getLogger(__name__)
+
+
+def running_job_ids(payload: Any) -> Optional[Set[str]]:
+    """
+    Extract the set of running job IDs from a list_running_jobs() response.
+
+    Handles the v3 shape ({"channels": {id: {"jobs": [{"jobId": ...}]}}}),
+    a flat {"jobs": [...]} list and the v2 plain list of job IDs.
+
+    Returns:
+        Set of job IDs, or None if the payload is not recognised
+    """
+    def _ids(jobs) -> Set[str]:
+        ids = set()
+        for job in jobs or []:
+            if isinstance(job, str):
+                ids.add(job)
+            elif isinstance(job, dict):
+                job_id = job.get("jobId") or job.get("jobid")
+                if job_id:
+                    ids.add(job_id)
+        return ids
+
+    if isinstance(payload, list):
+        return _ids(payload)
+    if not isinstance(payload, dict):
+        return None
+
+    if "channels" in payload:
+        ids = set()
+        for ch_data in (payload.get("channels") or {}).values():
+            if isinstance(ch_data, dict):
+                ids |= _ids(ch_data.get("jobs"))
+        return ids
+    if "jobs" in payload:
+        return _ids(payload.get("jobs"))
+    if payload.get("total") == 0:
+        return set()
+    return None
+
+
+class JobReconciler:
+    """
+    Track many jobs with one list_running_jobs() call per tick.
+
+    Jobs that are still in the running set cost nothing; jobs that left it (or
+    never showed up) get a single get_job() to pick up their final state.
+    Callbacks receive (job_id, job_data).
+    """
+
+    def __init__(self, api, interval: float = POLL_INTERVAL,
+                 on_update: Optional[Callable[[str, Dict], None]] = None,
+                 on_complete: Optional[Callable[[str, Dict], None]] = None):
+        """
+        Initialize reconciler.
+
+        Args:
+            api: MidjourneyAPI instance
+            interval: Seconds between ticks of the background loop
+            on_update: Callback for every non-terminal status change
+            on_complete: Callback when any tracked job reaches a terminal state
+        """
+        self.api = api
+        self.interval = interval
+        self.on_update = on_update
+        self.on_complete = on_complete
+
+        self._jobs: Dict[str, Dict] = {}  # job_id -> latest job data
+        self._active: Set[str] = set()  # tracked, not yet terminal
+        self._seen_running: Set[str] = set()
+        self._callback_due: Dict[str, Tuple[float, float]] = {}  # job_id -> (timeout, poll-fallback time)
+        self._job_callbacks: Dict[str, List[Callable[[str, Dict], None]]] = {}
+        self._lock = threading.RLock()
+        self._stop_flag = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_tick: Optional[float] = None
+        self.last_running: Set[str] = set()
+
+    # -- tracking -----------------------------------------------------------
+
+    def track(self, job_id: str, job_data: Optional[Dict] = None,
+              on_complete: Optional[Callable[[str, Dict], None]] = None,
+              callback_timeout: Optional[float] = None):
+        """
+        Start tracking a job (idempotent). job_data seeds the cached state.
+
+        Args:
+            job_id: Job to track
+            job_data: Initial job data (e.g. the submission response)
+            on_complete: Callback when this job reaches a terminal state
+            callback_timeout: If the job was submitted with a replyUrl, skip
+                polling it until this many seconds pass without a callback
+        """
+        if not job_id:
+            return
+        with self._lock:
+            if job_data is not None or job_id not in self._jobs:
+                self._jobs[job_id] = job_data or {"jobid": job_id, "status": "created"}
+            if self._jobs[job_id].get("status") not in TERMINAL_STATES:
+                self._active.add(job_id)
+            if on_complete:
+                self._job_callbacks.setdefault(job_id, []).append(on_complete)
+            if callback_timeout:
+                self._callback_due[job_id] = (callback_timeout, time.time() + callback_timeout)
+
+    def untrack(self, job_id: str):
+        """Forget a job entirely."""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            self._active.discard(job_id)
+            self._seen_running.discard(job_id)
+            self._job_callbacks.pop(job_id, None)
+            self._callback_due.pop(job_id, None)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Latest known data for a tracked job."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def active_jobs(self) -> List[str]:
+        """Tracked jobs that have not reached a terminal state."""
+        with self._lock:
+            return list(self._active)
+
+    # -- reconciliation -----------------------------------------------------
+
+    def tick(self) -> Dict[str, Dict]:
+        """
+        Reconcile tracked jobs against the running set once.
+
+        Returns:
+            Dictionary of job_id -> job data for jobs whose state changed
+        """
+        now = time.time()
+        with self._lock:
+            # Jobs still inside their callback window are left to the webhook
+            active = {j for j in self._active if self._callback_due.get(j, (0, 0))[1] <= now}
+        if not active:
+            return {}
+
+        code, payload = self.api.list_running_jobs()
+        self.last_tick = time.time()
+        if code != 200:
+            logger.warning(f"list_running_jobs failed ({code}); skipping reconcile tick")
+            return {}
+
+        running = running_job_ids(payload)
+        if running is None:
+            logger.warning("Unrecognised list_running_jobs payload; checking jobs individually")
+            running = set()
+        self.last_running = running
+
+        changed = {}
+        for job_id in active:
+            if job_id in running:
+                with self._lock:
+                    self._seen_running.add(job_id)
+                continue
+
+            # Left the running set (or never appeared): fetch details once
+            status_code, job_data = self.api.get_job(job_id)
+            if status_code != 200:
+                logger.error(f"Failed to fetch job {job_id[:20]}: {status_code}")
+                continue
+
+            if self.apply(job_id, job_data):
+                changed[job_id] = job_data
+
+        return changed
+
+    def apply(self, job_id: str, job_data: Dict) -> bool:
+        """
+        Record fresh job data from any source (poll or replyUrl callback).
+
+        Fires on_update for status changes and the completion callbacks once
+        the job is terminal. A callback also pushes back the job's poll
+        fallback by another callback window, since the webhook is reaching us.
+
+        Returns:
+            True if the job's state changed
+        """
+        with self._lock:
+            if job_id not in self._active:
+                return False  # unknown, untracked meanwhile or already final
+            previous = self._jobs.get(job_id) or {}
+            self._jobs[job_id] = job_data
+            terminal = job_data.get("status") in TERMINAL_STATES
+            if terminal:
+                self._active.discard(job_id)
+                self._seen_running.discard(job_id)
+                self._callback_due.pop(job_id, None)
+            elif job_id in self._callback_due:
+                timeout = self._callback_due[job_id][0]
+                self._callback_due[job_id] = (timeout, time.time() + timeout)
+            callbacks = self._job_callbacks.pop(job_id, []) if terminal else []
+
+        if terminal:
+            render_stats.observe_job(job_data)
+            self._fire(self.on_complete, job_id, job_data)
+            for callback in callbacks:
+                self._fire(callback, job_id, job_data)
+            return True
+        if job_data.get("status") != previous.get("status"):
+            self._fire(self.on_update, job_id, job_data)
+            return True
+        return False
+
+    @staticmethod
+    def _fire(callback: Optional[Callable], job_id: str, job_data: Dict):
+        if callback is None:
+            return
+        try:
+            callback(job_id, job_data)
+        except Exception as e:
+            logger.error(f"Error in reconciler callback for {job_id[:20]}: {e}")
+
+    # -- background loop ----------------------------------------------------
+
+    def _run(self):
+        while not self._stop_flag.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                logger.exception(f"Reconcile tick failed: {e}")
+            self._stop_flag.wait(self.interval)
+
+    def start(self):
+        """Run tick() every `interval` seconds in a background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_flag.clear()
+        self._thread = threading.Thread(target=self._run, name="mj-reconciler", daemon=True)
+        add_script_run_ctx(self._thread)
+        self._thread.start()
+        logger.info("Job reconciler started")
+
+    def stop(self):
+        """Stop the background loop."""
+        self._stop_flag.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+_reconcilers: Dict[str, JobReconciler] = {}
+_reconcilers_lock = threading.Lock()
+
+
+def get_job_reconciler(api) -> JobReconciler:
+    """
+    Return the shared, running JobReconciler for an API client's token.
+
+    Args:
+        api: MidjourneyAPI instance
+
+    Returns:
+        Process-wide JobReconciler bound to that token
+    """
+    key = getattr(api, "api_token", None) or str(id(api))
+    with _reconcilers_lock:
+        reconciler = _reconcilers.get(key)
+        if reconciler is None:
+            reconciler = JobReconciler(api)
+            _reconcilers[key] = reconciler
+    reconciler.start()
+    return reconciler
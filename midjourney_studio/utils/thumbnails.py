@@ -0,0 +1,171 @@
+"""
+Local WebP thumbnails for cached images.
+
+Small previews (history rows, gallery tiles, batch results) are served from
+downscaled WebP files generated once per cached blob, instead of the
+full-size CDN originals. Every size is produced from a single decode and
+stored next to the blob in the media cache, so thumbnails are shared by
+all URLs with the same content and evicted with it. Pillow is optional;
+without it callers fall back to the originals.
+"""
+
+import logging
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict, Optional, Set
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+from .media_cache import MediaCache, get_media_cache
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels; sized for ~2x density at the widths the app uses
+THUMB_SIZES = {"small": 192, "medium": 384, "large": 768}
+THUMB_QUALITY = 80
+THUMB_WORKERS = 2
+
+
+class Thumbnailer:
+    """
+    Generate and look up WebP thumbnails for media cache entries.
+
+    Usage:
+        thumbs = Thumbnailer()
+        path = thumbs.get(url, "small")   # existing file or None, never blocks
+        if path is None:
+            thumbs.schedule(url)          # fetch + thumbnail in the background
+    """
+
+    def __init__(self, cache: Optional[MediaCache] = None, sizes: Dict[str, int] = THUMB_SIZES,
+                 quality: int = THUMB_QUALITY, workers: int = THUMB_WORKERS):
+        """
+        Initialize thumbnailer.
+
+        Args:
+            cache: MediaCache holding the originals (defaults to the shared cache)
+            sizes: Size name -> longest edge in pixels
+            quality: WebP quality (0-100)
+            workers: Background threads used by schedule()
+        """
+        self.cache = cache or get_media_cache()
+        self.sizes = dict(sizes)
+        self.quality = quality
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="mj-thumbs")
+        self._lock = threading.Lock()
+        self._pending: Set[str] = set()
+
+    @property
+    def available(self) -> bool:
+        """True if Pillow is installed."""
+        return Image is not None
+
+    def _path(self, sha256: str, size: str) -> Path:
+        return self.cache.derived_path(sha256, f"w{self.sizes[size]}.webp")
+
+    def _render(self, sha256: str, data: bytes) -> bool:
+        """Write every thumbnail size for one blob from a single decode."""
+        try:
+            with Image.open(BytesIO(data)) as source:
+                source.load()
+                mode = "RGBA" if source.mode in ("RGBA", "LA", "P") else "RGB"
+                image = source.convert(mode)
+            for size, edge in sorted(self.sizes.items(), key=lambda kv: -kv[1]):
+                # Downscale from the largest thumbnail to the next for speed
+                image.thumbnail((edge, edge), Image.LANCZOS)
+                path = self._path(sha256, size)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+                image.save(tmp, "WEBP", quality=self.quality, method=4)
+                tmp.replace(path)
+            return True
+        except Exception as e:
+            logger.warning(f"Thumbnail generation failed for {sha256[:12]}: {e}")
+            return False
+
+    def get(self, url: str, size: str = "medium") -> Optional[Path]:
+        """
+        Existing thumbnail file for a URL; never decodes or fetches anything.
+
+        Args:
+            url: Original media URL
+            size: One of the configured size names
+
+        Returns:
+            Path to the WebP thumbnail, or None until schedule() has built it
+        """
+        if not self.available or not url or size not in self.sizes:
+            return None
+        blob = self.cache.path_for(url)
+        if blob is None:
+            return None
+        path = self._path(blob.name, size)
+        return path if path.exists() else None
+
+    def build(self, url: str, size: str = "medium", fetch: bool = False) -> Optional[Path]:
+        """
+        Produce the thumbnails for a URL (blocking; used by the schedule() workers).
+
+        Args:
+            url: Original media URL
+            size: Size name whose path is returned
+            fetch: Download the original if it is not cached yet
+
+        Returns:
+            Path to the WebP thumbnail, or None if it cannot be produced
+        """
+        if not self.available or not url or size not in self.sizes:
+            return None
+        blob = self.cache.path_for(url)
+        if blob is None and fetch and self.cache.fetch(url):
+            blob = self.cache.path_for(url)
+        if blob is None:
+            return None
+
+        path = self._path(blob.name, size)
+        if path.exists():
+            return path
+        try:
+            data = blob.read_bytes()
+        except OSError:
+            return None
+        return path if self._render(blob.name, data) else None
+
+    def schedule(self, url: str, size: str = "medium"):
+        """Fetch the original and build its thumbnails in the background."""
+        if not self.available or not url:
+            return
+        with self._lock:
+            if url in self._pending:
+                return
+            self._pending.add(url)
+
+        def work():
+            try:
+                self.build(url, size, fetch=True)
+            finally:
+                with self._lock:
+                    self._pending.discard(url)
+
+        self._pool.submit(work)
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+
+
+_thumbnailer: Optional[Thumbnailer] = None
+_thumbnailer_lock = threading.Lock()
+
+
+def get_thumbnailer() -> Thumbnailer:
+    """Return the process-wide Thumbnailer."""
+    global _thumbnailer
+    with _thumbnailer_lock:
+        if _thumbnailer is None:
+            _thumbnailer = Thumbnailer()
+        return _thumbnailer
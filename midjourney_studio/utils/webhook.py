@@ -0,0 +1,276 @@
+"""
+Embedded HTTP receiver for UseAPI replyUrl job callbacks.
+
+Jobs submitted with replyUrl/replyRef get their updates pushed to this
+server instead of being polled. Each submission registers a random replyRef
+first; callbacks carrying an unknown ref (or a jobid that does not match the
+one bound to the ref) are rejected. Callbacks that arrive before the ref is
+bound to its job are buffered and replayed by bind(). Accepted updates are
+handed to the listener registered with the ref, typically JobReconciler.apply, which only
+falls back to polling when no callback arrives in time.
+
+UseAPI must be able to reach the server, so the reply URL is only offered
+when a public base URL is configured (e.g. a tunnel forwarding to the local
+port via MJ_CALLBACK_URL / MJ_CALLBACK_PORT).
+"""
+
+import os
+import json
+import secrets
+import logging
+import threading
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Callable
+
+from .polling import TERMINAL_STATES
+
+logger = logging.getLogger(__name__)
+
+CALLBACK_PATH = "/mj/callback"
+CALLBACK_TIMEOUT = 120  # seconds to wait for a callback before polling a job
+MAX_BODY_BYTES = 2 * 1024 * 1024
+
+
+@dataclass
+class _PendingRef:
+    """A registered replyRef awaiting callbacks."""
+    on_update: Optional[Callable[[str, Dict], None]]
+    job_id: Optional[str] = None
+    early: List[Dict] = field(default_factory=list)  # callbacks received before bind()
+
+
+class _CallbackHandler(BaseHTTPRequestHandler):
+    """Request handler; delegates to the owning CallbackServer."""
+
+    server_version = "MidjourneyStudioCallback/1.0"
+
+    def do_POST(self):
+        owner: CallbackServer = self.server.owner
+        if self.path.split("?", 1)[0] != owner.path:
+            self._reply(404, {"error": "Not found"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0 or length > MAX_BODY_BYTES:
+            self._reply(400, {"error": "Invalid body length"})
+            return
+
+        try:
+            payload = json.loads(self.rfile.read(length))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            self._reply(400, {"error": "Invalid JSON"})
+            return
+
+        code = owner.handle_callback(payload)
+        self._reply(code, {"ok": code == 200})
+
+    def _reply(self, code: int, body: Dict):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug("callback %s - %s", self.address_string(), format % args)
+
+
+class CallbackServer:
+    """
+    Threaded HTTP server receiving job callbacks keyed by replyRef.
+
+    Usage:
+        ref = server.register(on_update=reconciler.apply)
+        code, result = api.imagine(prompt, reply_url=server.reply_url, reply_ref=ref)
+        reconciler.track(result["jobid"], result, callback_timeout=CALLBACK_TIMEOUT)
+        server.bind(ref, result["jobid"])
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 public_url: Optional[str] = None, path: str = CALLBACK_PATH):
+        """
+        Initialize callback server (call start() to listen).
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+            public_url: Externally reachable base URL forwarding to this server
+            path: URL path callbacks are posted to
+        """
+        self.host = host
+        self.port = port
+        self.public_url = public_url.rstrip("/") if public_url else None
+        self.path = path
+        self._refs: Dict[str, _PendingRef] = {}
+        self._lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def local_url(self) -> str:
+        """URL of the callback endpoint on this machine."""
+        return f"http://{self.host}:{self.port}{self.path}"
+
+    @property
+    def reply_url(self) -> Optional[str]:
+        """URL to send as replyUrl, or None when UseAPI cannot reach us."""
+        if not self.public_url:
+            return None
+        return f"{self.public_url}{self.path}"
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # -- ref registry -------------------------------------------------------
+
+    def register(self, on_update: Optional[Callable[[str, Dict], None]] = None) -> str:
+        """
+        Register a new replyRef before submitting a job.
+
+        Args:
+            on_update: Called with (job_id, job_data) for each accepted callback
+
+        Returns:
+            The replyRef to submit with the job
+        """
+        ref = secrets.token_urlsafe(16)
+        with self._lock:
+            self._refs[ref] = _PendingRef(on_update=on_update)
+        return ref
+
+    def bind(self, reply_ref: str, job_id: str):
+        """
+        Bind a registered replyRef to the job ID returned by submission.
+
+        Callbacks that arrived while the submission was in flight are
+        replayed to the listener, so start tracking the job first.
+        """
+        with self._lock:
+            pending = self._refs.get(reply_ref)
+            if not pending:
+                return
+            pending.job_id = job_id
+            early = [p for p in pending.early if p.get("jobid") in (None, job_id)]
+            pending.early = []
+            if any(p.get("status") in TERMINAL_STATES for p in early):
+                del self._refs[reply_ref]
+        for payload in early:
+            self._dispatch(pending, job_id, payload)
+
+    def discard(self, reply_ref: str):
+        """Forget a replyRef (e.g. when submission failed)."""
+        with self._lock:
+            self._refs.pop(reply_ref, None)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._refs)
+
+    def handle_callback(self, payload: Dict) -> int:
+        """
+        Verify and dispatch one callback payload.
+
+        Returns:
+            HTTP status code to answer with
+        """
+        if not isinstance(payload, dict):
+            return 400
+
+        ref = payload.get("replyRef")
+        job_id = payload.get("jobid")
+        with self._lock:
+            pending = self._refs.get(ref) if ref else None
+            if pending is None:
+                logger.warning("Rejected callback with unknown replyRef")
+                return 403
+            if pending.job_id and job_id and pending.job_id != job_id:
+                logger.warning(f"Rejected callback: jobid mismatch for ref ({job_id[:20]})")
+                return 403
+            if not pending.job_id:
+                # The submission response (and its jobid) has not been bound yet
+                pending.early.append(payload)
+                return 200
+            job_id = pending.job_id
+            if payload.get("status") in TERMINAL_STATES:
+                del self._refs[ref]  # refs are single-use once the job is final
+
+        self._dispatch(pending, job_id, payload)
+        return 200
+
+    @staticmethod
+    def _dispatch(pending: _PendingRef, job_id: str, payload: Dict):
+        logger.info(f"Callback for job {job_id[:20]}: {payload.get('status')}")
+        if pending.on_update:
+            try:
+                pending.on_update(job_id, payload)
+            except Exception as e:
+                logger.error(f"Error in callback listener for {job_id[:20]}: {e}")
+
+    # -- lifecycle ----------------------------------------------------------
+
+    def start(self):
+        """Bind and serve in a daemon thread."""
+        if self.running:
+            return
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _CallbackHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.owner = self
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                        name="mj-callbacks", daemon=True)
+        self._thread.start()
+        logger.info(f"Callback server listening on {self.local_url}")
+
+    def stop(self):
+        """Shut the server down."""
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+_server: Optional[CallbackServer] = None
+_server_lock = threading.Lock()
+
+
+def start_callback_server(host: str = "127.0.0.1", port: Optional[int] = None,
+                          public_url: Optional[str] = None) -> CallbackServer:
+    """
+    Start the process-wide callback server (idempotent).
+
+    Port and public URL default to MJ_CALLBACK_PORT and MJ_CALLBACK_URL.
+
+    Returns:
+        The running CallbackServer
+    """
+    global _server
+    with _server_lock:
+        if _server is None or not _server.running:
+            if port is None:
+                port = int(os.getenv("MJ_CALLBACK_PORT") or 0)
+            if public_url is None:
+                public_url = os.getenv("MJ_CALLBACK_URL") or None
+            _server = CallbackServer(host=host, port=port, public_url=public_url)
+            _server.start()
+        return _server
+
+
+def get_callback_server() -> Optional[CallbackServer]:
+    """Return the running callback server, or None if none was started."""
+    server = _server
+    return server if server is not None and server.running else None
+
+
+def stop_callback_server():
+    """Stop the process-wide callback server."""
+    global _server
+    with _server_lock:
+        if _server is not None:
+            _server.stop()
+            _server = None
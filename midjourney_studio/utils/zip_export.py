@@ -0,0 +1,126 @@
+"""
+Streaming ZIP export.
+
+Archives are written entry by entry into a spooled temporary file that
+rolls over to disk past a small threshold, instead of a BytesIO holding
+the whole export. Already-compressed media (PNG, JPEG, WebP, MP4, ...) is
+stored without recompression. The finished archive is read back once; later
+reads (e.g. a download button on every rerun) reuse those bytes.
+"""
+
+import os
+import zipfile
+import tempfile
+import logging
+from typing import Optional, Set
+
+logger = logging.getLogger(__name__)
+
+ZIP_SPOOL_BYTES = 8 * 1024 * 1024
+STORED_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".webp", ".gif",
+    ".mp4", ".mov", ".webm", ".zip", ".gz",
+}
+
+
+class ZipExport:
+    """
+    ZIP archive built incrementally in a spooled temp file.
+
+    Usage:
+        export = ZipExport()
+        export.add("grid.png", data)
+        payload = export.finish().read()
+        export.close()
+    """
+
+    def __init__(self, spool_bytes: int = ZIP_SPOOL_BYTES):
+        self.file = tempfile.SpooledTemporaryFile(max_size=spool_bytes, suffix=".zip")
+        self._zip = zipfile.ZipFile(self.file, "w", compression=zipfile.ZIP_DEFLATED)
+        self._names: Set[str] = set()
+        self.count = 0
+        self.finished = False
+        self._data: Optional[bytes] = None
+
+    @staticmethod
+    def compression_for(filename: str) -> int:
+        """ZIP_STORED for already-compressed media, ZIP_DEFLATED otherwise."""
+        ext = os.path.splitext(filename)[1].lower()
+        return zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+
+    def _unique_name(self, filename: str) -> str:
+        name = filename or f"file_{self.count}"
+        stem, ext = os.path.splitext(name)
+        n = 1
+        while name in self._names:
+            name = f"{stem} ({n}){ext}"
+            n += 1
+        self._names.add(name)
+        return name
+
+    def add(self, filename: str, data: bytes) -> str:
+        """
+        Append one entry; duplicate names get a " (n)" suffix.
+
+        Returns:
+            The name the entry was stored under
+        """
+        name = self._unique_name(filename)
+        self._zip.writestr(name, data, compress_type=self.compression_for(name))
+        self.count += 1
+        return name
+
+    def finish(self) -> "ZipExport":
+        """Write the central directory and rewind for reading."""
+        if not self.finished:
+            self._zip.close()
+            self.finished = True
+        self.file.seek(0)
+        return self
+
+    def read(self) -> bytes:
+        """
+        Archive contents (finishes the archive if needed).
+
+        The temp file is read once and released; the bytes are kept and
+        returned by every later call.
+        """
+        if self._data is None:
+            self.finish()
+            self._data = self.file.read()
+            self.file.close()
+        return self._data
+
+    @property
+    def size(self) -> int:
+        if self._data is not None:
+            return len(self._data)
+        position = self.file.tell()
+        self.file.seek(0, os.SEEK_END)
+        size = self.file.tell()
+        self.file.seek(position)
+        return size
+
+    @property
+    def on_disk(self) -> bool:
+        """True once the archive rolled over from memory to a temp file."""
+        return bool(getattr(self.file, "_rolled", False))
+
+    def close(self):
+        """Discard the archive, its temp file and any bytes already read."""
+        self._data = None
+        try:
+            if not self.finished:
+                self._zip.close()
+        except Exception:
+            pass
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.close()
+        else:
+            self.finish()
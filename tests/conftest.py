@@ -0,0 +1,108 @@
+"""
+Shared test doubles: a controllable clock and a UseAPI client stub.
+"""
+
+import threading
+import time
+
+import pytest
+
+
+class FakeClock:
+    """Monotonic clock the test advances by setting `now`."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeAPI:
+    """
+    MidjourneyAPI stub covering the calls the batch, polling and reconcile
+    code makes.
+
+    Running jobs are kept per channel as list_running_jobs() job entries;
+    `running` may also be given as plain job IDs, which run on c1. get_job()
+    reports a job as in progress while it is running or until it has been
+    polled `polls_to_complete` times (None: never), then completed.
+    """
+
+    def __init__(self, channels=None, running=None, polls_to_complete=1, delay=0.0,
+                 fail_prompts=()):
+        self.channels = channels or {"c1": {"maxJobs": 4, "maxImageJobs": 3, "maxVideoJobs": 1}}
+        if running is None or isinstance(running, dict):
+            self.running = running or {}
+        else:
+            self.running = {"c1": [{"jobId": j, "jobType": "imagine"} for j in running]}
+        self.polls_to_complete = polls_to_complete
+        self.delay = delay
+        self.fail_prompts = set(fail_prompts)
+        self.fail_code, self.fail_error = 402, "Payment required"
+        self.channel_error = None
+        self.list_calls = 0
+        self.get_calls = []
+        self.calls = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.probes = []
+        self.submitted = []
+        self.routed = []
+        self.buttons = []
+        self.lock = threading.Lock()
+
+    def running_ids(self):
+        return {job["jobId"] for jobs in self.running.values() for job in jobs}
+
+    def finish(self, job_id):
+        """Drop a job from the running set."""
+        for channel, jobs in self.running.items():
+            self.running[channel] = [job for job in jobs if job["jobId"] != job_id]
+
+    def get_accounts(self):
+        return 200, {"channels": self.channels}
+
+    def get_account_channel(self, channel):
+        self.probes.append(channel)
+        data = {"channel": channel, **self.channels.get(channel, {})}
+        if self.channel_error:
+            data["error"] = self.channel_error
+        return 200, data
+
+    def list_running_jobs(self):
+        self.list_calls += 1
+        channels = {c: {"total": len(jobs), "jobs": jobs} for c, jobs in self.running.items()}
+        return 200, {"total": sum(len(j) for j in self.running.values()), "channels": channels}
+
+    def get_job(self, job_id):
+        with self.lock:
+            self.get_calls.append(job_id)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.calls[job_id] = self.calls.get(job_id, 0) + 1
+            count = self.calls[job_id]
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        done = (self.polls_to_complete is not None and count >= self.polls_to_complete
+                and job_id not in self.running_ids())
+        return 200, {"jobid": job_id, "status": "completed" if done else "progress",
+                     "progress_percent": count * 10}
+
+    def imagine(self, prompt, channel=None, stream=False, reply_url=None, reply_ref=None):
+        with self.lock:
+            if prompt in self.fail_prompts:
+                return self.fail_code, {"error": self.fail_error}
+            self.submitted.append(prompt)
+            self.routed.append(channel)
+            return 201, {"jobid": f"job{len(self.submitted)}", "status": "created", "channel": channel}
+
+    def button(self, job_id, button, stream=False):
+        self.buttons.append((job_id, button))
+        return 201, {"jobid": f"anim-{job_id}", "status": "created"}
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
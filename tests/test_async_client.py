@@ -0,0 +1,98 @@
+"""
+Unit tests for the asyncio MidjourneyAPI client.
+"""
+
+import asyncio
+import json
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from midjourney_studio.api.async_client import AsyncMidjourneyAPI
+from midjourney_studio.utils.polling import await_multiple_jobs, AdaptivePollInterval
+
+
+def make_api(handler):
+    return AsyncMidjourneyAPI("user:1234-abc", transport=httpx.MockTransport(handler))
+
+
+class TestAsyncRequests:
+    """Test request construction and error mapping."""
+
+    def test_imagine_posts_json(self):
+        seen = {}
+
+        def handler(request):
+            seen["url"] = str(request.url)
+            seen["auth"] = request.headers["Authorization"]
+            seen["body"] = json.loads(request.content)
+            return httpx.Response(200, json={"jobid": "j1", "status": "created"})
+
+        async def run():
+            async with make_api(handler) as api:
+                return await api.imagine("a cat", channel="c1")
+
+        code, data = asyncio.run(run())
+        assert code == 200
+        assert data["jobid"] == "j1"
+        assert seen["url"].endswith("/v3/midjourney/jobs/imagine")
+        assert seen["auth"] == "Bearer user:1234-abc"
+        assert seen["body"] == {"prompt": "a cat", "stream": False, "channel": "c1"}
+
+    def test_describe_sends_image_blob(self):
+        def handler(request):
+            assert b'name="imageBlob"' in request.content
+            assert request.headers["Content-Type"].startswith("multipart/form-data")
+            return httpx.Response(200, json={"jobid": "d1"})
+
+        async def run():
+            async with make_api(handler) as api:
+                return await api.describe(b"png", "a.png", "image/png")
+
+        assert asyncio.run(run()) == (200, {"jobid": "d1"})
+
+    def test_blend_validates_image_count(self):
+        async def run():
+            async with make_api(lambda r: httpx.Response(200, json={})) as api:
+                return await api.blend([("a.png", b"a", "image/png")])
+
+        code, data = asyncio.run(run())
+        assert code == 400
+
+    def test_connection_error_maps_to_503(self):
+        def handler(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        async def run():
+            async with make_api(handler) as api:
+                return await api.get_job("j1")
+
+        code, data = asyncio.run(run())
+        assert code == 503
+        assert "Connection error" in data["error"]
+
+
+class TestAwaitMultipleJobs:
+    """Test polling many jobs from one event loop."""
+
+    def test_jobs_polled_concurrently(self):
+        calls = {}
+
+        def handler(request):
+            job_id = request.url.path.rsplit("/", 1)[-1]
+            calls[job_id] = calls.get(job_id, 0) + 1
+            status = "completed" if calls[job_id] >= 2 else "progress"
+            return httpx.Response(200, json={"jobid": job_id, "status": status})
+
+        async def run():
+            async with make_api(handler) as api:
+                interval = AdaptivePollInterval(base=0.001)
+                return await await_multiple_jobs(api, ["a", "b", "c"], interval=interval)
+
+        results = asyncio.run(run())
+        assert set(results) == {"a", "b", "c"}
+        assert all(r["status"] == "completed" for r in results.values())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,343 @@
+"""
+Unit tests for the background batch engine.
+"""
+
+import time
+import pytest
+
+from midjourney_studio.batch import BatchEngine, BatchStore
+from midjourney_studio.utils.reconciler import JobReconciler
+
+from .conftest import FakeAPI
+
+
+class FakeCache:
+    """MediaCache stub serving fixed bytes."""
+
+    def fetch(self, url):
+        return b"grid"
+
+    def path_for(self, url):
+        return None
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def api():
+    return FakeAPI(channels={"c1": {"maxJobs": 12}}, polls_to_complete=None)
+
+
+@pytest.fixture
+def engine(api):
+    engine = BatchEngine(api, reconciler=JobReconciler(api), max_concurrent=12)
+    yield engine
+    engine.stop()
+
+
+class TestBatchEngine:
+    """Test queueing, controls and follow-ups."""
+
+    def test_submits_in_order(self, engine, api):
+        engine.enqueue(["a", "b", "c"], delay=0)
+
+        assert wait_until(lambda: engine.state == "idle" and len(api.submitted) == 3)
+        snapshot = engine.snapshot()
+        assert api.submitted == ["a", "b", "c"]
+        assert [i["status"] for i in snapshot.items] == ["submitted"] * 3
+        assert [i["jobid"] for i in snapshot.items] == ["job1", "job2", "job3"]
+        assert snapshot.progress == 1.0
+
+    def test_builds_prompts_from_params(self, engine, api):
+        engine.enqueue(["a cat"], params={"ar": "16:9"}, delay=0)
+
+        assert wait_until(lambda: api.submitted)
+        assert "--ar 16:9" in api.submitted[0]
+
+    def test_snapshot_is_a_copy(self, engine):
+        engine.pause()
+        engine.enqueue(["a"], delay=0)
+        engine.snapshot().items[0]["status"] = "mutated"
+
+        assert engine.snapshot().items[0]["status"] == "queued"
+
+    def test_pause_and_resume(self, engine, api):
+        engine.pause()
+        engine.enqueue(["a", "b"], delay=0)
+        time.sleep(0.1)
+        assert api.submitted == []
+        assert engine.state == "paused"
+
+        engine.resume()
+        assert wait_until(lambda: len(api.submitted) == 2)
+
+    def test_cancel_while_waiting_for_capacity(self, engine, api):
+        api.running = {"c1": [{"jobId": f"other{i}", "jobType": "imagine"} for i in range(12)]}
+        engine.enqueue(["a", "b"], delay=0)
+        assert wait_until(lambda: "capacity" in engine.snapshot().message)
+
+        engine.cancel()
+        assert wait_until(lambda: engine.state == "idle")
+        assert api.submitted == []
+        assert [i["status"] for i in engine.snapshot().items] == ["cancelled", "cancelled"]
+
+    def test_delay_is_interrupted_by_cancel(self, engine, api):
+        engine.enqueue(["a", "b"], delay=60)
+        assert wait_until(lambda: len(api.submitted) == 1)
+
+        started = time.time()
+        engine.cancel()
+        assert wait_until(lambda: engine.state == "idle", timeout=2)
+        assert time.time() - started < 2
+        assert api.submitted == ["a"]
+
+    def test_failed_submission(self, engine, api):
+        api.fail_code, api.fail_error = 422, "Invalid prompt"
+        api.fail_prompts = {"bad"}
+        engine.enqueue(["bad", "good"], delay=0)
+
+        assert wait_until(lambda: engine.state == "idle" and len(api.submitted) == 1)
+        items = engine.snapshot().items
+        assert items[0]["status"] == "failed"
+        assert items[0]["error"] == "Invalid prompt"
+        assert items[1]["status"] == "submitted"
+
+    def test_payment_error_stops_submissions(self, engine, api):
+        api.fail_prompts = {"bad"}
+        engine.enqueue(["bad", "good"], delay=0)
+
+        assert wait_until(lambda: "healthy channel" in engine.snapshot().message)
+        assert api.submitted == []
+        assert engine.dispatcher.unavailable()
+
+    def test_completion_reported_through_reconciler(self, api):
+        jobs = []
+        engine = BatchEngine(api, reconciler=JobReconciler(api), max_concurrent=12,
+                             on_job=lambda job_id, data: jobs.append((job_id, data["status"])))
+        engine.enqueue(["a"], delay=0)
+        assert wait_until(lambda: engine.snapshot().items[0]["jobid"])
+
+        engine.reconciler.apply("job1", {"jobid": "job1", "status": "completed"})
+        assert engine.snapshot().items[0]["thread_status"] == "✅ Complete"
+        assert jobs == [("job1", "created"), ("job1", "completed")]
+        engine.stop()
+
+    def test_sessions_read_job_records_by_version(self, engine):
+        engine.enqueue(["a"], delay=0)
+        assert wait_until(lambda: engine.jobs_since(0)[1])
+        version, jobs = engine.jobs_since(0)
+        assert jobs["job1"]["status"] == "created"
+        assert engine.jobs_since(version) == (version, {})
+
+        engine.reconciler.apply("job1", {"jobid": "job1", "status": "completed"})
+        later, jobs = engine.jobs_since(version)
+        assert later > version and jobs == {"job1": {"jobid": "job1", "status": "completed"}}
+        # A second session starting from 0 sees the latest record too
+        assert engine.jobs_since(0)[1]["job1"]["status"] == "completed"
+
+    def test_autopilot_animates_selected_image(self, api):
+        calls = []
+
+        def analyzer(img_bytes, prompt, context, quadrants=None):
+            calls.append((img_bytes, prompt, context))
+            return 2, "best one"
+
+        engine = BatchEngine(api, reconciler=JobReconciler(api), max_concurrent=12,
+                             analyzer=analyzer, media_cache=FakeCache())
+        engine.enqueue(["a"], delay=0, autopilot=True, context="story")
+        assert wait_until(lambda: engine.snapshot().items[0]["jobid"])
+
+        engine.reconciler.apply("job1", {"jobid": "job1", "status": "completed", "response": {
+            "attachments": [{"url": "https://cdn.example.com/grid.png"}]}})
+        assert wait_until(lambda: engine.snapshot().items[0]["anim_jobid"] == "anim-job1")
+        assert calls == [(b"grid", "a", "story")]
+        assert api.buttons == [("job1", "Animate (High motion)")]
+
+        engine.reconciler.apply("anim-job1", {"jobid": "anim-job1", "status": "completed", "response": {
+            "attachments": [{"url": "https://cdn.example.com/anim.mp4"}]}})
+        item = engine.snapshot().items[0]
+        assert item["anim_url"] == "https://cdn.example.com/anim.mp4"
+        assert item["ai_reasoning"] == "best one"
+        engine.stop()
+
+    def test_animation_waits_for_video_slot(self, api):
+        api.get_accounts = lambda: (200, {"channels": {"c1": {"maxJobs": 12, "maxVideoJobs": 1}}})
+        engine = BatchEngine(api, reconciler=JobReconciler(api), media_cache=FakeCache(),
+                             analyzer=lambda *args, **kwargs: (1, "first"))
+        engine.enqueue(["a", "b"], delay=0, autopilot=True)
+        assert wait_until(lambda: len(api.submitted) == 2)
+
+        for job_id in ("job1", "job2"):
+            engine.reconciler.apply(job_id, {"jobid": job_id, "status": "completed", "response": {
+                "attachments": [{"url": f"https://cdn.example.com/{job_id}.png"}]}})
+        assert wait_until(lambda: len(api.buttons) == 1)
+        time.sleep(0.1)
+        assert len(api.buttons) == 1
+        waiting = [i for i in engine.snapshot().items if not i["anim_jobid"]][0]
+        assert "capacity" in waiting["thread_status"]
+
+        anim_id = f"anim-{api.buttons[0][0]}"
+        engine.reconciler.apply(anim_id, {"jobid": anim_id, "status": "completed"})
+        assert wait_until(lambda: len(api.buttons) == 2)
+        engine.stop()
+
+    def test_rate_limited_prompt_is_retried(self, engine, api):
+        responses = [(429, {"error": "Too many requests", "retry_after": 0})]
+        imagine = api.imagine
+        api.imagine = lambda prompt, **kwargs: responses.pop() if responses else imagine(prompt, **kwargs)
+        engine.enqueue(["a", "b"], delay=0)
+
+        assert wait_until(lambda: engine.state == "idle" and len(api.submitted) == 2)
+        items = engine.snapshot().items
+        assert api.submitted == ["a", "b"]
+        assert [i["status"] for i in items] == ["submitted", "submitted"]
+        assert items[0]["rate_limited"] == 1
+
+    def test_moderation_freezes_and_pauses(self, engine, api):
+        responses = [(596, {"error": "CAPTCHA required"})]
+        imagine = api.imagine
+        api.imagine = lambda prompt, **kwargs: responses.pop() if responses else imagine(prompt, **kwargs)
+        engine.enqueue(["a", "b"], delay=0)
+
+        assert wait_until(lambda: engine.state == "paused")
+        assert "frozen" in engine.snapshot().message
+        assert engine.snapshot().items[0]["status"] == "failed"
+        assert api.submitted == []
+
+        engine.resume()
+        assert wait_until(lambda: api.submitted == ["b"])
+
+    def test_wait_for_completion(self, engine, api):
+        engine.enqueue(["a", "b"], delay=0, wait_for_completion=True)
+        assert wait_until(lambda: len(api.submitted) == 1)
+        time.sleep(0.1)
+        assert len(api.submitted) == 1
+
+        engine.reconciler.apply("job1", {"jobid": "job1", "status": "completed"})
+        assert wait_until(lambda: len(api.submitted) == 2)
+
+
+class TestChannelRouting:
+    """Test spreading prompts across channels and pinning animations to the image's channel."""
+
+    @pytest.fixture
+    def api(self):
+        return FakeAPI(channels={"c1": {"maxJobs": 2, "maxVideoJobs": 1},
+                                 "c2": {"maxJobs": 2, "maxVideoJobs": 1}})
+
+    def test_prompts_spread_across_channels(self, api):
+        engine = BatchEngine(api, reconciler=JobReconciler(api))
+        engine.enqueue(["a", "b", "c", "d", "e"], delay=0)
+        assert wait_until(lambda: len(api.submitted) == 4)
+        time.sleep(0.1)
+
+        assert len(api.submitted) == 4
+        assert sorted(api.routed) == ["c1", "c1", "c2", "c2"]
+        engine.stop()
+
+    def test_animation_pinned_to_image_channel(self, api):
+        engine = BatchEngine(api, reconciler=JobReconciler(api), media_cache=FakeCache(),
+                             analyzer=lambda *args, **kwargs: (1, "first"))
+        engine.enqueue(["a"], delay=0, autopilot=True)
+        assert wait_until(lambda: engine.snapshot().items[0]["jobid"])
+
+        engine.reconciler.apply("job1", {"jobid": "job1", "status": "completed", "channel": "c2",
+                                         "response": {"attachments": [{"url": "https://cdn.example.com/a.png"}]}})
+        assert wait_until(lambda: engine.snapshot().items[0]["anim_jobid"] == "anim-job1")
+        assert engine.dispatcher.channel("anim-job1") == "c2"
+        engine.stop()
+
+
+class TestBatchResume:
+    """Test persisting items and resuming them in a new engine."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return BatchStore(tmp_path / "batch.db")
+
+    def test_items_are_persisted(self, api, store):
+        engine = BatchEngine(api, reconciler=JobReconciler(api), max_concurrent=12, store=store)
+        engine.enqueue(["a"], params={"ar": "16:9"}, delay=0)
+        assert wait_until(lambda: store.load()[0].get("jobid") == "job1")
+
+        item = store.load()[0]
+        assert item["stage"] == "imagining"
+        assert item["params"] == {"ar": "16:9"}
+        engine.reconciler.apply("job1", {"jobid": "job1", "status": "completed"})
+        assert store.load()[0]["stage"] == "done"
+        engine.stop()
+
+    def test_queued_items_resume_after_restart(self, api, store):
+        engine = BatchEngine(api, reconciler=JobReconciler(api), max_concurrent=12, store=store)
+        engine.pause()
+        engine.enqueue(["a", "b"], delay=0)
+        engine.stop()
+        assert api.submitted == []
+
+        resumed = BatchEngine(api, reconciler=JobReconciler(api), max_concurrent=12, store=store)
+        assert wait_until(lambda: api.submitted == ["a", "b"])
+        resumed.enqueue(["c"], delay=0)
+        assert wait_until(lambda: len(api.submitted) == 3)
+        assert [i["index"] for i in resumed.snapshot().items] == [1, 2, 3]
+        resumed.stop()
+
+    def test_running_jobs_are_tracked_not_resubmitted(self, api, store):
+        store.save_many([
+            {"index": 1, "prompt": "a", "full_prompt": "a", "status": "submitted", "stage": "imagining",
+             "jobid": "job1", "anim_jobid": None, "options": {"autopilot": False}},
+            {"index": 2, "prompt": "b", "full_prompt": "b", "status": "submitting", "stage": "submitting",
+             "jobid": None, "anim_jobid": None, "options": {"autopilot": False}},
+        ])
+        engine = BatchEngine(api, reconciler=JobReconciler(api), max_concurrent=12, store=store)
+        assert "job1" in engine.reconciler.active_jobs()
+
+        engine.reconciler.apply("job1", {"jobid": "job1", "status": "completed"})
+        items = engine.snapshot().items
+        assert items[0]["thread_status"] == "✅ Complete"
+        assert items[1]["status"] == "failed"
+        assert api.submitted == []
+        assert [i["stage"] for i in store.load()] == ["done", "done"]
+        engine.stop()
+
+    def test_animation_resumes_polling(self, api, store):
+        store.save({"index": 1, "prompt": "a", "full_prompt": "a", "status": "submitted",
+                    "stage": "animating", "jobid": "job1", "anim_jobid": "anim-job1",
+                    "options": {"autopilot": True}})
+        engine = BatchEngine(api, reconciler=JobReconciler(api), max_concurrent=12, store=store)
+
+        engine.reconciler.apply("anim-job1", {"jobid": "anim-job1", "status": "completed", "response": {
+            "attachments": [{"url": "https://cdn.example.com/anim.mp4"}]}})
+        assert engine.snapshot().items[0]["anim_url"] == "https://cdn.example.com/anim.mp4"
+        assert api.buttons == []
+        engine.stop()
+
+    def test_clear_forgets_stored_items(self, api, store):
+        engine = BatchEngine(api, reconciler=JobReconciler(api), max_concurrent=12, store=store)
+        engine.pause()
+        engine.enqueue(["a"], delay=0)
+        engine.clear()
+        assert store.load() == []
+        engine.stop()
+
+    def test_cleared_job_does_not_overwrite_new_item(self, api, store):
+        engine = BatchEngine(api, reconciler=JobReconciler(api), max_concurrent=12, store=store)
+        engine.enqueue(["old"], delay=0)
+        assert wait_until(lambda: engine.snapshot().items[0]["jobid"] == "job1")
+        engine.clear()
+        engine.pause()
+        engine.enqueue(["new"], delay=0)
+
+        engine.reconciler.apply("job1", {"jobid": "job1", "status": "completed"})
+        assert [(i["index"], i["prompt"], i["status"]) for i in store.load()] == [(2, "new", "queued")]
+        engine.stop()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
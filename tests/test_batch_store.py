@@ -0,0 +1,59 @@
+"""
+Unit tests for the SQLite-backed batch queue.
+"""
+
+import pytest
+
+from midjourney_studio.batch import BatchStore
+
+
+def make_item(index, **fields):
+    item = {"index": index, "prompt": f"prompt {index}", "status": "queued", "stage": "queued",
+            "jobid": None, "anim_jobid": None, "options": {"delay": 0}}
+    item.update(fields)
+    return item
+
+
+class TestBatchStore:
+    """Test saving, loading and clearing batch items."""
+
+    def test_roundtrip_in_index_order(self, tmp_path):
+        store = BatchStore(tmp_path / "batch.db")
+        store.save_many([make_item(2), make_item(1)])
+
+        items = store.load()
+        assert [i["index"] for i in items] == [1, 2]
+        assert items[0]["options"] == {"delay": 0}
+
+    def test_save_replaces_item(self, tmp_path):
+        store = BatchStore(tmp_path / "batch.db")
+        store.save(make_item(1))
+        store.save(make_item(1, status="submitted", stage="imagining", jobid="job1"))
+
+        assert store.load() == [make_item(1, status="submitted", stage="imagining", jobid="job1")]
+
+    def test_survives_reopen(self, tmp_path):
+        BatchStore(tmp_path / "batch.db").save(make_item(1))
+        assert BatchStore(tmp_path / "batch.db").load()[0]["prompt"] == "prompt 1"
+
+    def test_accounts_are_separate(self, tmp_path):
+        first = BatchStore(tmp_path / "batch.db", account="a")
+        second = BatchStore(tmp_path / "batch.db", account="b")
+        first.save(make_item(1))
+        second.save(make_item(1, prompt="other"))
+
+        first.clear()
+        assert first.load() == []
+        assert second.load()[0]["prompt"] == "other"
+
+    def test_allocated_indices_survive_clear(self, tmp_path):
+        store = BatchStore(tmp_path / "batch.db")
+        store.save_many([make_item(1), make_item(2)])
+        assert store.allocate(2) == 3
+        store.clear()
+        assert store.allocate(1) == 5
+        assert BatchStore(tmp_path / "batch.db").allocate(1) == 6
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,82 @@
+"""
+Unit tests for the MidjourneyAPI client.
+"""
+
+import pytest
+from unittest.mock import MagicMock
+from midjourney_studio.api.client import (
+    MidjourneyAPI,
+    get_client,
+    close_all_clients,
+    API_BASE_URL
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    close_all_clients()
+    yield
+    close_all_clients()
+
+
+def make_response(status_code=200, data=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = data if data is not None else {}
+    return response
+
+
+class TestPooledSession:
+    """Test that requests go through the client's pooled session."""
+
+    def test_session_pool_size(self):
+        api = MidjourneyAPI("user:1234-abc", pool_size=7)
+        adapter = api.session.get_adapter(API_BASE_URL)
+        assert adapter._pool_maxsize == 7
+
+    def test_request_uses_session(self):
+        session = MagicMock()
+        session.request.return_value = make_response(200, {"jobid": "j1"})
+        api = MidjourneyAPI("user:1234-abc", session=session)
+
+        code, data = api.get_job("j1")
+
+        assert code == 200
+        assert data == {"jobid": "j1"}
+        method, url = session.request.call_args[0]
+        assert method == "GET"
+        assert url == f"{API_BASE_URL}/jobs/j1"
+
+    def test_blend_uses_session(self):
+        session = MagicMock()
+        session.post.return_value = make_response(200, {"jobid": "b1"})
+        api = MidjourneyAPI("user:1234-abc", session=session)
+
+        files = [("a.png", b"a", "image/png"), ("b.png", b"b", "image/png")]
+        code, data = api.blend(files)
+
+        assert code == 200
+        assert session.post.call_count == 1
+
+
+class TestClientRegistry:
+    """Test the process-wide token-keyed client registry."""
+
+    def test_same_token_reuses_client(self):
+        assert get_client("user:1234-abc") is get_client(" user:1234-abc ")
+
+    def test_different_tokens_get_different_clients(self):
+        assert get_client("user:1234-abc") is not get_client("user:5678-def")
+
+    def test_close_all_clients_resets_registry(self):
+        first = get_client("user:1234-abc")
+        close_all_clients()
+        assert get_client("user:1234-abc") is not first
+
+    def test_empty_token_rejected(self):
+        with pytest.raises(ValueError):
+            get_client("  ")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
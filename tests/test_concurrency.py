@@ -0,0 +1,63 @@
+"""
+Unit tests for the AIMD concurrency controller.
+"""
+
+import pytest
+
+from midjourney_studio.batch.concurrency import AIMDController
+
+
+@pytest.fixture
+def aimd(clock):
+    return AIMDController(initial=4, cooldown=10, clock=clock)
+
+
+class TestAIMDController:
+    """Test additive increase, multiplicative decrease and freezing."""
+
+    def test_grows_on_success_up_to_ceiling(self, aimd):
+        assert aimd.limit("c1", ceiling=12) == 4
+        for _ in range(20):
+            aimd.on_success("c1", ceiling=6)
+        assert aimd.limit("c1", ceiling=6) == 6
+        assert aimd.limit("c1", ceiling=12) == 6
+
+    def test_halves_on_rate_limit(self, aimd):
+        for _ in range(4):
+            aimd.on_success("c1", ceiling=12)
+        assert aimd.on_rate_limited("c1")
+        assert aimd.limit("c1", ceiling=12) == 4
+
+    def test_burst_of_429s_decreases_once(self, aimd, clock):
+        assert aimd.on_rate_limited("c1")
+        assert not aimd.on_rate_limited("c1")
+        assert aimd.limit("c1", ceiling=12) == 2
+
+        clock.now += 10
+        assert aimd.on_rate_limited("c1")
+        assert aimd.limit("c1", ceiling=12) == 1
+
+    def test_never_below_minimum(self, aimd, clock):
+        for _ in range(10):
+            aimd.on_rate_limited("c1")
+            clock.now += 10
+        assert aimd.limit("c1", ceiling=12) == 1
+
+    def test_channels_are_independent(self, aimd):
+        aimd.on_rate_limited("c1")
+        assert aimd.limit("c2", ceiling=12) == 4
+
+    def test_freeze_and_thaw(self, aimd):
+        for _ in range(4):
+            aimd.on_success("c1", ceiling=12)
+        aimd.freeze("c1", "596")
+        assert aimd.limit("c1", ceiling=12) == 0
+        assert aimd.frozen() == {"c1": "596"}
+
+        aimd.thaw("c1")
+        assert aimd.frozen() == {}
+        assert aimd.limit("c1", ceiling=12) == 4
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
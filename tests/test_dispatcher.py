@@ -0,0 +1,281 @@
+"""
+Unit tests for the capacity-aware job dispatcher.
+"""
+
+import threading
+
+import pytest
+
+from midjourney_studio.batch.concurrency import AIMDController
+from midjourney_studio.batch.health import ChannelHealth
+from midjourney_studio.batch.dispatcher import (
+    IMAGE, VIDEO, CapacityDispatcher, channel_limits, job_kind, running_jobs_by_channel
+)
+
+from .conftest import FakeAPI
+
+
+def lock_is_free(dispatcher):
+    """True if another thread could take the dispatcher lock right now."""
+    result = []
+
+    def check():
+        acquired = dispatcher._lock.acquire(blocking=False)
+        if acquired:
+            dispatcher._lock.release()
+        result.append(acquired)
+    thread = threading.Thread(target=check)
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+@pytest.fixture
+def api():
+    return FakeAPI()
+
+
+@pytest.fixture
+def dispatcher(api):
+    return CapacityDispatcher(api, refresh_interval=0)
+
+
+class TestParsing:
+    """Test account and running-jobs payload parsing."""
+
+    def test_job_kind(self):
+        assert job_kind({"jobType": "video"}) == VIDEO
+        assert job_kind({"verb": "animate"}) == VIDEO
+        assert job_kind({"button": "Animate (High motion)"}) == VIDEO
+        assert job_kind({"jobType": "imagine"}) == IMAGE
+        assert job_kind({}) == IMAGE
+
+    def test_channel_limits_v3_and_v2(self):
+        assert channel_limits({"channels": {"c1": {"maxJobs": 6}}}) == {
+            "c1": {"maxJobs": 6, "maxImageJobs": 12, "maxVideoJobs": 3}}
+        assert channel_limits({"c2": {"channel": "c2", "maxJobs": 3, "maxVideoJobs": 1}}) == {
+            "c2": {"maxJobs": 3, "maxImageJobs": 12, "maxVideoJobs": 1}}
+        assert channel_limits(None) == {}
+
+    def test_running_jobs_v3(self):
+        payload = {"total": 3, "channels": {"c1": {"total": 3, "jobs": [
+            {"jobId": "a", "jobType": "imagine"}, {"jobId": "b", "jobType": "video"}]}}}
+        running, unlisted = running_jobs_by_channel(payload)
+        assert running == {"a": ("c1", IMAGE), "b": ("c1", VIDEO)}
+        assert unlisted == {"c1": 1}
+
+    def test_running_jobs_totals_only(self):
+        assert running_jobs_by_channel({"total": 2}) == ({}, {"": 2})
+        assert running_jobs_by_channel("nonsense") is None
+
+
+class TestCapacityDispatcher:
+    """Test slot admission, binding and release."""
+
+    def test_admits_up_to_class_limit(self, dispatcher):
+        tickets = [dispatcher.acquire(IMAGE) for _ in range(3)]
+        assert all(tickets)
+        assert dispatcher.acquire(IMAGE) is None
+        # The video class still has room within maxJobs
+        assert dispatcher.acquire(VIDEO) is not None
+        assert dispatcher.acquire(VIDEO) is None
+
+    def test_total_limit_caps_both_classes(self, api):
+        api.channels = {"c1": {"maxJobs": 2, "maxImageJobs": 12, "maxVideoJobs": 3}}
+        dispatcher = CapacityDispatcher(api, refresh_interval=0)
+        assert dispatcher.acquire(IMAGE) and dispatcher.acquire(IMAGE)
+        assert dispatcher.acquire(VIDEO) is None
+
+    def test_counts_server_running_jobs(self, api, dispatcher):
+        api.running = {"c1": [{"jobId": "v1", "jobType": "video"}]}
+        assert dispatcher.acquire(VIDEO) is None
+        assert dispatcher.acquire(IMAGE) is not None
+
+    def test_bound_job_is_not_double_counted(self, api, dispatcher):
+        ticket = dispatcher.acquire(IMAGE)
+        dispatcher.bind(ticket, "job1")
+        api.running = {"c1": [{"jobId": "job1", "jobType": "imagine"}]}
+
+        assert dispatcher.acquire(IMAGE) is not None
+        assert dispatcher.usage()[IMAGE] == (2, 3)
+
+    def test_release_frees_slot(self, dispatcher):
+        tickets = [dispatcher.acquire(IMAGE) for _ in range(3)]
+        dispatcher.bind(tickets[0], "job1")
+        assert dispatcher.acquire(IMAGE) is None
+
+        dispatcher.release("job1")
+        assert dispatcher.acquire(IMAGE) is not None
+
+    def test_job_leaving_running_set_frees_slot(self, api, dispatcher):
+        ticket = dispatcher.acquire(VIDEO)
+        dispatcher.bind(ticket, "anim1")
+        api.running = {"c1": [{"jobId": "anim1", "jobType": "video"}]}
+        assert dispatcher.acquire(VIDEO) is None
+
+        api.running = {}
+        assert dispatcher.acquire(VIDEO) is not None
+
+    def test_picks_channel_with_most_room(self, api):
+        api.channels = {"c1": {"maxJobs": 2}, "c2": {"maxJobs": 5}}
+        api.running = {"c2": [{"jobId": "x", "jobType": "imagine"}]}
+        dispatcher = CapacityDispatcher(api, refresh_interval=0)
+        for _ in range(6):
+            assert dispatcher.acquire(IMAGE) is not None
+        assert dispatcher.acquire(IMAGE) is None
+        assert dispatcher.usage()["jobs"] == (7, 7)
+
+    def test_max_jobs_override(self, api):
+        dispatcher = CapacityDispatcher(api, max_jobs=1, refresh_interval=0)
+        assert dispatcher.acquire(IMAGE) is not None
+        assert dispatcher.acquire(IMAGE) is None
+
+    def test_requests_run_outside_lock(self, api, dispatcher):
+        lock_free = []
+        list_running_jobs, get_accounts = api.list_running_jobs, api.get_accounts
+        api.get_accounts = lambda: (lock_free.append(lock_is_free(dispatcher)), get_accounts())[1]
+        api.list_running_jobs = lambda: (lock_free.append(lock_is_free(dispatcher)), list_running_jobs())[1]
+
+        assert dispatcher.acquire(IMAGE) is not None
+        dispatcher.usage()
+        assert lock_free and all(lock_free)
+
+    def test_release_during_refresh_is_kept(self, api, dispatcher):
+        ticket = dispatcher.acquire(IMAGE)
+        dispatcher.bind(ticket, "job1")
+        api.running = {"c1": [{"jobId": "job1", "jobType": "imagine"}]}
+        list_running_jobs = api.list_running_jobs
+
+        def finish_while_listing():
+            response = list_running_jobs()
+            dispatcher.release("job1")
+            return response
+
+        api.list_running_jobs = finish_while_listing
+        dispatcher.refresh(force=True)
+        assert dispatcher.usage()[IMAGE] == (0, 3)
+
+    def test_snapshot_reused_within_refresh_interval(self, api):
+        dispatcher = CapacityDispatcher(api, refresh_interval=60)
+        dispatcher.acquire(IMAGE)
+        dispatcher.acquire(IMAGE)
+        assert api.list_calls == 1
+
+
+class TestAdaptiveDispatch:
+    """Test submission results feeding the AIMD controller."""
+
+    @pytest.fixture
+    def dispatcher(self, api):
+        api.channels = {"c1": {"maxJobs": 12}, "c2": {"maxJobs": 12}}
+        return CapacityDispatcher(api, refresh_interval=0, controller=AIMDController(initial=2))
+
+    def test_success_widens_window(self, dispatcher):
+        ticket = dispatcher.acquire(IMAGE)
+        channel = dispatcher._admitted[ticket]["channel"]
+        dispatcher.report(ticket, 201, {"jobid": "j1"})
+        assert dispatcher.window(channel) == 3
+
+    def test_429_narrows_window(self, dispatcher):
+        ticket = dispatcher.acquire(IMAGE)
+        channel = dispatcher._admitted[ticket]["channel"]
+        dispatcher.report(ticket, 429, {"error": "busy"})
+        assert dispatcher.window(channel) == 1
+
+    def test_596_freezes_named_channel(self, dispatcher):
+        ticket = dispatcher.acquire(IMAGE)
+        dispatcher.report(ticket, 596, {"error": "CAPTCHA", "channel": "c2"})
+        dispatcher.release(ticket)
+        assert set(dispatcher.frozen()) == {"c2"}
+        assert not dispatcher.all_frozen()
+
+        tickets = [dispatcher.acquire(IMAGE) for _ in range(3)]
+        assert all(tickets[:2]) and tickets[2] is None
+        assert {dispatcher._admitted[t]["channel"] for t in tickets[:2]} == {"c1"}
+
+        dispatcher.thaw()
+        assert dispatcher.acquire(IMAGE) is not None
+
+
+class TestHealthAwareDispatch:
+    """Test that open circuits and low health steer work away from a channel."""
+
+    @pytest.fixture
+    def dispatcher(self, api):
+        api.channels = {"c1": {"maxJobs": 12}, "c2": {"maxJobs": 12}}
+        return CapacityDispatcher(api, refresh_interval=0, health=ChannelHealth(api))
+
+    def test_open_circuit_gets_no_work(self, dispatcher):
+        dispatcher.health.record("c1", 502)
+        dispatcher.health.record("c1", 502)
+        tickets = [dispatcher.acquire(IMAGE) for _ in range(3)]
+        assert {dispatcher._admitted[t]["channel"] for t in tickets} == {"c2"}
+        assert "c1" in dispatcher.unavailable()
+
+    def test_prefers_healthier_channel(self, dispatcher):
+        dispatcher.health.record("c1", 201, latency=30.0)
+        dispatcher.health.record("c2", 201, latency=1.0)
+        ticket = dispatcher.acquire(IMAGE)
+        assert dispatcher._admitted[ticket]["channel"] == "c2"
+
+    def test_probe_runs_outside_dispatcher_lock(self, api):
+        api.channels = {"c1": {"maxJobs": 12}}
+        dispatcher = CapacityDispatcher(api, refresh_interval=0, health=ChannelHealth(api, open_timeout=0))
+        lock_free = []
+
+        def get_account_channel(channel):
+            lock_free.append(lock_is_free(dispatcher))
+            return 200, {"channel": channel}
+
+        api.get_account_channel = get_account_channel
+        dispatcher.health.record("c1", 596)
+        assert dispatcher.acquire(IMAGE) is not None
+        assert lock_free == [True]
+
+    def test_report_feeds_breaker(self, dispatcher):
+        ticket = dispatcher.acquire(IMAGE)
+        channel = dispatcher._admitted[ticket]["channel"]
+        dispatcher.report(ticket, 596, {"error": "CAPTCHA"})
+        assert dispatcher.health.state(channel) == "open"
+
+
+class TestChannelPinning:
+    """Test admission restricted to one channel and channel lookup."""
+
+    @pytest.fixture
+    def dispatcher(self, api):
+        api.channels = {"c1": {"maxJobs": 4, "maxVideoJobs": 1}, "c2": {"maxJobs": 4, "maxVideoJobs": 1}}
+        return CapacityDispatcher(api, refresh_interval=0)
+
+    def test_pinned_acquire_uses_only_that_channel(self, dispatcher):
+        ticket = dispatcher.acquire(VIDEO, channel="c2")
+        assert dispatcher.channel(ticket) == "c2"
+        assert dispatcher.acquire(VIDEO, channel="c2") is None
+        assert dispatcher.channel(dispatcher.acquire(VIDEO)) == "c1"
+
+    def test_unknown_pinned_channel_is_not_remapped(self, dispatcher):
+        assert dispatcher.acquire(IMAGE, channel="gone") is None
+        assert dispatcher.usage()["jobs"][0] == 0
+
+    def test_pinned_channel_without_channel_limits(self, api):
+        api.get_accounts = lambda: (500, {"error": "down"})
+        dispatcher = CapacityDispatcher(api, refresh_interval=0)
+        assert dispatcher.acquire(IMAGE, channel="c1") is not None
+
+    def test_pick_does_not_reserve(self, api, dispatcher):
+        api.running = {"c1": [{"jobId": "x", "jobType": "imagine"}]}
+        assert dispatcher.pick(IMAGE) == "c2"
+        assert dispatcher.usage()["jobs"][0] == 1
+
+    def test_channel_of_bound_and_running_jobs(self, api, dispatcher):
+        ticket = dispatcher.acquire(IMAGE, channel="c1")
+        dispatcher.bind(ticket, "job1")
+        api.running = {"c2": [{"jobId": "job2", "jobType": "imagine"}]}
+        dispatcher.refresh(force=True)
+        assert dispatcher.channel("job1") == "c1"
+        assert dispatcher.channel("job2") == "c2"
+        assert dispatcher.channel("unknown") is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,93 @@
+"""
+Unit tests for the bounded-concurrency downloader.
+"""
+
+import time
+import threading
+import pytest
+
+from midjourney_studio.api.error_handler import RetryConfig
+from midjourney_studio.utils.downloader import Downloader
+
+
+class FakeCache:
+    """MediaCache stub tracking concurrency per host."""
+
+    def __init__(self, delay=0.02, fail_first=0):
+        self.delay = delay
+        self.fail_first = fail_first
+        self.lock = threading.Lock()
+        self.active = {}
+        self.peak = {}
+        self.peak_total = 0
+        self.calls = 0
+
+    def get(self, url):
+        return None
+
+    def fetch(self, url):
+        host = url.split("/")[2]
+        with self.lock:
+            self.calls += 1
+            if self.fail_first:
+                self.fail_first -= 1
+                return b""
+            self.active[host] = self.active.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+            self.peak_total = max(self.peak_total, sum(self.active.values()))
+        time.sleep(self.delay)
+        with self.lock:
+            self.active[host] -= 1
+        return url.encode()
+
+
+FAST_RETRY = RetryConfig(max_attempts=3, base_delay=0.001, max_delay=0.001)
+
+
+class TestDownloader:
+    """Test concurrency limits, ordering, retries and progress."""
+
+    def test_results_in_input_order(self):
+        urls = [f"https://h{i % 3}/img{i}.png" for i in range(12)]
+        results = Downloader(FakeCache(), workers=6, retry_config=FAST_RETRY).download_all(urls)
+
+        assert [r.url for r in results] == urls
+        assert all(r.data == url.encode() for r, url in zip(results, urls))
+
+    def test_worker_and_per_host_limits(self):
+        cache = FakeCache()
+        urls = [f"https://a/{i}" for i in range(10)] + [f"https://b/{i}" for i in range(10)]
+        Downloader(cache, workers=5, per_host=2, retry_config=FAST_RETRY).download_all(urls)
+
+        assert cache.peak_total <= 5
+        assert max(cache.peak.values()) <= 2
+
+    def test_failed_download_retried(self):
+        cache = FakeCache(fail_first=2)
+        results = Downloader(cache, workers=1, retry_config=FAST_RETRY).download_all(["https://a/x"])
+
+        assert results[0].ok
+        assert cache.calls == 3
+
+    def test_exhausted_retries_reported(self):
+        cache = FakeCache(fail_first=10)
+        results = Downloader(cache, workers=1, retry_config=FAST_RETRY).download_all(["https://a/x"])
+
+        assert not results[0].ok
+        assert results[0].error
+
+    def test_progress_reported_from_caller_thread(self):
+        seen = []
+        caller = threading.current_thread()
+
+        def on_progress(done, total, result):
+            seen.append((done, total, threading.current_thread() is caller))
+
+        urls = [f"https://a/{i}" for i in range(4)]
+        Downloader(FakeCache(), retry_config=FAST_RETRY).download_all(urls, on_progress)
+
+        assert seen == [(1, 4, True), (2, 4, True), (3, 4, True), (4, 4, True)]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
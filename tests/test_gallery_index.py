@@ -0,0 +1,162 @@
+"""
+Unit tests for the incremental gallery index.
+"""
+
+import pytest
+from midjourney_studio.utils.job_store import JobHistory
+from midjourney_studio.utils.gallery_index import GalleryIndex, page_spans
+
+
+def make_job(job_id, prompt="a cat", status="completed", filenames=("grid_0.png",), verb="imagine"):
+    return {
+        "jobid": job_id,
+        "status": status,
+        "verb": verb,
+        "created": "2025-01-01T00:00:00Z",
+        "request": {"prompt": prompt},
+        "response": {"attachments": [
+            {"url": f"https://cdn.example.com/{job_id}/{name}", "filename": name} for name in filenames
+        ]},
+    }
+
+
+@pytest.fixture
+def history():
+    return JobHistory([
+        make_job("up", prompt="A Dog --ar 16:9", filenames=("dog_upscale.png",)),
+        make_job("grid", prompt="a cat"),
+        make_job("vid", prompt="waves", filenames=("waves.mp4",), verb="video"),
+    ])
+
+
+class TestGalleryIndex:
+    """Test item records, filters and incremental updates."""
+
+    def test_precomputed_fields(self, history):
+        items = {item["id"]: item for item in GalleryIndex(history).items()}
+
+        assert items["grid"]["type"] == "grid" and items["grid"]["is_grid"]
+        assert items["up"]["type"] == "upscale" and items["up"]["prompt_lower"] == "a dog --ar 16:9"
+        assert items["vid"]["type"] == "video" and items["vid"]["is_video"]
+
+    def test_filters_and_search(self, history):
+        index = GalleryIndex(history)
+
+        assert [i["id"] for i in index.query("All")] == ["up", "grid", "vid"]
+        assert [i["id"] for i in index.query("Grids")] == ["grid"]
+        assert [i["id"] for i in index.query("Upscales")] == ["up", "vid"]
+        assert [i["id"] for i in index.query("Videos")] == ["vid"]
+        assert [i["id"] for i in index.query("All", "DOG")] == ["up"]
+
+    def test_queries_are_memoized_until_change(self, history):
+        index = GalleryIndex(history)
+        first = index.query("Grids")
+        assert index.query("Grids") is first
+
+        history.insert(0, make_job("new"))
+        second = index.query("Grids")
+        assert second is not first
+        assert [i["id"] for i in second] == ["new", "grid"]
+
+    def test_follows_history_changes(self, history):
+        index = GalleryIndex(history)
+
+        history.replace(make_job("grid", status="progress", filenames=()))
+        pending = [i for i in index.items() if i["id"] == "grid"]
+        assert pending[0]["type"] == "pending"
+
+        history.clear()
+        assert index.items() == []
+
+    def test_is_for(self, history):
+        index = GalleryIndex(history)
+        assert index.is_for(history)
+        assert not index.is_for(JobHistory(list(history)))
+
+    def test_close_stops_following(self, history):
+        index = GalleryIndex(history)
+        index.close()
+        version = index.version
+        history.insert(0, make_job("new"))
+        assert index.version == version
+
+    def test_batch_items(self, history):
+        index = GalleryIndex(history)
+        batch = [{"jobid": "b1", "prompt": "Batch Cat", "submitted_at": "t",
+                  "anim_url": "https://cdn.example.com/b1.mp4", "anim_jobid": "a1"}]
+        active = {"b1": make_job("b1", prompt="batch cat")}
+
+        index.sync_batch(batch, active)
+        version = index.version
+        index.sync_batch(batch, active)
+        assert index.version == version
+
+        ids = [i["id"] for i in index.query("All", "batch")]
+        assert ids == ["b1", "a1"]
+        assert [i["id"] for i in index.query("Videos", "batch")] == ["a1"]
+
+        index.sync_batch([], active)
+        assert index.query("All", "batch") == []
+
+    def test_searcher_ranks_history_items(self, history):
+        class Searcher:
+            version = 0
+
+            def search_ids(self, text):
+                return ["grid", "up"] if text == "animal" else []
+
+            def known_ids(self, ids):
+                return set(ids)
+
+        searcher = Searcher()
+        index = GalleryIndex(history, searcher=searcher)
+        index.sync_batch([{"jobid": "b1", "prompt": "animal batch"}], {})
+
+        assert [i["id"] for i in index.query("All", "Animal")] == ["grid", "up"]
+        first = index.query("All", "animal")
+        searcher.version += 1
+        assert index.query("All", "animal") is not first
+
+    def test_searcher_falls_back_for_unknown_history(self, history):
+        class Searcher:
+            version = 0
+
+            def search_ids(self, text):
+                return ["grid"]
+
+            def known_ids(self, ids):
+                return {"grid"}
+
+        index = GalleryIndex(history, searcher=Searcher())
+        history.insert(0, make_job("new", prompt="new cat"))  # not flushed to the store yet
+        history.insert(0, make_job(None, prompt="cat without an id"))
+
+        assert [i["prompt"] for i in index.query("All", "cat")] == ["a cat", "cat without an id", "new cat"]
+        assert [i["id"] for i in index.query("All", "--")] == ["up"]
+
+    def test_duplicate_urls_are_shown_once(self, history):
+        index = GalleryIndex(history)
+        index.sync_batch([{"jobid": "grid", "prompt": "a cat"}], {"grid": make_job("grid")})
+
+        assert [i["id"] for i in index.query("Grids")] == ["grid"]
+
+
+class TestPagination:
+    """Test the load-more window and page splitting."""
+
+    def test_window(self):
+        history = JobHistory([make_job(f"j{i}") for i in range(10)])
+        index = GalleryIndex(history)
+
+        items, total = index.window("All", "", limit=4)
+        assert total == 10
+        assert [i["id"] for i in items] == ["j0", "j1", "j2", "j3"]
+        assert len(index.window("All", "", limit=40)[0]) == 10
+
+    def test_page_spans(self):
+        assert page_spans(10, 4) == [(0, 4), (4, 8), (8, 10)]
+        assert page_spans(0, 4) == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,84 @@
+"""
+Unit tests for per-channel circuit breakers and health scores.
+"""
+
+import pytest
+
+from midjourney_studio.batch.health import CLOSED, OPEN, ChannelHealth
+
+from .conftest import FakeAPI
+
+
+@pytest.fixture
+def api():
+    return FakeAPI()
+
+
+@pytest.fixture
+def health(api, clock):
+    return ChannelHealth(api, clock=clock, open_timeout=30, max_open_timeout=120)
+
+
+class TestChannelHealth:
+    """Test breaker transitions, probes and scoring."""
+
+    def test_opens_after_two_failures(self, health):
+        health.record("c1", 502)
+        assert health.available("c1")
+        health.record("c1", 504)
+        assert health.state("c1") == OPEN
+        assert not health.available("c1")
+        assert health.score("c1") == 0
+
+    def test_success_resets_failure_count(self, health):
+        health.record("c1", 502)
+        health.record("c1", 200)
+        health.record("c1", 502)
+        assert health.state("c1") == CLOSED
+
+    def test_fatal_codes_open_at_once(self, health):
+        health.record("c1", 596, response={"error": "CAPTCHA"})
+        assert health.state("c1") == OPEN
+        assert health.snapshot()["c1"]["error"] == "CAPTCHA"
+
+    def test_client_errors_and_429_do_not_trip(self, health):
+        for code in (400, 422, 429, 429, 429):
+            health.record("c1", code)
+        assert health.state("c1") == CLOSED
+
+    def test_probe_closes_after_cool_off(self, health, api, clock):
+        health.record("c1", 596)
+        clock.now += 29
+        assert not health.available("c1")
+        assert api.probes == []
+
+        clock.now += 1
+        assert health.available("c1")
+        assert api.probes == ["c1"]
+        assert health.state("c1") == CLOSED
+
+    def test_failed_probe_doubles_timeout(self, health, api, clock):
+        api.channel_error = "CAPTCHA required"
+        health.record("c1", 596)
+        clock.now += 30
+        assert not health.available("c1")
+        clock.now += 30
+        assert not health.available("c1")
+        assert len(api.probes) == 1
+        clock.now += 30
+        assert not health.available("c1")
+        assert len(api.probes) == 2
+
+    def test_probe_now(self, health, api):
+        health.record("c1", 596)
+        health.probe_now()
+        assert health.available("c1")
+
+    def test_slow_channel_scores_lower(self, health):
+        health.record("fast", 201, latency=1.0)
+        health.record("slow", 201, latency=20.0)
+        assert health.score("fast") > health.score("slow") > 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,204 @@
+"""
+Unit tests for the SQLite job store and list-like history.
+"""
+
+import json
+import sqlite3
+import pytest
+from midjourney_studio.utils.job_store import JobStore, JobHistory, fts_query
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(tmp_path / "jobs.db")
+    yield store
+    store.close()
+
+
+def make_job(job_id, status="completed", verb="imagine", created="2025-01-01T00:00:00Z"):
+    return {"jobid": job_id, "status": status, "verb": verb, "created": created}
+
+
+class TestJobStore:
+    """Test persistence, upserts and paginated queries."""
+
+    def test_wal_mode(self, store):
+        mode = store._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_upsert_keeps_position(self, store):
+        store.upsert(make_job("a", status="started"))
+        store.upsert(make_job("b"))
+        store.upsert(make_job("a"))
+
+        assert [j["jobid"] for j in store.all()] == ["b", "a"]
+        assert store.get("a")["status"] == "completed"
+
+    def test_filtered_pagination(self, store):
+        store.upsert_many([make_job(f"j{i}", verb="video" if i % 2 else "imagine") for i in range(10)])
+
+        assert store.count() == 10
+        assert store.count(verb="video") == 5
+        page = store.query(verb="imagine", limit=2, offset=1)
+        assert [j["jobid"] for j in page] == ["j6", "j4"]
+
+    def test_query_any_of_several_statuses(self, store):
+        store.upsert_many([make_job("a", status="started"), make_job("b", status="completed"),
+                           make_job("c", status="progress")])
+
+        assert [j["jobid"] for j in store.query(status=("started", "progress"), limit=None)] == ["c", "a"]
+        assert store.count(status=["completed"]) == 1
+
+    def test_known_ids(self, store):
+        store.upsert_many([make_job("a"), make_job("b")])
+        assert store.known_ids(["a", "x", None, "b"]) == {"a", "b"}
+
+    def test_jobs_without_id_are_kept(self, store):
+        store.upsert({"status": "failed"})
+        store.upsert({"status": "failed"})
+        assert store.count(status="failed") == 2
+
+    def test_replace_all(self, store):
+        store.upsert(make_job("a"))
+        store.replace_all([make_job("b"), make_job("c")])
+        assert [j["jobid"] for j in store.all()] == ["c", "b"]
+
+    def test_reopen_persists(self, tmp_path):
+        path = tmp_path / "jobs.db"
+        first = JobStore(path)
+        first.upsert(make_job("a"))
+        first.close()
+        assert JobStore(path).get("a") is not None
+
+
+def prompt_job(job_id, prompt, **kwargs):
+    job = make_job(job_id, **kwargs)
+    job["request"] = {"prompt": prompt}
+    return job
+
+
+class TestPromptSearch:
+    """Test the FTS5 prompt index and its LIKE fallback."""
+
+    @pytest.fixture
+    def prompts(self, store):
+        store.upsert_many([
+            prompt_job("a", "a cat in the rain --ar 16:9 --v 6.1"),
+            prompt_job("b", "cats and dogs --ar 2:3 --sref 123"),
+            prompt_job("c", "portrait of a dog, cinematic --ar 16:9"),
+            prompt_job("d", "cat cat cat", verb="video"),
+        ])
+        return store
+
+    def test_fts_enabled(self, store):
+        assert store.fts
+
+    def test_word_and_prefix(self, prompts):
+        assert set(prompts.search_ids("cat")) == {"a", "b", "d"}
+        assert prompts.search_ids("cat")[0] == "d"  # BM25: most occurrences first
+        assert set(prompts.search_ids("do")) == {"b", "c"}
+
+    def test_parameters(self, prompts):
+        assert set(prompts.search_ids("--ar 16:9")) == {"a", "c"}
+        assert prompts.search_ids("--sref") == ["b"]
+        assert prompts.search_ids("--v 6.1") == ["a"]
+
+    def test_phrase_and_filters(self, prompts):
+        assert prompts.search_ids('"cat in the"') == ["a"]
+        assert [j["jobid"] for j in prompts.search("cat", verb="video")] == ["d"]
+        assert prompts.search_ids("") == []
+        assert prompts.search_ids('" , "') == []
+
+    def test_index_follows_updates_and_deletes(self, prompts):
+        version = prompts.version
+        prompts.upsert(prompt_job("a", "a bird"))
+        prompts.delete("c")
+
+        assert prompts.version > version
+        assert set(prompts.search_ids("--ar")) == {"b"}
+        assert prompts.search_ids("bird") == ["a"]
+
+        prompts.clear()
+        assert prompts.search_ids("cat") == []
+
+    def test_like_fallback(self, prompts):
+        prompts.fts = False
+        assert prompts.search_ids("--ar 16:9") == ["c", "a"]
+        assert prompts.search_ids("100%") == []
+
+    def test_fts_query_syntax(self):
+        assert fts_query('cat "red hat" --ar') == '"cat"* "red hat" "--ar"*'
+
+    def test_migrates_database_without_prompt_column(self, tmp_path):
+        path = tmp_path / "old.db"
+        conn = sqlite3.connect(str(path))
+        conn.execute("CREATE TABLE jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, jobid TEXT UNIQUE, "
+                     "status TEXT, verb TEXT, job_type TEXT, created TEXT, updated TEXT, data TEXT NOT NULL)")
+        conn.execute("INSERT INTO jobs (jobid, data) VALUES (?, ?)",
+                     ("old", json.dumps(prompt_job("old", "legacy lighthouse"))))
+        conn.commit()
+        conn.close()
+
+        store = JobStore(path)
+        assert store.search_ids("lighthouse") == ["old"]
+        store.close()
+
+
+class TestJobHistory:
+    """Test the list-compatible history adapter."""
+
+    def test_list_semantics(self):
+        history = JobHistory([make_job("b"), make_job("a")])
+        history.insert(0, make_job("c"))
+
+        assert len(history) == 3
+        assert [j["jobid"] for j in history] == ["c", "b", "a"]
+        assert history[0]["jobid"] == "c"
+        assert history[-1]["jobid"] == "a"
+        assert [j["jobid"] for j in history[:2]] == ["c", "b"]
+        assert [j["jobid"] for j in history[1:]] == ["b", "a"]
+
+    def test_lookup_and_replace_by_jobid(self):
+        history = JobHistory([make_job("a", status="started")])
+
+        assert "a" in history
+        assert make_job("a") in history
+        assert history.replace(make_job("a"))
+        assert history.get("a")["status"] == "completed"
+        assert not history.replace(make_job("zzz"))
+
+    def test_setitem_and_middle_insert(self):
+        history = JobHistory([make_job("c"), make_job("a")])
+        history.insert(1, make_job("b"))
+        history[0] = make_job("d")
+
+        assert [j["jobid"] for j in history] == ["d", "b", "a"]
+        assert history.get("d") is history[0]
+        assert history.get("c") is None
+
+    def test_latest_and_clear(self):
+        history = JobHistory([make_job("v", verb="video"), make_job("i")])
+        assert history.latest(verb="imagine")["jobid"] == "i"
+
+        history.clear()
+        assert not history
+        assert history.latest(verb="imagine") is None
+
+    def test_listeners(self):
+        history = JobHistory([make_job("a")])
+        events = []
+        unsubscribe = history.subscribe(lambda event, job: events.append((event, job and job["jobid"])))
+
+        history.insert(0, make_job("b"))
+        history.replace(make_job("a", status="failed"))
+        history[0] = make_job("c")
+        history.clear()
+        unsubscribe()
+        history.insert(0, make_job("d"))
+
+        assert events == [("upsert", "b"), ("upsert", "a"), ("remove", "b"),
+                          ("upsert", "c"), ("clear", None)]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
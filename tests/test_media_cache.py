@@ -0,0 +1,158 @@
+"""
+Unit tests for the content-addressed media cache.
+"""
+
+import time
+import threading
+import pytest
+from unittest.mock import MagicMock
+
+from midjourney_studio.utils.media_cache import MediaCache, cache_key
+
+
+class FakeSession:
+    """requests.Session stub returning per-URL content after an optional delay."""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get(self, url, timeout=None):
+        with self.lock:
+            self.calls.append(url)
+        time.sleep(self.delay)
+        response = MagicMock()
+        if self.fail:
+            response.raise_for_status.side_effect = Exception("404")
+        response.content = f"data:{url.split('?')[0]}".encode()
+        response.headers = {"Content-Type": "image/png"}
+        return response
+
+    def close(self):
+        pass
+
+
+def make_cache(tmp_path, **kwargs):
+    session = kwargs.pop("session", None) or FakeSession()
+    return MediaCache(tmp_path / "cache", session=session, **kwargs), session
+
+
+class TestCacheKey:
+    """Test URL normalization."""
+
+    def test_discord_signature_params_ignored(self):
+        a = "https://cdn.discordapp.com/a/grid.png?ex=1&is=2&hm=3"
+        b = "https://cdn.discordapp.com/a/grid.png?ex=9&is=8&hm=7"
+        assert cache_key(a) == cache_key(b)
+
+    def test_other_params_kept(self):
+        assert cache_key("https://x/a.png?size=1") != cache_key("https://x/a.png?size=2")
+
+
+class TestMediaCache:
+    """Test fills, hits, single-flight and eviction."""
+
+    def test_second_fetch_is_a_hit(self, tmp_path):
+        cache, session = make_cache(tmp_path)
+        first = cache.fetch("https://x/a.png")
+        second = cache.fetch("https://x/a.png")
+
+        assert first == second == b"data:https://x/a.png"
+        assert len(session.calls) == 1
+        assert cache.path_for("https://x/a.png").read_bytes() == first
+
+    def test_survives_restart(self, tmp_path):
+        cache, _ = make_cache(tmp_path)
+        cache.fetch("https://x/a.png")
+        cache.close()
+
+        reopened, session = make_cache(tmp_path)
+        assert reopened.fetch("https://x/a.png") == b"data:https://x/a.png"
+        assert session.calls == []
+
+    def test_concurrent_fetches_download_once(self, tmp_path):
+        cache, session = make_cache(tmp_path, session=FakeSession(delay=0.1))
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.fetch("https://x/a.png")))
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(session.calls) == 1
+        assert results == [b"data:https://x/a.png"] * 8
+
+    def test_leader_rechecks_cache_before_downloading(self, tmp_path):
+        cache, session = make_cache(tmp_path)
+        cache.put("https://x/a.png", b"stored")
+        get, lookups = cache.get, []
+
+        def racing_get(url):
+            # Miss as if the previous leader's put() landed just after this lookup
+            lookups.append(url)
+            return None if len(lookups) == 1 else get(url)
+
+        cache.get = racing_get
+
+        assert cache.fetch("https://x/a.png") == b"stored"
+        assert session.calls == []
+
+    def test_identical_content_stored_once(self, tmp_path):
+        cache, _ = make_cache(tmp_path)
+        cache.put("https://x/a.png", b"same")
+        cache.put("https://y/b.png", b"same")
+
+        assert cache.path_for("https://x/a.png") == cache.path_for("https://y/b.png")
+        assert cache.total_bytes() == 4
+
+    def test_lru_eviction(self, tmp_path):
+        cache, _ = make_cache(tmp_path, max_bytes=10)
+        cache.put("https://x/a", b"aaaa")
+        time.sleep(0.01)
+        cache.put("https://x/b", b"bbbb")
+        time.sleep(0.01)
+        cache.get("https://x/a")  # a is now more recent than b
+        time.sleep(0.01)
+        cache.put("https://x/c", b"cccc")
+
+        assert "https://x/a" in cache
+        assert "https://x/b" not in cache
+        assert "https://x/c" in cache
+        assert cache.total_bytes() <= 10
+
+    def test_hits_do_not_write_per_lookup(self, tmp_path):
+        cache, _ = make_cache(tmp_path)
+        cache.put("https://x/a", b"aaaa")
+        sha = cache.path_for("https://x/a").name
+        written = cache._conn.total_changes
+
+        for _ in range(20):
+            assert cache.get("https://x/a") == b"aaaa"
+        assert cache._conn.total_changes == written
+
+        cache.flush_touches()
+        assert cache._conn.total_changes == written + 1
+        assert sha not in cache._touched
+
+    def test_derived_files_evicted_with_blob(self, tmp_path):
+        cache, _ = make_cache(tmp_path, max_bytes=6)
+        sha = cache.put("https://x/a", b"aaaa").name
+        derived = cache.derived_path(sha, "w384.webp")
+        derived.parent.mkdir(parents=True)
+        derived.write_bytes(b"thumb")
+        time.sleep(0.01)
+        cache.put("https://x/b", b"bbbb")
+
+        assert not derived.exists()
+
+    def test_failed_download_returns_empty(self, tmp_path):
+        cache, _ = make_cache(tmp_path, session=FakeSession(fail=True))
+        assert cache.fetch("https://x/missing.png") == b""
+        assert "https://x/missing.png" not in cache
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,111 @@
+"""
+Unit tests for history persistence: legacy import and the write-behind writer.
+"""
+
+import json
+import time
+import threading
+import pytest
+from midjourney_studio.utils import persistence
+from midjourney_studio.utils.persistence import WriteBehindPersister, load_legacy_history
+
+
+class TestLegacyImport:
+    """Test the read-only import of the old job_history.json."""
+
+    def test_reads_legacy_list_without_writing(self, tmp_path):
+        path = tmp_path / "job_history.json"
+        legacy = [{"jobid": "new"}, {"jobid": "old"}]
+        path.write_text(json.dumps(legacy, indent=2))
+
+        assert load_legacy_history(path) == legacy
+        assert json.loads(path.read_text()) == legacy
+
+    def test_missing_or_invalid_file(self, tmp_path):
+        path = tmp_path / "job_history.json"
+        assert load_legacy_history(path) == []
+        path.write_text('{"jobid": "a"}')
+        assert load_legacy_history(path) == []
+        path.write_text("[{")
+        assert load_legacy_history(path) == []
+
+    def test_imports_into_empty_store(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(persistence, "_store", None)
+        persistence.HISTORY_FILE.write_text(json.dumps([{"jobid": "new"}, {"jobid": "old"}]))
+
+        history = persistence.load_job_history()
+        assert [j["jobid"] for j in history] == ["new", "old"]
+
+        persistence.record_job({"jobid": "newest"})
+        persistence.flush_job_history()
+        assert persistence.get_job_store().all()[0]["jobid"] == "newest"
+        persistence.get_job_store().close()
+        monkeypatch.setattr(persistence, "_store", None)
+
+
+class RecordingWriter:
+    """Write callback that records each batch."""
+
+    def __init__(self, fail_times=0):
+        self.batches = []
+        self.fail_times = fail_times
+        self.written = threading.Event()
+
+    def __call__(self, records, raws):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise OSError("disk full")
+        self.batches.append(([r["jobid"] for r in records], raws))
+        self.written.set()
+
+
+class TestWriteBehindPersister:
+    """Test coalescing, batching and synchronous flush."""
+
+    def test_updates_coalesce_into_one_write(self):
+        writer = RecordingWriter()
+        persister = WriteBehindPersister(writer, interval=0.05, batch_size=100)
+        for i in range(10):
+            persister.enqueue({"jobid": "a", "progress": i})
+        persister.enqueue({"jobid": "b"})
+
+        assert writer.written.wait(2)
+        persister.close()
+        assert writer.batches == [(["a", "b"], [])]
+
+    def test_batch_size_triggers_early_flush(self):
+        writer = RecordingWriter()
+        persister = WriteBehindPersister(writer, interval=30, batch_size=3)
+        for job_id in ("a", "b", "c"):
+            persister.enqueue({"jobid": job_id})
+
+        start = time.time()
+        assert writer.written.wait(2)
+        assert time.time() - start < 2
+        persister.close()
+
+    def test_flush_is_synchronous(self):
+        writer = RecordingWriter()
+        persister = WriteBehindPersister(writer, interval=30, batch_size=100)
+        persister.enqueue({"jobid": "a"}, raw={"jobid": "a", "big": True})
+        persister.flush()
+
+        assert writer.batches == [(["a"], [{"jobid": "a", "big": True}])]
+        assert persister.pending_count() == 0
+        persister.close()
+
+    def test_failed_write_is_retried(self):
+        writer = RecordingWriter(fail_times=1)
+        persister = WriteBehindPersister(writer, interval=30, batch_size=100)
+        persister.enqueue({"jobid": "a"})
+        persister.flush()
+        assert persister.pending_count() == 1
+
+        persister.flush()
+        assert writer.batches == [(["a"], [])]
+        persister.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
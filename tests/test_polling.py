@@ -0,0 +1,166 @@
+"""
+Unit tests for job polling utilities.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from midjourney_studio.utils.polling import (
+    PollScheduler,
+    AdaptivePollInterval,
+    RenderTimeStats
+)
+
+from .conftest import FakeAPI
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestPollScheduler:
+    """Test the multiplexed poll scheduler."""
+
+    def test_many_jobs_complete_on_one_scheduler(self):
+        api = FakeAPI(polls_to_complete=2)
+        scheduler = PollScheduler(api, poll_interval=0.01)
+        done = {}
+        threads_before = threading.active_count()
+
+        for i in range(50):
+            scheduler.subscribe(f"job{i}", on_complete=lambda jid, data: done.setdefault(jid, data))
+
+        try:
+            assert wait_for(lambda: len(done) == 50)
+            assert all(d["status"] == "completed" for d in done.values())
+            # One scheduler thread plus at most max_in_flight workers
+            assert threading.active_count() - threads_before <= 1 + scheduler.max_in_flight
+            assert scheduler.tracked_jobs() == []
+        finally:
+            scheduler.stop()
+
+    def test_in_flight_cap(self):
+        api = FakeAPI(polls_to_complete=1, delay=0.02)
+        scheduler = PollScheduler(api, max_in_flight=2, poll_interval=0.01)
+        done = []
+        for i in range(10):
+            scheduler.subscribe(f"job{i}", on_complete=lambda jid, data: done.append(jid))
+        try:
+            assert wait_for(lambda: len(done) == 10)
+            assert api.max_in_flight <= 2
+        finally:
+            scheduler.stop()
+
+    def test_updates_and_unsubscribe(self):
+        api = FakeAPI(polls_to_complete=3)
+        scheduler = PollScheduler(api, poll_interval=0.01)
+        updates, completes = [], []
+        token = scheduler.subscribe("a", on_update=lambda jid, d: updates.append(d))
+        scheduler.subscribe("a", on_complete=lambda jid, d: completes.append(d))
+        scheduler.unsubscribe("a", token)
+        try:
+            assert wait_for(lambda: len(completes) == 1)
+            assert updates == []
+        finally:
+            scheduler.stop()
+
+    def test_cancel_stops_polling(self):
+        api = FakeAPI(polls_to_complete=1000)
+        scheduler = PollScheduler(api, poll_interval=0.01)
+        completes = []
+        scheduler.subscribe("a", on_complete=lambda jid, d: completes.append(d))
+        try:
+            assert wait_for(lambda: api.calls.get("a", 0) >= 2)
+            assert scheduler.cancel("a")
+            calls = api.calls["a"]
+            time.sleep(0.1)
+            assert api.calls["a"] <= calls + 1
+            assert completes == []
+        finally:
+            scheduler.stop()
+
+    def test_timeout_delivers_timeout_result(self):
+        api = FakeAPI(polls_to_complete=1000)
+        scheduler = PollScheduler(api, poll_interval=0.01)
+        completes = []
+        scheduler.subscribe("a", on_complete=lambda jid, d: completes.append(d), timeout=0.05)
+        try:
+            assert wait_for(lambda: len(completes) == 1)
+            assert completes[0]["status"] == "timeout"
+        finally:
+            scheduler.stop()
+
+
+class TestRenderTimeStats:
+    """Test historical render time estimates."""
+
+    def test_median_from_history(self):
+        stats = RenderTimeStats()
+        stats.observe_history([
+            {"status": "completed", "verb": "imagine", "jobType": "image",
+             "created": "2025-12-18T07:27:00.000Z", "updated": "2025-12-18T07:27:30.000Z"},
+            {"status": "completed", "verb": "imagine", "jobType": "image",
+             "created": "2025-12-18T07:27:00.000Z", "updated": "2025-12-18T07:27:50.000Z"},
+            {"status": "failed", "verb": "imagine", "jobType": "image",
+             "created": "2025-12-18T07:27:00.000Z", "updated": "2025-12-18T07:37:00.000Z"},
+        ])
+        assert stats.expected("imagine", "image") == 40.0
+        assert stats.expected("imagine", "video") == 40.0  # verb-only fallback
+        assert stats.expected("video", "video") is None
+
+
+class TestAdaptivePollInterval:
+    """Test adaptive poll delays."""
+
+    def test_unknown_job_backs_off(self):
+        interval = AdaptivePollInterval(base=3, jitter=0, stats=RenderTimeStats())
+        state = interval.new_state()
+        delays = [interval.next_delay(state, {"status": "created"}) for _ in range(4)]
+        assert delays[0] < delays[1] < delays[2] < delays[3]
+        assert delays[-1] <= interval.max_interval
+
+    def test_progress_rate_speeds_up_near_completion(self):
+        interval = AdaptivePollInterval(base=3, jitter=0, stats=RenderTimeStats())
+        state = interval.new_state()
+        state.last_progress, state.last_progress_at = 10.0, time.monotonic() - 10
+        far = interval.next_delay(state, {"status": "progress", "progress_percent": 20})
+        state.last_progress, state.last_progress_at = 80.0, time.monotonic() - 10
+        near = interval.next_delay(state, {"status": "progress", "progress_percent": 99})
+        assert near < far
+        assert near == interval.min_interval
+
+    def test_history_estimate_used_without_progress(self):
+        stats = RenderTimeStats()
+        stats.record("video", "video", 120)
+        interval = AdaptivePollInterval(base=3, jitter=0, stats=stats)
+        delay = interval.next_delay(interval.new_state(), {"verb": "video", "jobType": "video"})
+        assert delay == interval.max_interval  # ~60s to go, capped
+
+    def test_recovered_job_is_aged_from_created(self):
+        stats = RenderTimeStats()
+        stats.record("imagine", "image", 60)
+        interval = AdaptivePollInterval(base=10, jitter=0, stats=stats)
+        job = {"verb": "imagine", "jobType": "image", "status": "progress"}
+
+        fresh = interval.next_delay(interval.new_state(), job)
+        created = (datetime.now(timezone.utc) - timedelta(seconds=55)).isoformat().replace("+00:00", "Z")
+        recovered = interval.next_delay(interval.new_state(), dict(job, created=created))
+
+        assert fresh == pytest.approx(30, abs=0.5)  # halfway to the typical 60s
+        assert recovered == interval.min_interval  # ~5s left
+
+    def test_jitter_stays_in_bounds(self):
+        interval = AdaptivePollInterval(base=3, jitter=0.2, stats=RenderTimeStats())
+        for _ in range(20):
+            delay = interval.next_delay(interval.new_state(), None)
+            assert 3 * 0.8 <= delay <= 3 * 1.2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
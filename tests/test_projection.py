@@ -0,0 +1,89 @@
+"""
+Unit tests for compact job projection and the raw payload archive.
+"""
+
+import json
+import pytest
+from midjourney_studio.utils.projection import Projection, PayloadArchive, slim_job
+
+
+def discord_job():
+    """A completed imagine job carrying a full Discord message."""
+    author = {"id": "936929561302675456", "username": "Midjourney Bot", "avatar": "f" * 32,
+              "avatar_decoration_data": None, "collectibles": None, "bot": True,
+              "public_flags": 589824, "flags": 589824, "banner": None, "accent_color": None}
+    attachment = {"id": "1", "filename": "grid.png", "size": 7000000, "url": "https://cdn/grid.png",
+                  "proxy_url": "https://media/grid.png", "width": 2048, "height": 2048,
+                  "content_type": "image/png", "placeholder": "x" * 40, "placeholder_version": 1,
+                  "content_scan_version": 2, "original_content_type": "image/png"}
+    components = [{"type": 1, "id": i, "components": [
+        {"type": 2, "style": 2, "label": f"U{j}", "custom_id": "MJ::JOB::upsample::" + "a" * 40}
+        for j in range(5)]} for i in range(4)]
+    return {
+        "jobid": "j1", "verb": "imagine", "jobType": "imagine", "status": "completed", "code": 200,
+        "created": "2025-01-01T00:00:00Z", "updated": "2025-01-01T00:01:00Z", "channel": "123",
+        "request": {"prompt": "a cat", "stream": False, "channel": "123"},
+        "response": {
+            "content": "**a cat** - <@1> (fast)", "attachments": [attachment],
+            "imageUx": [{"id": i, "url": f"https://ux/{i}.png"} for i in range(1, 5)],
+            "buttons": ["U1", "U2", "V1", "V2"],
+            "embeds": [], "author": author, "components": components,
+            "mentions": [author] * 3, "interaction_metadata": {"user": author, "type": 2},
+            "flags": 0, "tts": False, "pinned": False, "type": 0, "timestamp": "x" * 32,
+            "channel_id": "123", "id": "456", "message_reference": {"channel_id": "1"},
+        },
+    }
+
+
+class TestProjection:
+    """Test the compact record shape."""
+
+    def test_keeps_fields_readers_use(self):
+        slim = slim_job(discord_job())
+
+        assert slim["jobid"] == "j1"
+        assert slim["channel"] == "123"  # follow-ups are pinned to it
+        assert slim["request"] == {"prompt": "a cat"}
+        assert slim["response"]["attachments"][0]["url"] == "https://cdn/grid.png"
+        assert slim["response"]["attachments"][0]["filename"] == "grid.png"
+        assert slim["response"]["imageUx"][3]["url"] == "https://ux/4.png"
+        assert slim["response"]["buttons"] == ["U1", "U2", "V1", "V2"]
+        assert slim["response"]["content"].startswith("**a cat**")
+
+    def test_drops_discord_metadata(self):
+        slim = slim_job(discord_job())
+
+        assert "author" not in slim["response"]
+        assert "components" not in slim["response"]
+        assert "proxy_url" not in slim["response"]["attachments"][0]
+        full_size = len(json.dumps(discord_job()))
+        assert len(json.dumps(slim)) * 4 < full_size
+
+    def test_idempotent(self):
+        slim = slim_job(discord_job())
+        assert slim_job(slim) == slim
+
+    def test_local_fields_and_config(self):
+        entry = {"jobid": "v1", "verb": "video", "parent_jobid": "j1", "button": "Animate"}
+        assert slim_job(entry) == entry
+
+        minimal = Projection(job_fields=("jobid",), response_fields=())
+        assert minimal.apply(discord_job()) == {"jobid": "j1", "request": {"prompt": "a cat"}}
+
+
+class TestPayloadArchive:
+    """Test the gzip side archive."""
+
+    def test_append_and_lookup(self, tmp_path):
+        archive = PayloadArchive(tmp_path / "payloads.jsonl.gz")
+        archive.append({"jobid": "a", "v": 1})
+        archive.append({"jobid": "b", "v": 1})
+        archive.append({"jobid": "a", "v": 2})
+
+        assert [j["jobid"] for j in archive] == ["a", "b", "a"]
+        assert archive.get("a") == {"jobid": "a", "v": 2}
+        assert archive.get("missing") is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,98 @@
+"""
+Unit tests for local quadrant splitting of grid images.
+"""
+
+import time
+
+import pytest
+from io import BytesIO
+
+from midjourney_studio.utils import quadrants
+from midjourney_studio.utils.media_cache import MediaCache
+from midjourney_studio.utils.quadrants import QuadrantSplitter, quadrant_boxes, split_grid
+
+COLORS = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0)]
+
+
+class FakeSession:
+    """requests.Session stub that must never be used."""
+
+    def get(self, url, timeout=None):
+        raise AssertionError("unexpected download")
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = MediaCache(tmp_path / "cache", session=FakeSession())
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def grid_bytes():
+    Image = pytest.importorskip("PIL.Image")
+    grid = Image.new("RGB", (800, 600))
+    for color, box in zip(COLORS, quadrant_boxes(800, 600)):
+        grid.paste(color, box)
+    buf = BytesIO()
+    grid.save(buf, "PNG")
+    return buf.getvalue()
+
+
+def center_color(data_or_path):
+    from PIL import Image
+    source = BytesIO(data_or_path) if isinstance(data_or_path, bytes) else data_or_path
+    with Image.open(source) as img:
+        return img.convert("RGB").getpixel((img.width // 2, img.height // 2))
+
+
+class TestQuadrants:
+    """Test crop geometry, ordering and caching."""
+
+    def test_boxes(self):
+        assert quadrant_boxes(4, 2) == [(0, 0, 2, 1), (2, 0, 4, 1), (0, 1, 2, 2), (2, 1, 4, 2)]
+
+    def test_split_grid_order(self, grid_bytes):
+        crops = split_grid(grid_bytes)
+        assert [center_color(c) for c in crops] == COLORS
+
+    def test_crops_cached_with_previews(self, cache, grid_bytes):
+        cache.put("https://x/grid.png", grid_bytes)
+        splitter = QuadrantSplitter(cache)
+
+        crops = splitter.crops("https://x/grid.png")
+        previews = splitter.previews("https://x/grid.png")
+
+        assert [center_color(c) for c in crops] == COLORS
+        assert all(p.exists() and p.suffix == ".webp" for p in previews)
+        assert [center_color(p) for p in previews][0][0] > 200
+
+    def test_uncached_grid_without_fetch(self, cache):
+        pytest.importorskip("PIL")
+        assert QuadrantSplitter(cache).previews("https://x/missing.png") is None
+
+    def test_previews_only_read_existing_crops(self, cache, grid_bytes):
+        cache.put("https://x/grid.png", grid_bytes)
+        splitter = QuadrantSplitter(cache)
+        assert splitter.previews("https://x/grid.png") is None
+
+        splitter.schedule("https://x/grid.png")
+        deadline = time.time() + 5
+        while splitter._pending and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(splitter.previews("https://x/grid.png")) == 4
+
+    def test_without_pillow(self, cache, monkeypatch):
+        monkeypatch.setattr(quadrants, "Image", None)
+        cache.put("https://x/grid.png", b"png")
+
+        assert QuadrantSplitter(cache).crops("https://x/grid.png") is None
+        with pytest.raises(ImportError):
+            split_grid(b"png")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
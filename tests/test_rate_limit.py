@@ -0,0 +1,110 @@
+"""
+Unit tests for the shared token-bucket rate limiter.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+
+from midjourney_studio.api.client import MidjourneyAPI
+from midjourney_studio.api.rate_limit import (
+    SUBMIT, READ, TokenBucket, RateLimiter, get_rate_limiter, retry_after_seconds
+)
+
+
+class TestTokenBucket:
+    """Test burst, refill and backoff behaviour."""
+
+    def test_burst_then_refill(self, clock):
+        bucket = TokenBucket(rate=2, capacity=3, clock=clock)
+        assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+        clock.now += 0.5
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+
+    def test_refill_is_capped_at_capacity(self, clock):
+        bucket = TokenBucket(rate=10, capacity=2, clock=clock)
+        clock.now += 60
+        assert bucket.available == 2
+        assert [bucket.try_acquire() for _ in range(3)] == [True, True, False]
+
+    def test_timeout_does_not_take_tokens(self, clock):
+        bucket = TokenBucket(rate=1, capacity=1, clock=clock)
+        assert bucket.try_acquire()
+        assert not bucket.acquire(timeout=0.5)
+        clock.now += 1
+        assert bucket.try_acquire()
+
+    def test_backoff_blocks_everyone(self, clock):
+        bucket = TokenBucket(rate=5, capacity=5, clock=clock)
+        bucket.backoff(10)
+        assert bucket.available == 0
+        assert not bucket.try_acquire()
+
+        clock.now += 10
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()  # the burst was drained too
+
+    def test_acquire_waits(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        bucket.acquire()
+        assert not bucket.try_acquire()
+        assert bucket.acquire(timeout=1)
+
+    def test_acquire_async(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+
+        async def run():
+            return [await bucket.acquire_async() for _ in range(3)]
+
+        assert asyncio.run(run()) == [True, True, True]
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestRateLimiter:
+    """Test bucket selection and 429 feedback."""
+
+    def test_classify(self):
+        assert RateLimiter.classify("POST", "/jobs/imagine") == SUBMIT
+        assert RateLimiter.classify("GET", "/jobs/j1") == READ
+        assert RateLimiter.classify("POST", "/accounts") == READ
+        assert RateLimiter.classify("DELETE", "/jobs/j1") == READ
+
+    def test_backoff_only_slows_its_bucket(self, clock):
+        limiter = RateLimiter(clock=clock)
+        limiter.backoff("POST", "/jobs/imagine", 30)
+        assert not limiter.buckets[SUBMIT].try_acquire()
+        assert limiter.buckets[READ].try_acquire()
+
+    def test_shared_per_token(self):
+        assert get_rate_limiter("user:1") is get_rate_limiter(" user:1 ")
+        assert get_rate_limiter("user:1") is not get_rate_limiter("user:2")
+
+    def test_retry_after_seconds(self):
+        assert retry_after_seconds({"retry_after": 12}) == 12
+        assert retry_after_seconds({}, {"Retry-After": "7"}) == 7
+        assert retry_after_seconds({"retry_after": "soon"}) == 5
+        assert retry_after_seconds(None) == 5
+
+    def test_client_feeds_429_into_limiter(self, clock):
+        response = MagicMock(status_code=429, headers={})
+        response.json.return_value = {"error": "Too many requests", "retry_after": 20}
+        session = MagicMock()
+        session.request.return_value = response
+        limiter = RateLimiter(clock=clock)
+        api = MidjourneyAPI("user:1234-abc", session=session, rate_limiter=limiter)
+
+        code, _ = api.imagine("a cat")
+
+        assert code == 429
+        assert not limiter.buckets[SUBMIT].try_acquire()
+        clock.now += 20
+        assert limiter.buckets[SUBMIT].try_acquire()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
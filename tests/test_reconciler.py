@@ -0,0 +1,82 @@
+"""
+Unit tests for bulk job reconciliation.
+"""
+
+import pytest
+from midjourney_studio.utils.reconciler import JobReconciler, running_job_ids
+
+from .conftest import FakeAPI
+
+
+class TestRunningJobIds:
+    """Test parsing of list_running_jobs() payloads."""
+
+    def test_v3_channels_shape(self):
+        payload = {"total": 2, "channels": {
+            "a": {"jobs": [{"jobId": "j1"}]},
+            "b": {"jobs": [{"jobId": "j2"}]},
+        }}
+        assert running_job_ids(payload) == {"j1", "j2"}
+
+    def test_plain_list_shape(self):
+        assert running_job_ids(["j1", "j2"]) == {"j1", "j2"}
+
+    def test_unknown_shape(self):
+        assert running_job_ids({"foo": 1}) is None
+
+
+class TestJobReconciler:
+    """Test diffing the running set against tracked jobs."""
+
+    def test_running_jobs_cost_one_request(self):
+        ids = [f"job{i}" for i in range(50)]
+        api = FakeAPI(running=ids)
+        reconciler = JobReconciler(api)
+        for job_id in ids:
+            reconciler.track(job_id)
+
+        assert reconciler.tick() == {}
+        assert api.list_calls == 1
+        assert api.get_calls == []
+
+    def test_only_departed_jobs_fetched(self):
+        api = FakeAPI(running=["a", "b", "c"])
+        completed = []
+        reconciler = JobReconciler(api, on_complete=lambda j, d: completed.append(j))
+        for job_id in ("a", "b", "c"):
+            reconciler.track(job_id)
+        reconciler.tick()
+
+        api.finish("b")
+        changed = reconciler.tick()
+
+        assert api.get_calls == ["b"]
+        assert set(changed) == {"b"}
+        assert completed == ["b"]
+        assert reconciler.get("b")["status"] == "completed"
+        assert sorted(reconciler.active_jobs()) == ["a", "c"]
+
+    def test_per_job_callback_fires_once(self):
+        api = FakeAPI()
+        seen = []
+        reconciler = JobReconciler(api)
+        reconciler.track("x", on_complete=lambda j, d: seen.append(d["status"]))
+
+        reconciler.tick()
+        reconciler.tick()
+
+        assert seen == ["completed"]
+        assert api.list_calls == 1  # nothing left to reconcile
+
+    def test_failed_list_skips_tick(self):
+        api = FakeAPI(running=["a"])
+        api.list_running_jobs = lambda: (503, {"error": "down"})
+        reconciler = JobReconciler(api)
+        reconciler.track("a")
+
+        assert reconciler.tick() == {}
+        assert api.get_calls == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
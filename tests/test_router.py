@@ -0,0 +1,84 @@
+"""
+Unit tests for multi-channel job routing.
+"""
+
+import pytest
+
+from midjourney_studio.batch.concurrency import AIMDController
+from midjourney_studio.batch.dispatcher import IMAGE, CapacityDispatcher
+from midjourney_studio.batch.health import ChannelHealth
+from midjourney_studio.batch.router import JobRouter, channel_of
+
+from .conftest import FakeAPI
+
+
+@pytest.fixture
+def api():
+    api = FakeAPI(channels={"c1": {"maxJobs": 3}, "c2": {"maxJobs": 3}})
+    api.channel_error = "still broken"
+    return api
+
+
+@pytest.fixture
+def router(api):
+    dispatcher = CapacityDispatcher(api, refresh_interval=0, controller=AIMDController(),
+                                    health=ChannelHealth(api))
+    return JobRouter(dispatcher)
+
+
+class TestChannelOf:
+    """Test reading the channel from job data."""
+
+    def test_reads_top_level_and_response(self):
+        assert channel_of({"jobid": "j", "channel": "c1"}) == "c1"
+        assert channel_of({"jobid": "j", "response": {"channel": 42}}) == "42"
+        assert channel_of({"jobid": "j"}) is None
+        assert channel_of("j") is None
+
+
+class TestJobRouter:
+    """Test routing new jobs by capacity and follow-ups by parent."""
+
+    def test_new_jobs_go_to_channel_with_most_room(self, api, router):
+        api.running = {"c1": [{"jobId": "x", "jobType": "imagine"}, {"jobId": "y", "jobType": "imagine"}]}
+        assert router.route(IMAGE) == "c2"
+
+        api.running = {"c2": [{"jobId": "z", "jobType": "imagine"}]}
+        assert router.route(IMAGE) == "c1"
+
+    def test_fallback_when_every_channel_is_full(self, api, router):
+        api.running = {ch: [{"jobId": f"{ch}-{i}", "jobType": "imagine"} for i in range(3)]
+                       for ch in ("c1", "c2")}
+        assert router.route(IMAGE, fallback="c1") == "c1"
+        assert router.route(IMAGE) is None
+
+    def test_follow_ups_stick_to_parent_channel(self, api, router):
+        router.remember("job1", {"jobid": "job1", "channel": "c2"})
+        api.running = {"c2": [{"jobId": "x", "jobType": "imagine"}]}
+
+        assert router.route(IMAGE, parent="job1") == "c2"
+        router.remember("job2", {"jobid": "job2"}, parent="job1")
+        assert router.route(IMAGE, parent="job2") == "c2"
+        assert router.route(IMAGE, parent={"jobid": "other", "channel": "c1"}) == "c1"
+
+    def test_unknown_parent_uses_fallback(self, router):
+        assert router.route(IMAGE, parent="missing", fallback="c1") == "c1"
+
+    def test_remembered_jobs_are_bounded(self, router):
+        router.max_remembered = 2
+        for i in range(3):
+            router.remember(f"job{i}", {"channel": "c1"})
+        assert router.channel_for("job0") is None
+        assert router.channel_for("job2") == "c1"
+
+    def test_unavailable_parent_channel(self, router):
+        ticket = router.dispatcher.acquire(IMAGE, channel="c1")
+        router.dispatcher.report(ticket, 596, {"error": "CAPTCHA"})
+        assert not router.available("c1")
+        assert "CAPTCHA" in router.unavailable_reason("c1")
+        assert router.available("c2")
+        assert router.available(None)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,101 @@
+"""
+Unit tests for WebP thumbnail generation.
+"""
+
+import time
+import pytest
+from io import BytesIO
+
+from midjourney_studio.utils import thumbnails
+from midjourney_studio.utils.media_cache import MediaCache
+from midjourney_studio.utils.thumbnails import Thumbnailer
+
+
+class FakeSession:
+    """requests.Session stub that must never be used."""
+
+    def get(self, url, timeout=None):
+        raise AssertionError("unexpected download")
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = MediaCache(tmp_path / "cache", session=FakeSession())
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def png_bytes():
+    Image = pytest.importorskip("PIL.Image")
+    buf = BytesIO()
+    Image.new("RGB", (1600, 800), (200, 40, 40)).save(buf, "PNG")
+    return buf.getvalue()
+
+
+class TestThumbnailer:
+    """Test thumbnail sizes, sharing and fallbacks."""
+
+    def test_all_sizes_written_once(self, cache, png_bytes):
+        from PIL import Image
+        cache.put("https://x/grid.png", png_bytes)
+        thumbs = Thumbnailer(cache)
+
+        small = thumbs.build("https://x/grid.png", "small")
+        large = thumbs.get("https://x/grid.png", "large")
+
+        with Image.open(small) as img:
+            assert img.format == "WEBP"
+            assert img.size == (192, 96)
+        with Image.open(large) as img:
+            assert img.size == (768, 384)
+        assert small.stat().st_size < len(png_bytes)
+
+    def test_thumbnails_shared_by_identical_content(self, cache, png_bytes):
+        cache.put("https://x/a.png", png_bytes)
+        cache.put("https://y/b.png", png_bytes)
+        thumbs = Thumbnailer(cache)
+
+        assert thumbs.build("https://x/a.png") == thumbs.get("https://y/b.png")
+
+    def test_get_never_renders(self, cache, png_bytes):
+        cache.put("https://x/grid.png", png_bytes)
+        thumbs = Thumbnailer(cache)
+
+        assert thumbs.get("https://x/grid.png") is None
+        assert not thumbs._path(cache.path_for("https://x/grid.png").name, "medium").exists()
+
+    def test_schedule_builds_in_background(self, cache, png_bytes):
+        cache.put("https://x/grid.png", png_bytes)
+        thumbs = Thumbnailer(cache)
+        thumbs.schedule("https://x/grid.png")
+
+        deadline = time.time() + 5
+        while thumbs._pending and time.time() < deadline:
+            time.sleep(0.01)
+        assert thumbs._path(cache.path_for("https://x/grid.png").name, "medium").exists()
+
+    def test_uncached_or_invalid_returns_none(self, cache):
+        pytest.importorskip("PIL")
+        cache.put("https://x/notes.txt", b"not an image")
+        thumbs = Thumbnailer(cache)
+
+        assert thumbs.build("https://x/missing.png") is None
+        assert thumbs.build("https://x/notes.txt") is None
+
+    def test_without_pillow(self, cache, monkeypatch):
+        monkeypatch.setattr(thumbnails, "Image", None)
+        cache.put("https://x/grid.png", b"png")
+        thumbs = Thumbnailer(cache)
+
+        assert not thumbs.available
+        assert thumbs.get("https://x/grid.png") is None
+        thumbs.schedule("https://x/grid.png")
+        assert not thumbs._pending
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,113 @@
+"""
+Unit tests for the replyUrl callback receiver.
+"""
+
+import json
+import time
+import urllib.error
+import urllib.request
+import pytest
+
+from midjourney_studio.utils.webhook import CallbackServer
+from midjourney_studio.utils.reconciler import JobReconciler
+
+from .conftest import FakeAPI
+
+
+@pytest.fixture
+def server():
+    server = CallbackServer(port=0, public_url="https://example.test/")
+    server.start()
+    yield server
+    server.stop()
+
+
+def post(url, body):
+    """Fake UseAPI sender: POST JSON and return the status code."""
+    data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+    request = urllib.request.Request(url, data=data, method="POST",
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+class TestCallbackServer:
+    """Test callback verification over real HTTP."""
+
+    def test_reply_url_uses_public_base(self, server):
+        assert server.reply_url == "https://example.test/mj/callback"
+        assert CallbackServer().reply_url is None
+
+    def test_known_ref_is_dispatched(self, server):
+        received = []
+        ref = server.register(on_update=lambda j, d: received.append((j, d["status"])))
+        server.bind(ref, "job1")
+
+        assert post(server.local_url, {"jobid": "job1", "status": "progress", "replyRef": ref}) == 200
+        assert post(server.local_url, {"jobid": "job1", "status": "completed", "replyRef": ref}) == 200
+
+        assert received == [("job1", "progress"), ("job1", "completed")]
+        assert server.pending_count() == 0
+
+    def test_unknown_ref_rejected(self, server):
+        assert post(server.local_url, {"jobid": "job1", "status": "completed", "replyRef": "nope"}) == 403
+
+    def test_mismatched_jobid_rejected(self, server):
+        ref = server.register()
+        server.bind(ref, "job1")
+        assert post(server.local_url, {"jobid": "job2", "status": "completed", "replyRef": ref}) == 403
+
+    def test_bad_requests(self, server):
+        assert post(server.local_url, b"not json") == 400
+        assert post(server.local_url.replace("/mj/callback", "/other"), {"replyRef": "x"}) == 404
+
+
+class TestPollingFallback:
+    """Test that callback-tracked jobs are only polled after the window."""
+
+    def test_callback_completes_without_polling(self, server):
+        api = FakeAPI()
+        reconciler = JobReconciler(api)
+        ref = server.register(on_update=reconciler.apply)
+        server.bind(ref, "job1")
+        reconciler.track("job1", callback_timeout=60)
+
+        reconciler.tick()
+        assert api.list_calls == 0
+
+        post(server.local_url, {"jobid": "job1", "status": "completed", "replyRef": ref})
+        assert reconciler.get("job1")["status"] == "completed"
+        assert reconciler.active_jobs() == []
+
+    def test_callback_before_bind_is_replayed(self, server):
+        api = FakeAPI()
+        reconciler = JobReconciler(api)
+        ref = server.register(on_update=reconciler.apply)
+
+        # The webhook beats the submission response
+        assert post(server.local_url, {"jobid": "job1", "status": "completed", "replyRef": ref}) == 200
+        reconciler.track("job1", callback_timeout=60)
+        server.bind(ref, "job1")
+
+        assert reconciler.get("job1")["status"] == "completed"
+        assert reconciler.active_jobs() == []
+        assert server.pending_count() == 0
+        assert api.get_calls == []
+
+    def test_missing_callback_falls_back_to_polling(self):
+        api = FakeAPI()
+        reconciler = JobReconciler(api)
+        reconciler.track("job1", callback_timeout=0.001)
+
+        time.sleep(0.01)
+        reconciler.tick()
+
+        assert api.get_calls == ["job1"]
+        assert reconciler.get("job1")["status"] == "completed"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
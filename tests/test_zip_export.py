@@ -0,0 +1,56 @@
+"""
+Unit tests for streaming ZIP export.
+"""
+
+import io
+import zipfile
+import pytest
+
+from midjourney_studio.utils.zip_export import ZipExport
+
+
+class TestZipExport:
+    """Test entry compression, naming and spooling."""
+
+    def test_media_stored_text_deflated(self):
+        with ZipExport() as export:
+            export.add("grid.png", b"\x89PNG" + b"\x00" * 1000)
+            export.add("clip.MP4", b"\x00" * 1000)
+            export.add("prompt.txt", b"a cat " * 200)
+
+        with zipfile.ZipFile(io.BytesIO(export.read())) as zf:
+            info = {i.filename: i.compress_type for i in zf.infolist()}
+        assert info["grid.png"] == zipfile.ZIP_STORED
+        assert info["clip.MP4"] == zipfile.ZIP_STORED
+        assert info["prompt.txt"] == zipfile.ZIP_DEFLATED
+        export.close()
+
+    def test_duplicate_names_suffixed(self):
+        with ZipExport() as export:
+            assert export.add("a.png", b"1") == "a.png"
+            assert export.add("a.png", b"2") == "a (1).png"
+
+        with zipfile.ZipFile(io.BytesIO(export.read())) as zf:
+            assert zf.read("a (1).png") == b"2"
+        assert export.count == 2
+        export.close()
+
+    def test_rolls_over_to_disk(self):
+        export = ZipExport(spool_bytes=1024)
+        export.add("big.png", b"\x01" * 4096)
+        assert export.on_disk
+        assert export.size > 4096
+        export.close()
+
+    def test_read_is_repeatable(self):
+        with ZipExport() as export:
+            export.add("a.png", b"1")
+        data = export.read()
+        assert export.read() is data
+        assert export.file.closed
+        assert export.size == len(data)
+        export.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])